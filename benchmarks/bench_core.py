@@ -0,0 +1,126 @@
+"""Benchmarks do núcleo (estudos_core) sobre históricos sintéticos.
+
+Mede carregar_dados, salvar_dados (um dia e o snapshot completo), o resumo semanal, a
+grade do calendário e as estatísticas do histórico para históricos de 1 mil, 10 mil e
+100 mil dias, em cada backend.
+
+Uso:
+    python benchmarks/bench_core.py
+    python benchmarks/bench_core.py --tamanhos 1000 10000 --backends json --json resultado.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import estudos_core as core
+import estudos_estatisticas
+
+ESTADOS = ["Estudado", "Falhei", "Não Estudado", "-"]
+
+
+def gerar_historico(diretorio, tamanho, semente=42):
+    """Grava um dados_estudo.json com `tamanho` dias terminando hoje."""
+    aleatorio = random.Random(semente)
+    hoje = date.today()
+    dias = {}
+    for i in range(tamanho):
+        dia = hoje - timedelta(days=i)
+        dias[dia.strftime("%Y-%m-%d")] = {
+            "estado": aleatorio.choice(ESTADOS),
+            "tempo": aleatorio.randrange(0, 8 * 3600, 60),
+        }
+    with open(os.path.join(diretorio, "dados_estudo.json"), "w", encoding="utf-8") as f:
+        json.dump({"dias": dias, "tempos": dict(core.TEMPO_PADRAO), "ciclos": 0}, f, indent=4, ensure_ascii=False)
+
+
+def medir(funcao, repeticoes=1):
+    """Média, em ms, de `repeticoes` chamadas de `funcao`."""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def reiniciar(backend, diretorio):
+    core.armazenamento.fechar()
+    core.dados["dias"] = {}
+    core.dados["ciclos"] = 0
+    core.definir_diretorio_dados(diretorio)
+    core.definir_backend(backend)
+
+
+def rodar(backend, tamanho, repeticoes):
+    diretorio = tempfile.mkdtemp(prefix="estudos_bench_")
+    try:
+        gerar_historico(diretorio, tamanho)
+        if backend == "sqlite":
+            # A migração única não entra na medição do carregamento
+            reiniciar(backend, diretorio)
+            core.carregar_dados()
+
+        reiniciar(backend, diretorio)
+        resultado = {"backend": backend, "dias": tamanho}
+        resultado["carregar_dados"] = medir(core.carregar_dados)
+
+        hoje = date.today()
+        resultado["resumo_semana (frio)"] = medir(lambda: core.resumo_semana(hoje))
+        resultado["resumo_semana"] = medir(lambda: core.resumo_semana(hoje), repeticoes)
+        resultado["dias_do_mes"] = medir(lambda: core.dias_do_mes(hoje.year, hoje.month), repeticoes)
+        resultado["estatisticas"] = medir(lambda: estudos_estatisticas.calcular_estatisticas(hoje), repeticoes)
+        resultado["estatisticas (python)"] = medir(
+            lambda: estudos_estatisticas.calcular_estatisticas(hoje, usar_numpy=False), repeticoes
+        )
+
+        dia = hoje.strftime("%Y-%m-%d")
+
+        def salvar_dia():
+            core.dados["dias"].setdefault(dia, {"estado": "-", "tempo": 0})["tempo"] += 1
+            core.salvar_dados(dia=dia)
+
+        resultado["salvar_dados(dia)"] = medir(salvar_dia, repeticoes)
+        resultado["descarregar (rajada)"] = medir(core.descarregar_dados)  # As marcas acima viram um lote
+
+        def salvar_tudo():
+            core.salvar_dados()
+            core.descarregar_dados()
+
+        resultado["salvar_dados() + descarregar"] = medir(salvar_tudo)
+        return resultado
+    finally:
+        core.armazenamento.fechar()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--backends", nargs="+", default=["json", "sqlite"], choices=["json", "sqlite"])
+    parser.add_argument("--repeticoes", type=int, default=50)
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava os resultados em JSON para comparar versões")
+    args = parser.parse_args()
+
+    resultados = []
+    for backend in args.backends:
+        for tamanho in args.tamanhos:
+            resultado = rodar(backend, tamanho, args.repeticoes)
+            resultados.append(resultado)
+            print(f"\n{backend} / {tamanho} dias")
+            for nome, ms in resultado.items():
+                if nome not in ("backend", "dias"):
+                    print(f"  {nome:<30} {ms:10.3f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
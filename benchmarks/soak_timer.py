@@ -0,0 +1,247 @@
+"""Simulação longa (soak) do PomodoroTimer e da persistência com um relógio virtual.
+
+Repete meses de uso sintético (aberturas do aplicativo, focos, pausas, desistências,
+trocas de tempos e sessões que passam da meia-noite) sobre o timer e os backends de
+verdade, com um core.RelogioVirtual no lugar do relógio do sistema, milhares de vezes
+mais rápido que o tempo real. A cada período mostra a vazão, a memória alocada pelo
+Python e o tamanho dos arquivos de dados: um número que cresce com o histórico aponta
+uma regressão de escala no timer ou na gravação.
+
+Também confere o que o timer fez: a pausa longa a cada 4 ciclos, cada foco somado ao dia
+em que terminou e, ao recarregar os dados do disco no fim, o total de cada dia.
+
+Uso:
+    python benchmarks/soak_timer.py
+    python benchmarks/soak_timer.py --dias 365 --backends sqlite --json soak.json
+"""
+import argparse
+import collections
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+# No uso real os focos terminam minutos um depois do outro, cada um em uma escrita própria
+os.environ.setdefault("ESTUDOS_TRACKER_JANELA_GRAVACAO", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import estudos_core as core
+
+INICIO = date(2025, 1, 6)  # Uma segunda-feira
+TEMPOS_FOCO = [25 * 60, 30 * 60, 45 * 60, 50 * 60]
+TEMPOS_PAUSA = [5 * 60, 10 * 60]
+TEMPOS_PAUSA_LONGA = [15 * 60, 20 * 60, 30 * 60]
+
+
+class Simulacao:
+    """Um usuário sintético usando o timer dia após dia, sobre um diretório de dados temporário."""
+
+    def __init__(self, backend, diretorio, semente):
+        self.backend = backend
+        self.diretorio = diretorio
+        self.aleatorio = random.Random(semente)
+        self.relogio = core.RelogioVirtual(datetime.combine(INICIO, datetime.min.time()))
+        self.esperado = collections.Counter()  # Data -> segundos de foco concluídos nela
+        self.erros = []
+        self.agendamentos = 0  # Ticks e outros after() rodados
+        self.atualizacoes = 0  # Chamadas do update_callback (o display)
+        self.conclusoes = 0
+        self.dia_concluido = None
+
+        core.armazenamento.fechar()
+        core.dados.clear()
+        core.dados.update(core.dados_padrao())
+        core.definir_diretorio_dados(diretorio)
+        core.definir_backend(backend)
+        core.definir_relogio(self.relogio)
+        core.alarme.silencioso = True
+        core.carregar_dados()
+        self.timer = core.PomodoroTimer(self.relogio, self.mostrar, self.registrar_dia)
+
+    def mostrar(self, tempo, tipo):
+        self.atualizacoes += 1
+
+    def registrar_dia(self, dia):
+        self.dia_concluido = dia
+
+    def erro(self, mensagem):
+        if len(self.erros) < 20:
+            self.erros.append(f"{self.relogio.agora():%Y-%m-%d %H:%M:%S}: {mensagem}")
+
+    def avancar(self, segundos):
+        self.agendamentos += self.relogio.avancar(segundos)
+
+    def rodar_fase(self):
+        """Roda a fase atual até o fim, com uma pausa no meio às vezes; devolve o datetime do fim."""
+        self.timer.iniciar()
+        if self.aleatorio.random() < 0.25:
+            self.avancar(self.aleatorio.uniform(1, self.timer.restante()))
+            self.timer.pausar()
+            self.avancar(self.aleatorio.uniform(30, 15 * 60))
+            self.timer.iniciar()
+        fim = self.relogio.agora() + timedelta(seconds=self.timer.restante())
+        self.avancar(self.timer.restante() + 1)  # O tick que conclui roda logo após o prazo
+        if self.timer.executando:
+            self.erro(f"a fase {self.timer.tipo_atual} não terminou no prazo")
+        self.conclusoes += 1
+        return fim
+
+    def foco(self):
+        """Um foco seguido da pausa, ou uma desistência no meio do foco."""
+        timer = self.timer
+        if self.aleatorio.random() < 0.05:
+            timer.iniciar()
+            self.avancar(self.aleatorio.uniform(1, timer.tempo_total - 1))
+            timer.resetar()
+            return
+
+        ciclos = core.dados["ciclos"]
+        duracao = timer.tempo_total
+        self.dia_concluido = None
+        fim = self.rodar_fase()
+        # O tick que conclui roda até 1 ms depois do prazo, que pode cair do outro lado da meia-noite
+        dias = {fim.strftime("%Y-%m-%d"), (fim + timedelta(seconds=0.01)).strftime("%Y-%m-%d")}
+        if self.dia_concluido not in dias:
+            self.erro(f"foco terminado em {fim:%Y-%m-%d %H:%M:%S} somado a {self.dia_concluido}")
+        self.esperado[self.dia_concluido or fim.strftime("%Y-%m-%d")] += duracao
+
+        proxima = "pausa_longa" if (ciclos + 1) % 4 == 0 else "pausa"
+        if core.dados["ciclos"] != ciclos + 1 or timer.tipo_atual != proxima:
+            self.erro(f"depois do ciclo {ciclos + 1} veio {timer.tipo_atual}, esperado {proxima}")
+        self.rodar_fase()
+
+    def trocar_tempos(self):
+        """Como o "Salvar" da janela de opções: muda os tempos, grava e reseta o timer."""
+        tempos = core.dados["tempos"]
+        tempos["foco"] = self.aleatorio.choice(TEMPOS_FOCO)
+        tempos["pausa"] = self.aleatorio.choice(TEMPOS_PAUSA)
+        tempos["pausa_longa"] = self.aleatorio.choice(TEMPOS_PAUSA_LONGA)
+        core.salvar_dados(tempos=True)
+        self.timer.resetar()
+
+    def simular_dia(self, dia):
+        aleatorio = self.aleatorio
+        if aleatorio.random() < 0.15:
+            return  # Não abriu o aplicativo; o próximo dia preenche este
+        meia_noite = datetime.combine(dia, datetime.min.time())
+        self.avancar(max((meia_noite + timedelta(minutes=aleatorio.randrange(7 * 60, 12 * 60))
+                          - self.relogio.agora()).total_seconds(), 0))
+        core.preencher_dias_perdidos()
+        if aleatorio.random() < 0.3:
+            core.resumo_semana()  # Abriu o resumo da semana
+        if aleatorio.random() < 0.03:
+            self.trocar_tempos()
+        if aleatorio.random() < 0.03:
+            self.timer.resetar()  # Reset sem ter iniciado: marca o dia como "Falhei"
+
+        for _ in range(aleatorio.randint(0, 10)):
+            self.foco()
+            self.avancar(aleatorio.uniform(0, 90 * 60))
+
+        if aleatorio.random() < 0.1:
+            # Estuda à noite e termina depois da meia-noite
+            self.avancar(max((meia_noite + timedelta(hours=23, minutes=aleatorio.randrange(35, 60))
+                              - self.relogio.agora()).total_seconds(), 0))
+            self.foco()
+
+    def tamanhos(self):
+        if self.backend == "sqlite":
+            # Passa o WAL para o banco, senão ele mede o último checkpoint e não o histórico
+            core.armazenamento.executar("PRAGMA wal_checkpoint(TRUNCATE)")
+        pasta = core.diretorio_perfil(core.PERFIL_ATIVO)
+        return {nome: os.path.getsize(os.path.join(pasta, nome)) for nome in sorted(os.listdir(pasta))
+                if os.path.isfile(os.path.join(pasta, nome)) and not nome.startswith(".")}
+
+    def conferir(self):
+        """Recarrega os dados do disco e compara o total de cada dia e o log de sessões."""
+        core.descarregar_dados()
+        core.armazenamento.fechar()
+        core.dados.clear()
+        core.dados.update(core.dados_padrao())
+        core.definir_backend(self.backend)
+        core.carregar_dados()
+        for dia, total in sorted(self.esperado.items()):
+            gravado = core.dados["dias"].get(dia, {}).get("tempo", 0)
+            if gravado != total:
+                self.erro(f"{dia}: {gravado} s gravados, esperado {total} s")
+        conclusoes = core.log_sessoes.resumo()["eventos"]["conclusao"]
+        if conclusoes != self.conclusoes:
+            self.erro(f"{conclusoes} conclusões no log de sessões, esperado {self.conclusoes}")
+
+
+def rodar(backend, dias, periodo, semente, memoria):
+    diretorio = tempfile.mkdtemp(prefix="estudos_soak_")
+    relogio_original = core.relogio
+    try:
+        if memoria:
+            tracemalloc.start()
+        simulacao = Simulacao(backend, diretorio, semente)
+        memoria_inicial = tracemalloc.get_traced_memory()[0] if memoria else 0
+        periodos = []
+        print(f"\n{backend}: {dias} dias simulados")
+        print(f"  {'dias':>5} {'x tempo real':>13} {'ticks/s':>10} {'memória (KB)':>13} {'dados (KB)':>11} {'sessoes.bin (KB)':>17}")
+        for inicio in range(0, dias, periodo):
+            relogio_antes = simulacao.relogio.monotonic()
+            agendamentos_antes = simulacao.agendamentos
+            comeco = time.perf_counter()
+            for i in range(inicio, min(inicio + periodo, dias)):
+                simulacao.simular_dia(INICIO + timedelta(days=i))
+            core.descarregar_dados()
+            decorrido = time.perf_counter() - comeco
+
+            tamanhos = simulacao.tamanhos()
+            resultado = {
+                "dias": min(inicio + periodo, dias),
+                "aceleracao": (simulacao.relogio.monotonic() - relogio_antes) / decorrido,
+                "ticks_por_s": (simulacao.agendamentos - agendamentos_antes) / decorrido,
+                "memoria_kb": (tracemalloc.get_traced_memory()[0] - memoria_inicial) / 1024 if memoria else None,
+                "dados_kb": sum(t for nome, t in tamanhos.items() if nome.startswith("dados_estudo")) / 1024,
+                "sessoes_kb": tamanhos.get("sessoes.bin", 0) / 1024,
+                "dias_registrados": len(core.dados["dias"]),
+                "semanas_salvas": len(core.dados.get("semanas", {})),
+            }
+            periodos.append(resultado)
+            memoria_texto = f"{resultado['memoria_kb']:13.0f}" if memoria else f"{'-':>13}"
+            print(f"  {resultado['dias']:5d} {resultado['aceleracao']:13.0f} {resultado['ticks_por_s']:10.0f} "
+                  f"{memoria_texto} {resultado['dados_kb']:11.1f} {resultado['sessoes_kb']:17.1f}")
+
+        simulacao.conferir()
+        print(f"  {simulacao.conclusoes} fases concluídas, {simulacao.atualizacoes} atualizações do display, "
+              f"{len(core.dados['dias'])} dias registrados, {len(core.dados.get('semanas', {}))} semanas salvas")
+        for erro in simulacao.erros:
+            print("  ERRO", erro)
+        return {"backend": backend, "periodos": periodos, "erros": simulacao.erros}
+    finally:
+        if memoria:
+            tracemalloc.stop()
+        core.armazenamento.fechar()
+        core.definir_relogio(relogio_original)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dias", type=int, default=180, help="dias de uso simulados")
+    parser.add_argument("--periodo", type=int, default=30, help="dias entre as medições")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--backends", nargs="+", default=["json", "sqlite"], choices=["json", "sqlite"])
+    parser.add_argument("--sem-memoria", action="store_true",
+                        help="não usa o tracemalloc, que deixa a simulação mais lenta")
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava os resultados em JSON para comparar versões")
+    args = parser.parse_args()
+
+    resultados = [rodar(backend, args.dias, args.periodo, args.semente, not args.sem_memoria)
+                  for backend in args.backends]
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=4, ensure_ascii=False)
+    sys.exit(1 if any(r["erros"] for r in resultados) else 0)
+
+
+if __name__ == "__main__":
+    main()
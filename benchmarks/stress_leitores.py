@@ -0,0 +1,148 @@
+"""Teste de estresse: um gravador e vários processos leitores nos mesmos arquivos de dados.
+
+O gravador (este processo) reescreve os dias em rodízio, o dia j recebendo tempo = i na
+i-ésima gravação, com o journal compactado com frequência. Os leitores chamam
+core.ler_dados_consistentes sem parar e conferem que cada cópia é um estado que existiu:
+se o maior tempo visto é k, todo dia j tem o valor da última gravação dele até k. Um
+journal perdido em uma compactação ou um snapshot misturado aparece como violação.
+
+Também mede a latência das gravações sozinhas e com os leitores rodando, para mostrar que
+o gravador não espera por eles.
+
+Uso:
+    python benchmarks/stress_leitores.py
+    python benchmarks/stress_leitores.py --leitores 16 --duracao 10 --backends json
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("ESTUDOS_TRACKER_JANELA_GRAVACAO", "0")  # Cada gravação vai logo para o disco
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import estudos_core as core
+
+INICIO = date(2000, 1, 1)
+LIMITE_JOURNAL = 16 * 1024  # Bem menor que o do aplicativo, para compactar várias vezes por segundo
+
+
+def chave(j):
+    return (INICIO + timedelta(days=j)).strftime("%Y-%m-%d")
+
+
+def violacoes(copia, dias):
+    """Os dias cujo valor não é o da última gravação até a mais nova vista na cópia."""
+    tempos = [copia["dias"].get(chave(j), {}).get("tempo", -1) for j in range(dias)]
+    mais_nova = max(tempos)
+    return [(j, tempo, mais_nova - (mais_nova - j) % dias)
+            for j, tempo in enumerate(tempos) if tempo != mais_nova - (mais_nova - j) % dias]
+
+
+def leitor(diretorio, backend, dias, parar, fila):
+    core.definir_diretorio_dados(diretorio)
+    leituras, erradas, exemplos, latencias = 0, 0, [], []
+    fila.put("pronto")
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        copia = core.ler_dados_consistentes(backend=backend)
+        latencias.append(time.perf_counter() - inicio)
+        leituras += 1
+        encontradas = violacoes(copia, dias)
+        if encontradas:
+            erradas += 1
+            exemplos.extend(encontradas[:3 - len(exemplos)])
+    fila.put((leituras, erradas, exemplos, latencias))
+
+
+def gravar(dias, duracao, inicio):
+    """Grava em rodízio por `duracao` segundos a partir da gravação `inicio`; devolve (próxima, latências)."""
+    latencias = []
+    i = inicio
+    prazo = time.perf_counter() + duracao
+    while time.perf_counter() < prazo:
+        dia = chave(i % dias)
+        comeco = time.perf_counter()
+        core.dados["dias"][dia] = {"estado": "Estudado", "tempo": i}
+        core.salvar_dados(dia=dia)
+        core.descarregar_dados()
+        latencias.append(time.perf_counter() - comeco)
+        i += 1
+    return i, latencias
+
+
+def resumir(latencias):
+    ordenadas = sorted(latencias)
+    return (f"p50 {statistics.median(ordenadas) * 1000:.2f} ms, "
+            f"p99 {ordenadas[int(len(ordenadas) * 0.99)] * 1000:.2f} ms, "
+            f"máx {ordenadas[-1] * 1000:.2f} ms")
+
+
+def rodar(backend, leitores, dias, duracao):
+    diretorio = tempfile.mkdtemp(prefix="estudos_stress_")
+    try:
+        core.armazenamento.fechar()
+        core.dados.clear()
+        core.dados.update(core.dados_padrao())
+        core.definir_diretorio_dados(diretorio)
+        core.definir_backend(backend)
+        core.JOURNAL_LIMITE = LIMITE_JOURNAL
+        core.carregar_dados()
+        core.importar_dias([[(chave(j), {"estado": "Estudado", "tempo": j}) for j in range(dias)]])
+
+        proxima, sozinho = gravar(dias, duracao, dias)
+        print(f"\n{backend}: gravador sozinho: {len(sozinho) / duracao:.0f} gravações/s ({resumir(sozinho)})")
+
+        contexto = multiprocessing.get_context("spawn")  # Igual em todos os sistemas
+        parar = contexto.Event()
+        fila = contexto.Queue()
+        processos = [contexto.Process(target=leitor, args=(diretorio, backend, dias, parar, fila))
+                     for _ in range(leitores)]
+        for processo in processos:
+            processo.start()
+        for _ in processos:
+            fila.get()  # Espera todos estarem lendo antes de medir
+
+        geracao = core.ler_geracao(core.GERACAO_ARQUIVO)
+        _, concorrente = gravar(dias, duracao, proxima)
+        compactacoes = (core.ler_geracao(core.GERACAO_ARQUIVO) - geracao) // 2
+        parar.set()
+        resultados = [fila.get() for _ in processos]
+        for processo in processos:
+            processo.join()
+
+        leituras = sum(r[0] for r in resultados)
+        erradas = sum(r[1] for r in resultados)
+        exemplos = [e for r in resultados for e in r[2]][:3]
+        latencias_leitura = [t for r in resultados for t in r[3]]
+        print(f"{backend}: com {leitores} leitores: {len(concorrente) / duracao:.0f} gravações/s "
+              f"({resumir(concorrente)})" + (f", {compactacoes} compactações" if backend == "json" else ""))
+        print(f"{backend}: leitores: {leituras} leituras ({leituras / duracao:.0f}/s; {resumir(latencias_leitura)}), "
+              f"{erradas} inconsistentes")
+        for j, visto, esperado in exemplos:
+            print(f"  dia {chave(j)}: tempo {visto}, esperado {esperado}")
+        return erradas
+    finally:
+        core.armazenamento.fechar()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leitores", type=int, default=8)
+    parser.add_argument("--dias", type=int, default=2000, help="tamanho do histórico reescrito em rodízio")
+    parser.add_argument("--duracao", type=float, default=5, help="segundos de cada fase")
+    parser.add_argument("--backends", nargs="+", default=["json", "sqlite"], choices=["json", "sqlite"])
+    args = parser.parse_args()
+
+    erradas = sum(rodar(backend, args.leitores, args.dias, args.duracao) for backend in args.backends)
+    sys.exit(1 if erradas else 0)
+
+
+if __name__ == "__main__":
+    main()
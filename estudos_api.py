@@ -0,0 +1,276 @@
+"""API HTTP/JSON local do Estudos Tracker (opcional, ativada com --api).
+
+Um servidor asyncio roda em uma thread própria, em 127.0.0.1, para que scripts e painéis
+acompanhem e controlem o timer sem depender da janela do Tk:
+
+    GET  /estado            fase, tempo restante e se o timer está rodando
+    POST /iniciar           inicia ou retoma o timer
+    POST /pausar            pausa o timer
+    POST /resetar           reseta a fase atual
+    GET  /resumo            resumo da semana atual e da passada
+    GET  /desempenho        os últimos 7 dias
+    GET  /estatisticas      estatísticas de todo o histórico
+    GET  /eventos           server-sent events com o estado a cada segundo
+
+As ações rodam na thread do Tk (pela função `executar`, como CanalUI.executar) e os
+agregados vêm de um cache que é descartado a cada gravação dos dados.
+"""
+import asyncio
+import concurrent.futures
+import json
+import threading
+from datetime import date
+from urllib.parse import urlsplit
+
+import estudos_core as core
+from estudos_estatisticas import calcular_estatisticas
+
+PORTA_PADRAO = 8765
+HOSTS_LOCAIS = ("127.0.0.1", "localhost")
+LIMITE_CABECALHO = 8 * 1024  # Bytes aceitos na linha de requisição e nos cabeçalhos
+TEMPO_LEITURA = 5  # Segundos para o cliente mandar a requisição
+INTERVALO_PING = 15  # Segundos entre comentários de keep-alive nos eventos
+
+
+def para_json(objeto):
+    return json.dumps(objeto, ensure_ascii=False, default=lambda o: o.isoformat() if isinstance(o, date) else str(o))
+
+
+class CacheAgregados:
+    """Resultados dos agregados até a próxima gravação dos dados.
+
+    A geração impede que um cálculo iniciado antes de uma gravação guarde um valor velho.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._valores = {}
+        self._geracao = 0
+        core.ao_gravar(self.invalidar)
+
+    def invalidar(self, dia=None):
+        with self._lock:
+            self._valores.clear()
+            self._geracao += 1
+
+    def obter(self, chave, calcular):
+        with self._lock:
+            if chave in self._valores:
+                return self._valores[chave]
+            geracao = self._geracao
+        valor = calcular()
+        with self._lock:
+            if geracao == self._geracao:
+                self._valores[chave] = valor
+        return valor
+
+
+class ServidorAPI:
+    """Servidor HTTP/JSON em 127.0.0.1 rodando em um loop asyncio fora da thread do Tk."""
+
+    ACOES = {"/iniciar": "iniciar", "/pausar": "pausar", "/resetar": "resetar"}
+
+    def __init__(self, timer, executar, porta=PORTA_PADRAO):
+        self.timer = timer
+        self.executar = executar  # Agenda uma função na thread do Tk
+        self.porta = porta
+        self.cache = CacheAgregados()
+        self.agregados = {
+            "/resumo": core.resumo_semana,
+            "/desempenho": core.desempenho_semanal,
+            "/estatisticas": calcular_estatisticas,
+        }
+        self.assinantes = set()  # Filas dos clientes de /eventos
+        self.conexoes = set()  # Writers abertos, fechados ao parar o servidor
+        self.tarefas = set()  # Tarefas dos clientes conectados, esperadas ao parar
+        self.pronto = threading.Event()
+        self.erro = None
+        self._loop = None
+        self._parada = None
+        self._thread = None
+
+    def iniciar(self):
+        """Sobe o servidor e espera ele abrir a porta; devolve False se não conseguiu."""
+        self._thread = threading.Thread(target=asyncio.run, args=(self._principal(),), daemon=True)
+        self._thread.start()
+        self.pronto.wait()
+        if self.erro is not None:
+            print("Erro ao iniciar a API:", self.erro)
+            return False
+        return True
+
+    def parar(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._parada.set)
+            self._thread.join(timeout=2)
+
+    async def _principal(self):
+        self._loop = asyncio.get_running_loop()
+        self._parada = asyncio.Event()
+        try:
+            servidor = await asyncio.start_server(self._atender, "127.0.0.1", self.porta)
+        except OSError as e:
+            self.erro = e
+            self.pronto.set()
+            return
+        self.porta = servidor.sockets[0].getsockname()[1]  # Útil com porta=0
+        self.pronto.set()
+
+        difusor = asyncio.create_task(self._difundir())
+        async with servidor:
+            await self._parada.wait()
+            difusor.cancel()
+            self._publicar(None)  # Encerra os clientes de /eventos, que nunca terminam sozinhos
+            for writer in list(self.conexoes):
+                writer.close()
+            if self.tarefas:
+                await asyncio.wait(self.tarefas, timeout=1)
+
+    def _publicar(self, mensagem):
+        for fila in self.assinantes:
+            if fila.full():
+                fila.get_nowait()  # Cliente lento: fica só a mensagem mais nova
+            fila.put_nowait(mensagem)
+
+    async def _difundir(self):
+        """Manda o estado aos assinantes logo após cada virada de segundo, ou quando ele muda."""
+        anterior = None
+        while True:
+            estado = self.timer.estado()
+            if self.assinantes and estado != anterior:
+                self._publicar(f"event: tick\ndata: {para_json(estado)}\n\n".encode())
+            anterior = estado  # Quem assinar depois recebe o estado atual ao conectar
+
+            if estado["executando"]:
+                restante = self.timer.prazo - core.relogio.monotonic() if self.timer.prazo is not None else 0
+                await asyncio.sleep((restante % 1) + 0.001 if restante > 0 else 0.05)
+            else:
+                await asyncio.sleep(0.25)  # Pausado: só detecta mudanças feitas na janela
+
+    async def _atender(self, reader, writer):
+        self.conexoes.add(writer)
+        self.tarefas.add(asyncio.current_task())
+        try:
+            try:
+                cabecalho = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), TEMPO_LEITURA)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                return
+            if len(cabecalho) > LIMITE_CABECALHO:
+                await self._responder(writer, 431, {"erro": "cabeçalho grande demais"})
+                return
+
+            linhas = cabecalho.decode("latin-1").split("\r\n")
+            try:
+                metodo, alvo, _ = linhas[0].split(" ", 2)
+            except ValueError:
+                await self._responder(writer, 400, {"erro": "requisição inválida"})
+                return
+            cabecalhos = {}
+            for linha in linhas[1:]:
+                nome, _, valor = linha.partition(":")
+                cabecalhos[nome.strip().lower()] = valor.strip()
+
+            tamanho = cabecalhos.get("content-length", "0")
+            if not tamanho.isdigit():
+                await self._responder(writer, 400, {"erro": "Content-Length inválido"})
+                return
+            tamanho = int(tamanho)
+            if tamanho:
+                await reader.readexactly(min(tamanho, LIMITE_CABECALHO))  # O corpo não é usado
+
+            if not self._origem_local(cabecalhos):
+                await self._responder(writer, 403, {"erro": "apenas clientes locais"})
+                return
+            await self._rotear(metodo, urlsplit(alvo).path.rstrip("/") or "/", writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.conexoes.discard(writer)
+            self.tarefas.discard(asyncio.current_task())
+            writer.close()
+
+    def _origem_local(self, cabecalhos):
+        # Bloqueia páginas de outros sites (Origin) e DNS rebinding (Host)
+        host = urlsplit("//" + cabecalhos.get("host", "")).hostname
+        if host not in HOSTS_LOCAIS:
+            return False
+        origem = cabecalhos.get("origin")
+        return origem is None or urlsplit(origem).hostname in HOSTS_LOCAIS
+
+    async def _rotear(self, metodo, caminho, writer):
+        if caminho == "/estado" and metodo == "GET":
+            await self._responder(writer, 200, self.timer.estado())
+        elif caminho in self.ACOES and metodo == "POST":
+            try:
+                await self._acao(self.ACOES[caminho])
+            except asyncio.TimeoutError:
+                await self._responder(writer, 503, {"erro": "a janela não respondeu"})
+                return
+            await self._responder(writer, 200, self.timer.estado())
+        elif caminho in self.agregados and metodo == "GET":
+            funcao = self.agregados[caminho]
+            chave = (caminho, core.relogio.hoje())  # A virada do dia muda a semana
+            corpo = await self._loop.run_in_executor(None, self.cache.obter, chave, lambda: para_json(funcao()))
+            await self._responder(writer, 200, corpo)
+        elif caminho == "/eventos" and metodo == "GET":
+            await self._eventos(writer)
+        elif caminho in self.ACOES or caminho in self.agregados or caminho in ("/estado", "/eventos"):
+            await self._responder(writer, 405, {"erro": "método não permitido"})
+        else:
+            await self._responder(writer, 404, {"erro": "caminho desconhecido"})
+
+    async def _acao(self, nome):
+        """Roda `timer.<nome>()` na thread do Tk e espera terminar."""
+        futuro = concurrent.futures.Future()
+
+        def rodar():
+            try:
+                getattr(self.timer, nome)()
+            except Exception as e:
+                futuro.set_exception(e)
+            else:
+                futuro.set_result(None)
+
+        self.executar(rodar)
+        await asyncio.wait_for(asyncio.wrap_future(futuro), TEMPO_LEITURA)
+
+    async def _responder(self, writer, status, corpo):
+        """Responde com `corpo` em JSON; strings são enviadas como já serializadas."""
+        dados = (corpo if isinstance(corpo, str) else para_json(corpo)).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {self._motivo(status)}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(dados)}\r\n"
+            "Connection: close\r\n\r\n".encode() + dados
+        )
+        await writer.drain()
+
+    @staticmethod
+    def _motivo(status):
+        return {
+            200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+            405: "Method Not Allowed", 431: "Request Header Fields Too Large", 503: "Service Unavailable",
+        }.get(status, "")
+
+    async def _eventos(self, writer):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        fila = asyncio.Queue(maxsize=1)
+        fila.put_nowait(f"event: tick\ndata: {para_json(self.timer.estado())}\n\n".encode())
+        self.assinantes.add(fila)
+        try:
+            while True:
+                try:
+                    mensagem = await asyncio.wait_for(fila.get(), INTERVALO_PING)
+                except asyncio.TimeoutError:
+                    mensagem = b": ping\n\n"  # Descobre clientes que já foram embora
+                if mensagem is None:
+                    return  # Servidor parando
+                writer.write(mensagem)
+                await writer.drain()
+        finally:
+            self.assinantes.discard(fila)
@@ -0,0 +1,2152 @@
+"""Núcleo do Estudos Tracker, sem dependência de interface gráfica.
+
+Reúne a persistência, o índice do histórico, o alarme, o temporizador Pomodoro e os
+cálculos exibidos pelas janelas. Pode ser importado sem display, por scripts e benchmarks.
+"""
+import time
+import json
+import atexit
+import os
+import sys
+import threading
+import collections
+import contextlib
+import math
+import calendar
+import random
+import sqlite3
+import struct
+import mmap
+import bisect
+import heapq
+import re
+from array import array
+from itertools import islice
+from collections.abc import MutableMapping
+from datetime import date, datetime, timedelta
+
+# Define o caminho dos arquivos
+if getattr(sys, 'frozen', False):  # Verifica se está rodando como executável
+    BASE_PATH = sys._MEIPASS  # Diretório temporário onde os arquivos são extraídos
+else:
+    BASE_PATH = os.path.dirname(os.path.abspath(__file__))  # Diretório do script
+
+ALARME_SOM = os.path.join(BASE_PATH, "alarme.mp3")
+# Sons opcionais por fase; na falta de um deles é usado o ALARME_SOM
+ALARMES = {tipo: os.path.join(BASE_PATH, f"alarme_{tipo}.mp3") for tipo in ("foco", "pausa", "pausa_longa")}
+
+# Define o caminho para o diretório de dados do usuário
+if sys.platform == "win32":
+    DATA_DIR = os.path.join(os.getenv("APPDATA"), "EstudosTracker")
+else:
+    DATA_DIR = os.path.join(os.path.expanduser("~"), ".estudos_tracker")
+
+DADOS_ARQUIVO = os.path.join(DATA_DIR, "dados_estudo.json")
+JOURNAL_ARQUIVO = os.path.join(DATA_DIR, "dados_estudo.journal")
+JOURNAL_ANTIGO = JOURNAL_ARQUIVO + ".old"  # Journal sendo incorporado por uma compactação
+JOURNAL_LIMITE = 256 * 1024  # Tamanho (bytes) a partir do qual o journal é compactado
+GERACAO_ARQUIVO = os.path.join(DATA_DIR, "dados_estudo.geracao")  # Contador de compactações, para leitores
+ESPERA_LEITURA = 2.0  # Segundos que um leitor de outro processo espera uma compactação terminar
+ESPERA_ARQUIVO_ABERTO = 1.0  # Segundos insistindo em trocar um arquivo que um leitor tem aberto (Windows)
+SQLITE_ARQUIVO = os.path.join(DATA_DIR, "dados_estudo.db")
+SESSOES_ARQUIVO = os.path.join(DATA_DIR, "sessoes.bin")  # Log de eventos do timer
+
+# Perfis de estudo: cada um tem os próprios arquivos acima, em um diretório separado
+PERFIL_PADRAO = "principal"  # Usa os arquivos direto no DATA_DIR, como antes dos perfis
+PERFIL_ATIVO = PERFIL_PADRAO
+PERFIS_DIR = os.path.join(DATA_DIR, "perfis")  # Um subdiretório por perfil além do padrão
+PERFIS_ARQUIVO = os.path.join(DATA_DIR, "perfis.json")  # Guarda o último perfil usado
+
+# Backend de armazenamento: "json" (padrão) ou "sqlite"
+BACKEND_DADOS = os.environ.get("ESTUDOS_TRACKER_BACKEND", "json")
+# Segundos que o gravador espera para juntar alterações antes de escrever no disco
+JANELA_GRAVACAO = float(os.environ.get("ESTUDOS_TRACKER_JANELA_GRAVACAO", "1.0"))
+
+
+def definir_diretorio_dados(caminho):
+    """Aponta os arquivos de dados para `caminho`; o diretório é criado ao carregar."""
+    global DATA_DIR, PERFIS_DIR, PERFIS_ARQUIVO
+    gravador.descarregar()  # As pendências são do diretório anterior
+    DATA_DIR = caminho
+    PERFIS_DIR = os.path.join(DATA_DIR, "perfis")
+    PERFIS_ARQUIVO = os.path.join(DATA_DIR, "perfis.json")
+    _apontar_arquivos()
+
+def _apontar_arquivos():
+    global DADOS_ARQUIVO, JOURNAL_ARQUIVO, JOURNAL_ANTIGO, GERACAO_ARQUIVO, SQLITE_ARQUIVO, SESSOES_ARQUIVO
+    pasta = diretorio_perfil(PERFIL_ATIVO)
+    DADOS_ARQUIVO, JOURNAL_ARQUIVO, JOURNAL_ANTIGO, GERACAO_ARQUIVO = arquivos_json(pasta)
+    SQLITE_ARQUIVO = os.path.join(pasta, "dados_estudo.db")
+    SESSOES_ARQUIVO = os.path.join(pasta, "sessoes.bin")
+
+def arquivos_json(pasta=None):
+    """Snapshot, journal, journal antigo e contador de compactações de `pasta` (por padrão, do perfil ativo)."""
+    if pasta is None:
+        return DADOS_ARQUIVO, JOURNAL_ARQUIVO, JOURNAL_ANTIGO, GERACAO_ARQUIVO
+    journal = os.path.join(pasta, "dados_estudo.journal")
+    return os.path.join(pasta, "dados_estudo.json"), journal, journal + ".old", os.path.join(pasta, "dados_estudo.geracao")
+
+def diretorio_perfil(nome):
+    """Diretório dos arquivos do perfil `nome`; o perfil padrão usa o próprio DATA_DIR."""
+    return DATA_DIR if nome == PERFIL_PADRAO else os.path.join(PERFIS_DIR, nome)
+
+def validar_nome_perfil(nome):
+    """O nome sem espaços nas pontas; ValueError se não servir como nome de diretório."""
+    nome = nome.strip()
+    if not re.fullmatch(r"\w[\w .-]{0,39}", nome) or nome.endswith("."):
+        raise ValueError("Use até 40 letras, números, espaços, pontos, hífens ou sublinhados.")
+    return nome
+
+def listar_perfis():
+    """Nomes dos perfis existentes, com o padrão primeiro; só lista diretórios, não lê dados."""
+    try:
+        outros = sorted(e.name for e in os.scandir(PERFIS_DIR) if e.is_dir())
+    except FileNotFoundError:
+        outros = []
+    return [PERFIL_PADRAO] + [nome for nome in outros if nome != PERFIL_PADRAO]
+
+def perfil_salvo():
+    """O último perfil escolhido na interface (o padrão, se nenhum ou se ele sumiu)."""
+    try:
+        with open(PERFIS_ARQUIVO, "r", encoding="utf-8") as f:
+            nome = json.load(f).get("ativo", PERFIL_PADRAO)
+    except (OSError, ValueError, AttributeError):
+        return PERFIL_PADRAO
+    return nome if os.path.isdir(diretorio_perfil(nome)) else PERFIL_PADRAO
+
+def perfil_em_uso():
+    return PERFIL_ATIVO
+
+def definir_perfil(nome):
+    """Aponta os arquivos de dados para o perfil `nome`; chame antes de carregar_dados."""
+    global PERFIL_ATIVO
+    gravador.descarregar()  # As pendências são do perfil anterior
+    PERFIL_ATIVO = validar_nome_perfil(nome)
+    _apontar_arquivos()
+
+class PerfilInicializacao:
+    """Mede a duração de cada fase da inicialização (ativado com --profile-startup)."""
+
+    def __init__(self):
+        self.ativo = False
+        self.fases = []  # (fase, segundos)
+        self.inicio = self._ultima_marca = time.perf_counter()  # O GUI usa o início das importações
+
+    def registrar(self, fase, segundos):
+        if self.ativo:
+            self.fases.append((fase, segundos))
+
+    def marcar(self, fase):
+        """Registra o tempo desde a marca anterior como a duração de `fase`."""
+        agora = time.perf_counter()
+        self.registrar(fase, agora - self._ultima_marca)
+        self._ultima_marca = agora
+
+    @contextlib.contextmanager
+    def medir(self, fase):
+        """Mede um bloco independente das marcas, como o aquecimento em segundo plano."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(fase, time.perf_counter() - inicio)
+
+    def relatorio(self):
+        if not self.ativo:
+            return
+        linhas = [f"{fase:<30} {segundos * 1000:8.1f} ms" for fase, segundos in self.fases]
+        linhas.append(f"{'total':<30} {(time.perf_counter() - self.inicio) * 1000:8.1f} ms")
+        texto = "\n".join(linhas)
+        print(texto)
+
+        # Com o executável sem console, o relatório também vai para um arquivo
+        with open(os.path.join(DATA_DIR, "perfil_inicializacao.log"), "a", encoding="utf-8") as f:
+            f.write(f"# {datetime.now():%Y-%m-%d %H:%M:%S}\n{texto}\n")
+
+
+perfil = PerfilInicializacao()
+
+
+class Metricas:
+    """Amostras recentes dos caminhos quentes, em buffers circulares de tamanho fixo.
+
+    Desligadas, `registrar` só consulta `ativo`; quem precisa de trabalho extra para obter
+    o valor (contar bytes, widgets) testa `metricas.ativo` antes.
+    """
+
+    TAMANHO = 512  # Amostras guardadas por métrica
+
+    def __init__(self, ativo=False):
+        self.ativo = ativo
+        self._series = {}  # nome -> deque de (time.time(), valor)
+        self._lock = threading.Lock()
+
+    def registrar(self, nome, valor):
+        if not self.ativo:
+            return
+        serie = self._series.get(nome)
+        if serie is None:
+            with self._lock:
+                serie = self._series.setdefault(nome, collections.deque(maxlen=self.TAMANHO))
+        serie.append((time.time(), valor))
+
+    def limpar(self):
+        with self._lock:
+            self._series = {}
+
+    def amostras(self):
+        with self._lock:
+            return {nome: list(serie) for nome, serie in self._series.items()}
+
+    def resumo(self):
+        """Por métrica: quantidade, último valor, média, p50, p95 e máximo das amostras guardadas."""
+        resultado = {}
+        for nome, amostras in sorted(self.amostras().items()):
+            if not amostras:
+                continue
+            valores = sorted(valor for _, valor in amostras)
+            resultado[nome] = {
+                "n": len(valores),
+                "ultimo": amostras[-1][1],
+                "media": sum(valores) / len(valores),
+                "p50": valores[len(valores) // 2],
+                "p95": valores[min(len(valores) - 1, len(valores) * 95 // 100)],
+                "maximo": valores[-1],
+            }
+        return resultado
+
+    def exportar(self, caminho):
+        """Grava o resumo e todas as amostras em JSON."""
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({
+                "gerado_em": datetime.now().isoformat(timespec="seconds"),
+                "backend": BACKEND_DADOS,
+                "resumo": self.resumo(),
+                "amostras": self.amostras(),
+            }, f, indent=4, ensure_ascii=False)
+
+
+metricas = Metricas(ativo=os.environ.get("ESTUDOS_TRACKER_METRICAS") == "1")
+
+
+class Relogio:
+    """O relógio do timer, da data dos dias e do log de sessões: o do sistema.
+
+    Simulações trocam por um RelogioVirtual com definir_relogio, sem mudar quem o usa.
+    """
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def time(self):
+        return time.time()
+
+    def agora(self):
+        return datetime.now()
+
+    def hoje(self):
+        return date.today()
+
+
+class RelogioVirtual(Relogio):
+    """Relógio simulado que também é o agendador (after/after_cancel) do PomodoroTimer.
+
+    O tempo só anda com `avancar`: os agendamentos vencidos rodam em ordem, cada um com o
+    relógio no instante em que venceu, então meses de ciclos rodam em segundos.
+    """
+
+    def __init__(self, inicio):
+        self.inicio = inicio  # datetime correspondente ao instante 0
+        self._instante = 0.0  # Segundos simulados desde `inicio`
+        self._agenda = []  # Heap de (instante, id, função, args)
+        self._cancelados = set()
+        self._proximo_id = 0
+
+    def monotonic(self):
+        return self._instante
+
+    def time(self):
+        return self.inicio.timestamp() + self._instante
+
+    def agora(self):
+        return self.inicio + timedelta(seconds=self._instante)
+
+    def hoje(self):
+        return self.agora().date()
+
+    def after(self, ms, funcao, *args):
+        self._proximo_id += 1
+        heapq.heappush(self._agenda, (self._instante + ms / 1000, self._proximo_id, funcao, args))
+        return self._proximo_id
+
+    def after_cancel(self, identificador):
+        self._cancelados.add(identificador)
+
+    def avancar(self, segundos):
+        """Anda `segundos` simulados, rodando os agendamentos que vencerem; devolve quantos rodaram."""
+        fim = self._instante + segundos
+        rodados = 0
+        while self._agenda and self._agenda[0][0] <= fim:
+            instante, identificador, funcao, args = heapq.heappop(self._agenda)
+            if identificador in self._cancelados:
+                self._cancelados.discard(identificador)
+                continue
+            self._instante = max(self._instante, instante)
+            funcao(*args)
+            rodados += 1
+        self._instante = fim
+        return rodados
+
+    def avancar_ate(self, momento):
+        """Anda até o datetime `momento` (nada, se ele já passou)."""
+        return self.avancar(max((momento - self.agora()).total_seconds(), 0))
+
+
+relogio = Relogio()
+
+def definir_relogio(novo):
+    """Troca o relógio usado pelo timer, pelas datas dos dias e pelo log de sessões."""
+    global relogio
+    relogio = novo
+
+TEMPO_PADRAO = {
+    "foco": 25 * 60,
+    "pausa": 5 * 60,
+    "pausa_longa": 15 * 60,
+    "meta_semanal": 10 * 60 * 60
+}
+
+VERSAO_ESQUEMA = 2  # Versão do formato dos dias, gravada em dados["versao"]
+
+def dados_padrao():
+    """Os dados de um perfil novo."""
+    return {
+        "dias": {},
+        "tempos": dict(TEMPO_PADRAO),
+        "ciclos": 0,
+        "versao": VERSAO_ESQUEMA
+    }
+
+dados = dados_padrao()
+
+EPOCA = date(1970, 1, 1).toordinal()
+
+def dia_epoca(data):
+    """Converte uma data (ou string "%Y-%m-%d") no número de dias desde 1970-01-01."""
+    if isinstance(data, str):
+        data = date.fromisoformat(data)
+    return data.toordinal() - EPOCA
+
+def data_epoca(dia):
+    """Inverso de dia_epoca: o dia da época como string "%Y-%m-%d"."""
+    return date.fromordinal(dia + EPOCA).isoformat()
+
+
+MIGRACOES = {}  # Versão de origem -> função que converte um dia dessa versão para a seguinte
+
+def migracao(origem):
+    """Registra a função que converte um dia da versão `origem` para a versão seguinte.
+
+    As migrações precisam ser idempotentes: um dia já convertido pode passar de novo por
+    elas, como as alterações do journal gravadas enquanto a migração não tinha terminado.
+    """
+    def registrar(funcao):
+        MIGRACOES[origem] = funcao
+        return funcao
+    return registrar
+
+def migrar_registro(registro, versao):
+    """O dia `registro`, gravado na versão `versao`, convertido para VERSAO_ESQUEMA."""
+    while versao < VERSAO_ESQUEMA:
+        registro = MIGRACOES[versao](dict(registro))
+        versao += 1
+    return registro
+
+ESTADOS_ANTIGOS = {"": "-", "Nao Estudado": "Não Estudado"}
+
+@migracao(1)
+def _normalizar_dia(registro):
+    """1 -> 2: tempo em segundos inteiros e não negativos; estado sem espaços nem grafias antigas."""
+    try:
+        tempo = round(float(registro.get("tempo") or 0))
+    except (TypeError, ValueError, OverflowError):
+        tempo = 0  # Editado à mão com um valor que não é número
+    estado = str(registro.get("estado") or "-").strip()
+    registro["tempo"] = max(tempo, 0)
+    registro["estado"] = ESTADOS_ANTIGOS.get(estado, estado)
+    return registro
+
+
+class RegistroDia(MutableMapping):
+    """Visão tipo dict de um dia em DiasCompactos; as alterações vão direto para as colunas."""
+
+    __slots__ = ("_dias", "_dia")
+
+    def __init__(self, dias, dia):
+        self._dias = dias
+        self._dia = dia
+
+    def __getitem__(self, chave):
+        return self._dias._ler(self._dia, chave)
+
+    def __setitem__(self, chave, valor):
+        self._dias._escrever(self._dia, chave, valor)
+
+    def __delitem__(self, chave):
+        if chave in ("estado", "tempo"):
+            raise KeyError(f"{chave!r} é obrigatório em um dia")
+        del self._dias._extras[self._dia][chave]
+
+    def __iter__(self):
+        yield "estado"
+        yield "tempo"
+        yield from self._dias._extras.get(self._dia, ())
+
+    def __len__(self):
+        return 2 + len(self._dias._extras.get(self._dia, ()))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class DiasCompactos(MutableMapping):
+    """`dados["dias"]` guardado em colunas `array` indexadas pelo dia da época.
+
+    Cada dia ocupa 4 bytes de tempo e 1 byte com o código do estado, em vez de um dict
+    com strings. Para o resto do código continua sendo um dict de "%Y-%m-%d" para
+    {"estado", "tempo"}; campos além desses dois ficam em `_extras`.
+
+    Registros de uma versão antiga do esquema ficam como vieram do arquivo, em
+    `_pendentes`, e só são migrados e passados para as colunas quando lidos (ou em
+    lotes, por migrar_lote), para a carga de um arquivo antigo não esperar a migração.
+    """
+
+    ESTADOS = ("-", "Estudado", "Falhei", "Não Estudado")
+
+    def __init__(self, registros=(), versao=VERSAO_ESQUEMA):
+        self._lock = threading.RLock()  # Crescer as colunas não pode intercalar com leituras
+        self._inicio = 0  # Dia da época da posição 0
+        self._tempos = array("i")
+        self._codigos = array("B")  # 0 = sem registro; n = self._estados[n - 1]
+        self._estados = list(self.ESTADOS)
+        self._codigo_estado = {estado: i + 1 for i, estado in enumerate(self._estados)}
+        self._extras = {}  # dia da época -> campos além de "estado" e "tempo"
+        self._quantidade = 0
+        self._pendentes = {}  # "%Y-%m-%d" -> registro ainda na versão `self._versao_pendentes`
+        self._versao_pendentes = versao
+        if versao < VERSAO_ESQUEMA:
+            self._pendentes = dict(registros)
+            registros = ()
+
+        # Carga em lote: converte as datas, aloca as colunas uma vez e as preenche
+        dias = []
+        validos = []
+        for data, registro in dict(registros).items():
+            try:
+                dias.append(date.fromisoformat(data).toordinal() - EPOCA)
+            except (TypeError, ValueError):
+                print("Dia com data inválida ignorado:", data)
+                continue
+            validos.append(registro)
+        if dias:
+            self._posicao(min(dias), criar=True)
+            self._posicao(max(dias), criar=True)
+
+        inicio, tempos, codigos = self._inicio, self._tempos, self._codigos
+        for dia, registro in zip(dias, validos):
+            i = dia - inicio
+            try:
+                tempos[i] = int(registro.get("tempo", 0))  # 7200.0 vem de arquivos editados à mão
+            except (TypeError, ValueError, OverflowError):
+                print("Dia com tempo inválido ignorado:", data_epoca(dia))
+                continue
+            if not codigos[i]:
+                self._quantidade += 1
+            codigos[i] = self._codigo(registro.get("estado", "-"))
+            if len(registro) > 2 or "estado" not in registro or "tempo" not in registro:
+                extras = {k: v for k, v in registro.items() if k not in ("estado", "tempo")}
+                if extras:
+                    self._extras[dia] = extras
+
+    def _posicao(self, dia, criar=False):
+        i = dia - self._inicio
+        if 0 <= i < len(self._codigos):
+            return i
+        if not criar:
+            return None
+
+        # Cresce com folga proporcional ao tamanho, para o custo amortizado ser O(1)
+        folga = max(len(self._codigos) // 2, 64)
+        if not self._codigos:
+            self._inicio = dia - folga // 2
+        if dia < self._inicio:
+            extra = self._inicio - dia + folga
+            self._tempos = array("i", bytes(extra * self._tempos.itemsize)) + self._tempos
+            self._codigos = array("B", bytes(extra)) + self._codigos
+            self._inicio -= extra
+        else:
+            extra = dia - self._inicio - len(self._codigos) + 1 + folga
+            self._tempos.frombytes(bytes(extra * self._tempos.itemsize))
+            self._codigos.frombytes(bytes(extra))
+        return dia - self._inicio
+
+    def _codigo(self, estado):
+        if estado not in self._codigo_estado:
+            # Estados desconhecidos (p. ex. editados à mão) ganham um código novo
+            self._estados.append(estado)
+            self._codigo_estado[estado] = len(self._estados)
+        return self._codigo_estado[estado]
+
+    def _ler(self, dia, chave):
+        with self._lock:
+            i = self._posicao(dia)
+            if i is None or not self._codigos[i]:
+                raise KeyError(chave)
+            if chave == "estado":
+                return self._estados[self._codigos[i] - 1]
+            if chave == "tempo":
+                return self._tempos[i]
+            extras = self._extras.get(dia, {})
+            if chave not in extras:
+                raise KeyError(chave)
+            return extras[chave]
+
+    def _escrever(self, dia, chave, valor):
+        if chave == "tempo":
+            valor = int(valor)
+        with self._lock:
+            i = self._posicao(dia, criar=True)
+            if chave == "tempo":
+                self._tempos[i] = valor  # Antes do estado: um OverflowError não deixa um dia fantasma
+            if not self._codigos[i]:
+                self._codigos[i] = self._codigo("-")
+                self._quantidade += 1
+            if chave == "estado":
+                self._codigos[i] = self._codigo(valor)
+            elif chave != "tempo":
+                self._extras.setdefault(dia, {})[chave] = valor
+
+    def _migrar(self, data):
+        """Passa o registro pendente de `data`, se houver, para o esquema atual e para as colunas."""
+        with self._lock:
+            registro = self._pendentes.pop(data, None)
+            if registro is None:
+                return
+            try:
+                self[data] = migrar_registro(registro, self._versao_pendentes)
+            except (TypeError, ValueError):
+                print("Dia inválido ignorado:", data)
+
+    def migrar_lote(self, quantidade=500):
+        """Migra até `quantidade` registros pendentes; devolve quantos migrou."""
+        with self._lock:
+            datas = list(islice(self._pendentes, quantidade))
+            for data in datas:
+                self._migrar(data)
+        return len(datas)
+
+    def migrar_tudo(self):
+        with self._lock:
+            self.migrar_lote(len(self._pendentes))
+
+    def __getitem__(self, data):
+        if self._pendentes:
+            self._migrar(data)
+        try:
+            dia = dia_epoca(data)
+        except (TypeError, ValueError):
+            raise KeyError(data) from None
+        with self._lock:
+            i = self._posicao(dia)
+            if i is None or not self._codigos[i]:
+                raise KeyError(data)
+        return RegistroDia(self, dia)
+
+    def __setitem__(self, data, registro):
+        registro = dict(registro)  # Pode ser a visão de outro dia
+        tempo = int(registro.pop("tempo", 0))
+        dia = dia_epoca(data)
+        with self._lock:
+            i = self._posicao(dia, criar=True)
+            self._tempos[i] = tempo  # Antes do estado: um OverflowError não deixa um dia fantasma
+            self._pendentes.pop(data, None)  # A versão nova substitui a antiga
+            if not self._codigos[i]:
+                self._quantidade += 1
+            self._codigos[i] = self._codigo(registro.pop("estado", "-"))
+            if registro:
+                self._extras[dia] = registro
+            else:
+                self._extras.pop(dia, None)
+
+    def __delitem__(self, data):
+        dia = dia_epoca(data)
+        with self._lock:
+            if self._pendentes.pop(data, None) is not None:
+                return
+            i = self._posicao(dia)
+            if i is None or not self._codigos[i]:
+                raise KeyError(data)
+            self._codigos[i] = 0
+            self._tempos[i] = 0
+            self._extras.pop(dia, None)
+            self._quantidade -= 1
+
+    def __contains__(self, data):
+        if data in self._pendentes:
+            return True
+        try:
+            dia = dia_epoca(data)
+        except (TypeError, ValueError):
+            return False
+        with self._lock:
+            i = self._posicao(dia)
+            return i is not None and self._codigos[i] != 0
+
+    def __iter__(self):
+        with self._lock:
+            self.migrar_tudo()
+            dias = [self._inicio + i for i, codigo in enumerate(self._codigos) if codigo]
+        return (data_epoca(dia) for dia in dias)
+
+    def __len__(self):
+        return self._quantidade + len(self._pendentes)
+
+    def setdefault(self, data, padrao=None):
+        # O padrão do MutableMapping devolveria o dict recebido, não a visão gravada
+        if data not in self:
+            self[data] = padrao
+        return self[data]
+
+    def registros_por_epoca(self):
+        """Lista de (dia da época, tempo, estado) lida direto das colunas."""
+        with self._lock:
+            self.migrar_tudo()
+            return [
+                (self._inicio + i, self._tempos[i], self._estados[codigo - 1])
+                for i, codigo in enumerate(self._codigos) if codigo
+            ]
+
+    def ultimo_dia(self):
+        """A data ("%Y-%m-%d") mais recente com registro, ou None."""
+        with self._lock:
+            # Os pendentes não precisam ser migrados: as chaves já são as datas
+            ultimo = max(self._pendentes, default=None)
+            for i in range(len(self._codigos) - 1, -1, -1):
+                if self._codigos[i]:
+                    return max(d for d in (data_epoca(self._inicio + i), ultimo) if d is not None)
+        return ultimo
+
+    def primeiro_dia(self):
+        """A data ("%Y-%m-%d") mais antiga com registro, ou None."""
+        with self._lock:
+            primeiro = min(self._pendentes, default=None)
+            for i, codigo in enumerate(self._codigos):
+                if codigo:
+                    return min(d for d in (data_epoca(self._inicio + i), primeiro) if d is not None)
+        return primeiro
+
+    def colunas(self):
+        """Cópia das colunas: (dia da época da posição 0, tempos, códigos, estados).
+
+        O código 0 indica dia sem registro e o código n é o estado `estados[n - 1]`.
+        """
+        with self._lock:
+            self.migrar_tudo()
+            return self._inicio, self._tempos[:], self._codigos[:], tuple(self._estados)
+
+    def para_dict(self):
+        """Cópia em dicts comuns, pronta para serializar."""
+        with self._lock:
+            self.migrar_tudo()
+            resultado = {}
+            for i, codigo in enumerate(self._codigos):
+                if codigo:
+                    dia = self._inicio + i
+                    registro = {"estado": self._estados[codigo - 1], "tempo": self._tempos[i]}
+                    registro.update(self._extras.get(dia, ()))
+                    resultado[data_epoca(dia)] = registro
+            return resultado
+
+
+def registros_journal(caminho):
+    """Gera os registros de um journal; sem o arquivo, nenhum."""
+    try:
+        f = open(caminho, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return  # Também quando uma compactação acabou de girá-lo, entre a listagem e a abertura
+    with f:
+        for linha in f:
+            try:
+                yield json.loads(linha)
+            except ValueError:
+                continue  # Última linha truncada por uma queda (ou ainda sendo escrita)
+
+
+def anexar_journal(origem, destino):
+    """Acrescenta os registros do journal `origem` ao fim do journal `destino`."""
+    with open(origem, "rb") as f:
+        conteudo = f.read()
+    with open(destino, "ab+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                conteudo = b"\n" + conteudo  # Não emenda na última linha truncada por uma queda
+        f.write(conteudo)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def insistir_se_aberto(funcao, *args, espera=None):
+    """Chama `funcao(*args)` (os.replace, os.remove) de novo enquanto der PermissionError.
+
+    No Windows o open() do Python não deixa apagar nem substituir um arquivo aberto, então um
+    leitor de ler_dados_consistentes faz a troca do snapshot ou do journal falhar por alguns
+    milissegundos; em vez de falhar a compactação, espera o leitor fechar o arquivo.
+    """
+    prazo = time.monotonic() + (ESPERA_ARQUIVO_ABERTO if espera is None else espera)
+    pausa = 0.001
+    while True:
+        try:
+            return funcao(*args)
+        except PermissionError:
+            if time.monotonic() > prazo:
+                raise
+            time.sleep(pausa)
+            pausa = min(pausa * 2, 0.05)
+
+
+def ler_geracao(caminho):
+    """O contador de compactações em `caminho`; 0 se ainda não existe."""
+    try:
+        with open(caminho, "rb") as f:
+            conteudo = f.read(8)
+    except FileNotFoundError:
+        return 0
+    return struct.unpack("<Q", conteudo)[0] if len(conteudo) == 8 else 0
+
+
+def escrever_geracao(caminho, valor):
+    # Sobrescreve os 8 bytes no lugar: o arquivo nunca fica vazio nem é trocado
+    descritor = os.open(caminho, os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        os.write(descritor, struct.pack("<Q", valor))
+    finally:
+        os.close(descritor)
+
+
+class ArmazenamentoJSON:
+    """Snapshot em JSON mais um journal de alterações (backend padrão).
+
+    Só a compactação troca o snapshot e gira o journal; ela deixa o contador do
+    GERACAO_ARQUIVO ímpar enquanto isso e par ao terminar, como um seqlock. Leitores de
+    outros processos (ler_dados_consistentes) releem se o contador mudou durante a leitura,
+    sem travar nada, então o aplicativo nunca espera por eles. Os appends no journal não
+    mexem no contador: quem lê no meio de um vê um prefixo, e a linha incompleta é pulada.
+    """
+
+    def __init__(self):
+        self._lock_journal = threading.Lock()  # Serializa as escritas no journal
+        self._lock_compactacao = threading.Lock()  # Impede duas compactações simultâneas
+        self._versao = VERSAO_ESQUEMA  # Versão do snapshot carregado
+        self._compactacao = None  # Thread da última compactação em segundo plano
+
+    def _aplicar_registro(self, registro, destino):
+        """Aplica um registro do journal sobre `destino`."""
+        if "dia" in registro:
+            # O journal pode ter sido escrito por uma versão anterior do aplicativo
+            destino["dias"][registro["dia"]] = migrar_registro(registro["valor"], self._versao)
+        elif "semana" in registro:
+            destino.setdefault("semanas", {})[registro["semana"]] = registro["valor"]
+        else:
+            destino.update(registro)  # Configurações: {"tempos": ...}, {"ciclos": ...}, ...
+
+    def _reaplicar_journal(self, caminho, destino):
+        for registro in registros_journal(caminho):
+            self._aplicar_registro(registro, destino)
+
+    def carregar(self, destino=None, pasta=None):
+        """Carrega os arquivos de `pasta` (por padrão, do perfil ativo) em `destino` (por padrão, `dados`)."""
+        destino = dados if destino is None else destino
+        caminhos = arquivos_json(pasta)
+        dados_arquivo, journal, journal_antigo, geracao_arquivo = caminhos
+        novo = not os.path.exists(dados_arquivo)
+        self._versao = VERSAO_ESQUEMA
+        geracao = ler_geracao(geracao_arquivo)
+        if geracao % 2:
+            escrever_geracao(geracao_arquivo, geracao + 1)  # Compactação interrompida por uma queda
+        if not novo:
+            with open(dados_arquivo, "r", encoding="utf-8") as f:
+                arquivo = json.load(f)
+            self._versao = arquivo.get("versao", 1)  # Arquivos de antes do versionamento
+            destino.update(arquivo)
+        destino["versao"] = self._versao
+        destino["dias"] = DiasCompactos(destino["dias"], versao=self._versao)
+        if novo:
+            self.compactar(caminhos, destino)  # Cria o arquivo com os dados padrão
+
+        # Os registros carregam o valor completo, então reaplicá-los é idempotente
+        interrompida = os.path.exists(journal_antigo)
+        self._reaplicar_journal(journal_antigo, destino)
+        self._reaplicar_journal(journal, destino)
+        if interrompida:
+            # Uma compactação foi interrompida: conclui antes de girar o journal de novo
+            self.compactar(caminhos, destino)
+
+    def compactar(self, caminhos=None, origem=None):
+        """Grava um snapshot completo e descarta o journal já incorporado a ele; devolve o tamanho em bytes.
+
+        `caminhos` (de arquivos_json) são os do perfil em que a compactação foi pedida: uma
+        compactação em segundo plano não pode seguir os arquivos de um perfil trocado depois.
+        """
+        dados_arquivo, journal, journal_antigo, geracao_arquivo = caminhos or arquivos_json()
+        origem = dados if origem is None else origem
+        with self._lock_compactacao:
+            geracao = ler_geracao(geracao_arquivo)
+            geracao += geracao % 2
+            escrever_geracao(geracao_arquivo, geracao + 1)  # Ímpar: os leitores esperam ou releem
+            try:
+                with self._lock_journal:
+                    copia = dict(origem)
+                    copia["dias"] = origem["dias"].para_dict()
+                    if os.path.exists(journal_antigo) and os.path.exists(journal):
+                        # Uma compactação anterior falhou antes de apagar o journal antigo: os
+                        # registros dele ainda não estão no snapshot, então junta em vez de trocar
+                        anexar_journal(journal, journal_antigo)
+                        insistir_se_aberto(os.remove, journal)
+                    elif os.path.exists(journal):
+                        insistir_se_aberto(os.replace, journal, journal_antigo)
+
+                # Escreve em um arquivo temporário para nunca deixar o snapshot truncado
+                temporario = dados_arquivo + ".tmp"
+                with open(temporario, "w", encoding="utf-8") as f:
+                    json.dump(copia, f, indent=4, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                insistir_se_aberto(os.replace, temporario, dados_arquivo)
+
+                if os.path.exists(journal_antigo):
+                    insistir_se_aberto(os.remove, journal_antigo)
+            finally:
+                escrever_geracao(geracao_arquivo, geracao + 2)
+            return os.path.getsize(dados_arquivo)
+
+    def salvar(self, dias=(), config=(), semanas=()):
+        """Acrescenta os itens ao journal (sem itens, compacta); devolve os bytes gravados."""
+        registros = [{"dia": dia, "valor": dict(dados["dias"][dia])} for dia in dias]
+        registros.extend({chave: dados[chave]} for chave in config if chave in dados)
+        salvas = dados.get("semanas", {})
+        registros.extend({"semana": chave, "valor": salvas[chave]} for chave in semanas if chave in salvas)
+        if not registros:
+            return self.compactar()
+
+        linhas = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in registros).encode("utf-8")
+        caminhos = arquivos_json()
+        with self._lock_journal:
+            with open(caminhos[1], "ab") as f:
+                f.write(linhas)
+                f.flush()
+                os.fsync(f.fileno())  # Um fsync por lote do gravador, não por alteração
+                tamanho = f.tell()
+
+        # Compacta em segundo plano quando o journal passa do limite
+        if tamanho > JOURNAL_LIMITE and not self._lock_compactacao.locked():
+            self._compactacao = threading.Thread(target=self.compactar, args=(caminhos,), daemon=True)
+            self._compactacao.start()
+        return len(linhas)
+
+    def fechar(self):
+        """Espera a compactação em segundo plano, que copia `dados`; nada mais fica aberto."""
+        compactacao = self._compactacao
+        if compactacao is not None:
+            compactacao.join()
+
+    def migrar_lote(self, quantidade=500):
+        return dados["dias"].migrar_lote(quantidade)
+
+    def registros_por_epoca(self):
+        return dados["dias"].registros_por_epoca()
+
+    def colunas_por_epoca(self):
+        return dados["dias"].colunas()
+
+    def ultimo_dia(self):
+        return dados["dias"].ultimo_dia()
+
+    def primeiro_dia(self):
+        return dados["dias"].primeiro_dia()
+
+    def importar_lote(self, lote):
+        """Substitui os dias do lote [(data, registro), ...] na memória; o disco fica para o flush."""
+        dias = dados["dias"]
+        for data, registro in lote:
+            dias[data] = registro
+
+    def consultar_dias(self, inicio, fim):
+        resultado = {}
+        # Conta os dias em vez de somar um ao último: depois de date.max não há data
+        for i in range((fim - inicio).days + 1):
+            data_str = (inicio + timedelta(days=i)).strftime("%Y-%m-%d")
+            registro = dados["dias"].get(data_str)
+            if registro is not None:
+                resultado[data_str] = registro
+        return resultado
+
+
+class DiasSQLite(MutableMapping):
+    """Visão tipo dict de `dados["dias"]` que busca os dias no SQLite sob demanda."""
+
+    def __init__(self, armazenamento):
+        self._armazenamento = armazenamento
+        self.cache = {}  # Dias já lidos ou alterados nesta execução
+
+    def __getitem__(self, data):
+        if data not in self.cache:
+            linha = self._armazenamento.executar(
+                "SELECT estado, tempo FROM dias WHERE data = ?", (data,)
+            ).fetchone()
+            if linha is None:
+                raise KeyError(data)
+            self.cache[data] = self._armazenamento.registro(*linha)
+        return self.cache[data]
+
+    def __setitem__(self, data, registro):
+        self.cache[data] = registro
+
+    def __delitem__(self, data):
+        self.cache.pop(data, None)
+        self._armazenamento.executar("DELETE FROM dias WHERE data = ?", (data,), commit=True)
+
+    def _chaves(self):
+        linhas = self._armazenamento.executar("SELECT data FROM dias").fetchall()
+        return sorted({linha[0] for linha in linhas} | set(self.cache))
+
+    def __iter__(self):
+        return iter(self._chaves())
+
+    def __len__(self):
+        return len(self._chaves())
+
+
+class ArmazenamentoSQLite:
+    """Backend SQLite: os dias ficam em uma tabela indexada pela data e só são lidos quando usados."""
+
+    def __init__(self):
+        self._conexao = None
+        self._lock = threading.Lock()  # A conexão é compartilhada entre a thread do timer e a do Tk
+        self._migrado_ate = ""  # Última data já reescrita no esquema atual pela migração
+
+    def executar(self, sql, parametros=(), commit=False):
+        with self._lock:
+            cursor = self._conexao.execute(sql, parametros)
+            if commit:
+                self._conexao.commit()
+            return cursor
+
+    def carregar(self, destino=None, pasta=None):
+        """Abre o banco de `pasta` (por padrão, do perfil ativo) e carrega as configurações em `destino`."""
+        if self._conexao is not None:
+            return
+        destino = dados if destino is None else destino
+        banco = SQLITE_ARQUIVO if pasta is None else os.path.join(pasta, "dados_estudo.db")
+        novo = not os.path.exists(banco)
+        self._conexao = sqlite3.connect(banco, check_same_thread=False)
+        # No modo WAL leitores de outros processos veem um snapshot sem bloquear os commits
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS dias (
+                data TEXT PRIMARY KEY,  -- "%Y-%m-%d", então BETWEEN segue a ordem cronológica
+                estado TEXT NOT NULL,
+                tempo INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS config (
+                chave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL
+            );
+            -- Resumos das semanas encerradas ("%G-W%V"), um por linha como os dias
+            CREATE TABLE IF NOT EXISTS semanas (
+                chave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        if novo and os.path.exists(arquivos_json(pasta)[0]):
+            self.migrar_json(destino, pasta)
+
+        destino["versao"] = VERSAO_ESQUEMA if novo else 1  # Bancos de antes do versionamento não têm a chave
+        antigas = None
+        for chave, valor in self.executar("SELECT chave, valor FROM config").fetchall():
+            if chave == "semanas":
+                antigas = json.loads(valor)  # Bancos anteriores à tabela guardavam todas aqui
+            else:
+                destino[chave] = json.loads(valor)
+        if antigas is not None:
+            with self._lock:
+                self._conexao.executemany(
+                    "INSERT OR IGNORE INTO semanas (chave, valor) VALUES (?, ?)",
+                    [(chave, json.dumps(valor)) for chave, valor in antigas.items()]
+                )
+                self._conexao.execute("DELETE FROM config WHERE chave = 'semanas'")
+                self._conexao.commit()
+        semanas = self.executar("SELECT chave, valor FROM semanas").fetchall()
+        if semanas:
+            destino["semanas"] = {chave: json.loads(valor) for chave, valor in semanas}
+        if novo:
+            self.executar(
+                "INSERT OR REPLACE INTO config (chave, valor) VALUES ('versao', ?)", (json.dumps(destino["versao"]),), commit=True
+            )
+        destino["dias"] = DiasSQLite(self)
+
+    def registro(self, estado, tempo):
+        """O dia lido de uma linha da tabela, já no esquema atual."""
+        registro = {"estado": estado, "tempo": tempo}
+        if dados["versao"] < VERSAO_ESQUEMA:
+            registro = migrar_registro(registro, dados["versao"])
+        return registro
+
+    def _linhas_atuais(self, linhas):
+        """Linhas (chave, estado, tempo) convertidas para o esquema atual, se o banco for antigo."""
+        if dados["versao"] >= VERSAO_ESQUEMA:
+            return linhas
+        return [(chave, *map(self.registro(estado, tempo).get, ("estado", "tempo"))) for chave, estado, tempo in linhas]
+
+    def migrar_lote(self, quantidade=500):
+        """Reescreve no esquema atual até `quantidade` dias ainda não migrados; devolve quantos."""
+        if dados["versao"] >= VERSAO_ESQUEMA:
+            return 0
+        with self._lock:
+            # Lê e grava sob a mesma trava, para não sobrescrever uma gravação do gravador
+            linhas = self._conexao.execute(
+                "SELECT data, estado, tempo FROM dias WHERE data > ? ORDER BY data LIMIT ?",
+                (self._migrado_ate, quantidade)
+            ).fetchall()
+            self._conexao.executemany(
+                "UPDATE dias SET estado = ?, tempo = ? WHERE data = ?",
+                [(estado, tempo, data) for data, estado, tempo in self._linhas_atuais(linhas)]
+            )
+            self._conexao.commit()
+        if linhas:
+            self._migrado_ate = linhas[-1][0]
+        return len(linhas)
+
+    def migrar_json(self, destino, pasta=None):
+        """Importa, uma única vez, o histórico do snapshot JSON e do seu journal."""
+        caminhos = arquivos_json(pasta)
+        origem = ArmazenamentoJSON()
+        origem.carregar(destino, pasta)
+        destino["dias"].migrar_tudo()
+        destino["versao"] = VERSAO_ESQUEMA
+        origem.compactar(caminhos, destino)  # Deixa o backup autocontido antes de renomeá-lo
+
+        with self._lock:
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO dias (data, estado, tempo) VALUES (?, ?, ?)",
+                ((data, r.get("estado", "-"), r.get("tempo", 0)) for data, r in destino["dias"].items())
+            )
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO config (chave, valor) VALUES (?, ?)",
+                [(chave, json.dumps(valor)) for chave, valor in destino.items() if chave not in ("dias", "semanas")]
+            )
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO semanas (chave, valor) VALUES (?, ?)",
+                [(chave, json.dumps(valor)) for chave, valor in destino.get("semanas", {}).items()]
+            )
+            self._conexao.commit()
+        os.replace(caminhos[0], caminhos[0] + ".migrado")
+
+    def salvar(self, dias=(), config=(), semanas=()):
+        """Grava os itens em uma transação; devolve o tamanho aproximado dos valores gravados."""
+        salvas = dados.get("semanas", {})
+        if not dias and not config and not semanas:
+            # Sem argumentos grava tudo o que está em memória
+            dias = list(dados["dias"].cache)
+            config = [chave for chave in dados if chave not in ("dias", "semanas")]
+            semanas = list(salvas)
+
+        linhas_dias = [(d, dados["dias"].cache[d]["estado"], dados["dias"].cache[d]["tempo"]) for d in dias]
+        linhas_config = [(chave, json.dumps(dados[chave])) for chave in config if chave in dados]
+        linhas_semanas = [(chave, json.dumps(salvas[chave])) for chave in semanas if chave in salvas]
+        with self._lock:
+            self._conexao.executemany("INSERT OR REPLACE INTO dias (data, estado, tempo) VALUES (?, ?, ?)", linhas_dias)
+            self._conexao.executemany("INSERT OR REPLACE INTO config (chave, valor) VALUES (?, ?)", linhas_config)
+            self._conexao.executemany("INSERT OR REPLACE INTO semanas (chave, valor) VALUES (?, ?)", linhas_semanas)
+            self._conexao.commit()
+        return sum(len(d) + len(estado.encode("utf-8")) + 8 for d, estado, _ in linhas_dias) + sum(
+            len(chave) + len(valor.encode("utf-8")) for chave, valor in linhas_config + linhas_semanas
+        )
+
+    def fechar(self):
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+
+    def registros_por_epoca(self):
+        linhas = self._linhas_atuais(self.executar("SELECT data, estado, tempo FROM dias").fetchall())
+        registros = {data: (estado, tempo) for data, estado, tempo in linhas}
+        registros.update((data, (r.get("estado", "-"), r.get("tempo", 0))) for data, r in dados["dias"].cache.items())
+        return [(dia_epoca(data), tempo, estado) for data, (estado, tempo) in registros.items()]
+
+    def ultimo_dia(self):
+        (ultimo,) = self.executar("SELECT MAX(data) FROM dias").fetchone()
+        return max([d for d in [ultimo, *dados["dias"].cache] if d is not None], default=None)
+
+    def primeiro_dia(self):
+        (primeiro,) = self.executar("SELECT MIN(data) FROM dias").fetchone()
+        return min([d for d in [primeiro, *dados["dias"].cache] if d is not None], default=None)
+
+    def importar_lote(self, lote):
+        """Substitui os dias do lote no banco sem confirmar a transação (o commit é o do flush).
+
+        Os dias não passam pelo cache, para a importação não crescer com o histórico.
+        """
+        cache = dados["dias"].cache
+        for data, _ in lote:
+            cache.pop(data, None)
+        with self._lock:
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO dias (data, estado, tempo) VALUES (?, ?, ?)",
+                [(data, registro["estado"], registro["tempo"]) for data, registro in lote]
+            )
+
+    def colunas_por_epoca(self):
+        # Monta as mesmas colunas do DiasCompactos; o dia da época já vem calculado pelo SQLite
+        linhas = self._linhas_atuais(self.executar(
+            "SELECT CAST(julianday(data) - julianday('1970-01-01') AS INTEGER), estado, tempo FROM dias"
+        ).fetchall())
+        registros = {dia: (tempo, estado) for dia, estado, tempo in linhas}
+        registros.update(
+            (dia_epoca(data), (r.get("tempo", 0), r.get("estado", "-"))) for data, r in dados["dias"].cache.items()
+        )
+        registros = [(dia, tempo, estado) for dia, (tempo, estado) in registros.items()]
+        if not registros:
+            return 0, array("i"), array("B"), DiasCompactos.ESTADOS
+        inicio = min(r[0] for r in registros)
+        tamanho = max(r[0] for r in registros) - inicio + 1
+        tempos = array("i", bytes(tamanho * array("i").itemsize))
+        codigos = array("B", bytes(tamanho))
+        estados = list(DiasCompactos.ESTADOS)
+        codigo_estado = {estado: i + 1 for i, estado in enumerate(estados)}
+        for dia, tempo, estado in registros:
+            if estado not in codigo_estado:
+                estados.append(estado)
+                codigo_estado[estado] = len(estados)
+            tempos[dia - inicio] = tempo
+            codigos[dia - inicio] = codigo_estado[estado]
+        return inicio, tempos, codigos, tuple(estados)
+
+    def consultar_dias(self, inicio, fim):
+        inicio_str = inicio.strftime("%Y-%m-%d")
+        fim_str = fim.strftime("%Y-%m-%d")
+        linhas = self._linhas_atuais(self.executar(
+            "SELECT data, estado, tempo FROM dias WHERE data BETWEEN ? AND ?", (inicio_str, fim_str)
+        ).fetchall())
+        resultado = {data: {"estado": estado, "tempo": tempo} for data, estado, tempo in linhas}
+
+        # Dias em memória podem ter alterações mais novas que as do banco
+        for data, registro in list(dados["dias"].cache.items()):
+            if inicio_str <= data <= fim_str:
+                resultado[data] = registro
+        return resultado
+
+
+class Fenwick:
+    """Árvore de Fenwick: atualização pontual e soma de prefixo em O(log n)."""
+
+    def __init__(self, valores):
+        self.arvore = [0] + list(valores)
+        n = len(self.arvore)
+        for i in range(1, n):  # Construção em O(n)
+            pai = i + (i & -i)
+            if pai < n:
+                self.arvore[pai] += self.arvore[i]
+
+    def adicionar(self, i, delta):
+        i += 1
+        while i < len(self.arvore):
+            self.arvore[i] += delta
+            i += i & -i
+
+    def prefixo(self, i):
+        """Soma das posições [0, i)."""
+        total = 0
+        while i > 0:
+            total += self.arvore[i]
+            i -= i & -i
+        return total
+
+    def intervalo(self, inicio, fim):
+        """Soma das posições [inicio, fim]."""
+        return self.prefixo(fim + 1) - self.prefixo(inicio)
+
+
+class IndiceDias:
+    """Índice agregado do histórico: tempo estudado e contagem de estados por dia da época."""
+
+    ESTADOS = ("Estudado", "Falhei")
+    MARGEM = 366  # Dias livres após hoje, para não reconstruir a cada virada de dia
+
+    def __init__(self):
+        self._lock = threading.Lock()  # Atualizado pela thread do timer e lido pela do Tk
+        self._construido = False
+
+    def invalidar(self):
+        """Descarta o índice; ele é reconstruído na próxima consulta."""
+        with self._lock:
+            self._construido = False
+
+    def _construir(self):
+        registros = armazenamento.registros_por_epoca()
+        hoje = dia_epoca(relogio.hoje())
+        self._inicio = min([hoje] + [r[0] for r in registros])
+        self._tamanho = max([hoje] + [r[0] for r in registros]) + self.MARGEM - self._inicio
+
+        self._tempo = [0] * self._tamanho
+        self._estado = ["-"] * self._tamanho
+        for dia, tempo, estado in registros:
+            self._tempo[dia - self._inicio] = tempo
+            self._estado[dia - self._inicio] = estado
+
+        self._arv_tempo = Fenwick(self._tempo)
+        self._arv_estados = {
+            estado: Fenwick(1 if e == estado else 0 for e in self._estado)
+            for estado in self.ESTADOS
+        }
+        self._construido = True
+
+    def atualizar(self, data, registro):
+        """Aplica a diferença entre o registro novo de `data` e o que está no índice."""
+        with self._lock:
+            if not self._construido:
+                return  # A construção já lerá o valor novo do armazenamento
+            i = dia_epoca(data) - self._inicio
+            if not 0 <= i < self._tamanho:
+                self._construido = False  # Fora dos limites: reconstrói sob demanda
+                return
+
+            tempo = registro.get("tempo", 0)
+            if tempo != self._tempo[i]:
+                self._arv_tempo.adicionar(i, tempo - self._tempo[i])
+                self._tempo[i] = tempo
+
+            estado = registro.get("estado", "-")
+            anterior = self._estado[i]
+            if estado != anterior:
+                if anterior in self._arv_estados:
+                    self._arv_estados[anterior].adicionar(i, -1)
+                if estado in self._arv_estados:
+                    self._arv_estados[estado].adicionar(i, 1)
+                self._estado[i] = estado
+
+    def _limites(self, inicio, fim):
+        if not self._construido:
+            self._construir()
+        a = max(dia_epoca(inicio) - self._inicio, 0)
+        b = min(dia_epoca(fim) - self._inicio, self._tamanho - 1)
+        return a, b
+
+    def total_tempo(self, inicio, fim):
+        """Segundos estudados entre `inicio` e `fim` (inclusive)."""
+        with self._lock:
+            a, b = self._limites(inicio, fim)
+            return self._arv_tempo.intervalo(a, b) if a <= b else 0
+
+    def contar_estados(self, inicio, fim):
+        """Quantidade de dias "Estudado" e "Falhei" entre `inicio` e `fim` (inclusive)."""
+        with self._lock:
+            a, b = self._limites(inicio, fim)
+            return {
+                estado: arvore.intervalo(a, b) if a <= b else 0
+                for estado, arvore in self._arv_estados.items()
+            }
+
+
+class ResumosSemanas:
+    """Resumo de cada semana ISO: segundos estudados, faltas, meta, sucesso e a mensagem escolhida.
+
+    As semanas encerradas são calculadas uma vez e salvas em `dados["semanas"]`, com a
+    mensagem motivacional, que assim não muda ao reabrir o aplicativo; a semana atual
+    fica só em memória. salvar_dados descarta apenas as semanas dos dias alterados.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._abertas = {}  # Semanas ainda em andamento: mudam a cada sessão, não são salvas
+        self._geracao = 0  # Impede guardar um resumo calculado antes de uma invalidação
+
+    @staticmethod
+    def chave(data):
+        """Chave "%G-W%V" da semana ISO de `data`."""
+        ano, semana, _ = data.isocalendar()
+        return f"{ano}-W{semana:02d}"
+
+    def limpar(self):
+        with self._lock:
+            self._abertas.clear()
+            self._geracao += 1
+
+    def _guardar(self, chave, resumo, fechada, geracao):
+        with self._lock:
+            if geracao != self._geracao:
+                return False
+            if not fechada:
+                self._abertas[chave] = resumo
+                return False
+            # Troca o dict em vez de alterá-lo: o gravador pode estar serializando o anterior
+            dados["semanas"] = {**dados.get("semanas", {}), chave: resumo}
+        salvar_dados(semanas=[chave])  # Só esta semana vai para o disco, não o histórico todo
+        return True
+
+    def obter(self, segunda, hoje=None):
+        """Resumo da semana que começa na segunda-feira `segunda`."""
+        hoje = hoje or relogio.hoje()
+        domingo = segunda + timedelta(days=6)
+        chave = self.chave(segunda)
+        fechada = domingo < hoje
+        meta = dados["tempos"]["meta_semanal"]
+        with self._lock:
+            resumo = (dados.get("semanas", {}) if fechada else self._abertas).get(chave)
+            geracao = self._geracao
+        if resumo is not None and "total" in resumo and resumo["meta"] == meta:
+            return dict(resumo)
+
+        total = indice_dias.total_tempo(segunda, domingo)
+        novo = {
+            "total": total,
+            "faltas": indice_dias.contar_estados(segunda, domingo)["Falhei"],
+            "meta": meta,
+            "sucesso": total >= meta,
+        }
+        if resumo is not None and "mensagem" in resumo and resumo.get("sucesso") == novo["sucesso"]:
+            novo["mensagem"] = resumo["mensagem"]  # O resultado não mudou: mantém a mensagem
+        self._guardar(chave, novo, fechada, geracao)
+        return dict(novo)
+
+    def mensagem(self, segunda, hoje=None):
+        """Mensagem motivacional sobre o resultado da semana; sorteada uma vez e salva com o resumo."""
+        while True:
+            with self._lock:
+                geracao = self._geracao
+            resumo = self.obter(segunda, hoje)
+            if "mensagem" in resumo:
+                return resumo["mensagem"]
+            resumo["mensagem"] = random.choice(MENSAGENS_SUCESSO if resumo["sucesso"] else MENSAGENS_FRACASSO)
+            fechada = segunda + timedelta(days=6) < (hoje or relogio.hoje())
+            if self._guardar(self.chave(segunda), resumo, fechada, geracao) or not fechada:
+                return resumo["mensagem"]
+
+    def invalidar(self, dias):
+        """Descarta os resumos das semanas de `dias`; devolve as chaves dos resumos salvos que mudaram."""
+        chaves = {self.chave(date.fromisoformat(dia)) for dia in dias}
+        if not chaves:
+            return []  # Sem dias alterados não há cálculo em andamento a descartar
+        with self._lock:
+            self._geracao += 1
+            for chave in chaves:
+                self._abertas.pop(chave, None)
+            salvas = dados.get("semanas", {})
+            afetadas = sorted(chaves & salvas.keys())
+            if not afetadas:
+                return []
+            novas = dict(salvas)
+            for chave in afetadas:
+                # Guarda só a mensagem e o resultado a que ela se refere
+                novas[chave] = {k: v for k, v in salvas[chave].items() if k in ("sucesso", "mensagem")}
+            dados["semanas"] = novas
+        return afetadas
+
+
+armazenamento = ArmazenamentoSQLite() if BACKEND_DADOS == "sqlite" else ArmazenamentoJSON()
+indice_dias = IndiceDias()
+resumos_semanas = ResumosSemanas()
+ouvintes_gravacao = []  # Funções chamadas com o `dia` (ou None) depois de cada carga ou gravação
+
+def ao_gravar(funcao):
+    """Registra `funcao(dia)` para ser avisada de cada carga ou gravação, como os caches."""
+    ouvintes_gravacao.append(funcao)
+
+def avisar_gravacao(dia=None):
+    for funcao in ouvintes_gravacao:
+        funcao(dia)
+
+def definir_backend(nome):
+    """Troca o backend de armazenamento ("json" ou "sqlite"); chame antes de carregar_dados."""
+    global BACKEND_DADOS, armazenamento
+    gravador.descarregar()  # As pendências são do backend anterior
+    BACKEND_DADOS = nome
+    armazenamento = ArmazenamentoSQLite() if nome == "sqlite" else ArmazenamentoJSON()
+
+def carregar_dados():
+    gravador.descarregar()  # Não recarrega por cima de alterações ainda não gravadas
+    # Cria o diretório, se não existir
+    os.makedirs(diretorio_perfil(PERFIL_ATIVO), exist_ok=True)
+    inicio = time.perf_counter()
+    armazenamento.carregar()
+    metricas.registrar("carregar_dados_ms", (time.perf_counter() - inicio) * 1000)
+    _dados_carregados()
+
+def _dados_carregados():
+    indice_dias.invalidar()
+    resumos_semanas.limpar()
+    avisar_gravacao()
+    if dados["versao"] < VERSAO_ESQUEMA:
+        migrar_em_segundo_plano()  # Os dias lidos antes disso já são migrados na leitura
+
+def trocar_perfil(nome):
+    """Grava o perfil atual e carrega só os arquivos do perfil `nome` (criado se não existir).
+
+    Se o perfil novo não puder ser carregado (um arquivo corrompido, por exemplo), a exceção
+    sobe e o perfil atual continua ativo, com os mesmos `dados` e arquivos.
+    """
+    global armazenamento, PERFIL_ATIVO
+    nome = validar_nome_perfil(nome)
+    if not gravador.descarregar():
+        raise OSError("não foi possível gravar os dados do perfil atual")
+
+    # Carrega pelos caminhos do perfil novo e à parte: o ativo só muda se der certo, e
+    # outras threads nunca veem `dados` vazio nem misturado
+    pasta = diretorio_perfil(nome)
+    os.makedirs(pasta, exist_ok=True)
+    inicio = time.perf_counter()
+    novo = dados_padrao()
+    novo_armazenamento = ArmazenamentoSQLite() if BACKEND_DADOS == "sqlite" else ArmazenamentoJSON()
+    try:
+        novo_armazenamento.carregar(novo, pasta)
+    except Exception:
+        novo_armazenamento.fechar()
+        raise
+
+    with gravador.parado():
+        armazenamento.fechar()  # Espera a compactação do perfil atual, que ainda usa os arquivos dele
+        armazenamento = novo_armazenamento
+        PERFIL_ATIVO = nome
+        _apontar_arquivos()
+        # Nada do perfil anterior (como "semanas" ou "verificado_ate") pode sobrar em `dados`
+        for chave in [chave for chave in dados if chave not in novo]:
+            del dados[chave]
+        dados.update(novo)
+    metricas.registrar("carregar_dados_ms", (time.perf_counter() - inicio) * 1000)
+    _dados_carregados()
+
+    # Lembra a escolha para a próxima abertura
+    temporario = PERFIS_ARQUIVO + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump({"ativo": nome}, f, ensure_ascii=False)
+    os.replace(temporario, PERFIS_ARQUIVO)
+
+class GravadorDados:
+    """Grava as alterações em segundo plano, juntando as marcadas dentro de uma janela.
+
+    salvar_dados só marca o que mudou; uma thread própria espera `janela` segundos desde a
+    primeira marca pendente e grava tudo de uma vez (um append e um fsync no journal, ou
+    uma transação no SQLite). Assim a interface nunca espera o disco e uma rajada de
+    edições custa uma escrita.
+    """
+
+    def __init__(self, janela=JANELA_GRAVACAO):
+        self.janela = janela
+        self._cond = threading.Condition()
+        self._dias = set()
+        self._config = set()  # Chaves de `dados` além de "dias"
+        self._semanas = set()  # Chaves de `dados["semanas"]`, gravadas uma a uma
+        self._tudo = False
+        self._primeira_marca = None  # Instante (time.monotonic) da marca pendente mais antiga
+        self._gravando = False
+        self._urgentes = 0  # Chamadas de descarregar() esperando: grava sem esperar a janela
+        self._thread = None
+        self.gravacoes = 0  # Lotes gravados nesta execução
+        self.falhas = 0  # Lotes que deram erro (e voltaram para as pendências)
+
+    def _pendente(self):
+        return bool(self._dias) or bool(self._config) or bool(self._semanas) or self._tudo
+
+    @contextlib.contextmanager
+    def parado(self):
+        """Grava já o que estiver pendente e não grava (nem marca) nada enquanto o bloco roda."""
+        with self._cond:
+            self._urgentes += 1
+            self._cond.notify_all()
+            falhas = self.falhas
+            try:
+                # Marcas feitas antes do bloco são dos `dados` de antes dele, como na troca de perfil
+                while (self._pendente() or self._gravando) and self.falhas == falhas:
+                    self._cond.wait()
+            finally:
+                self._urgentes -= 1
+            yield
+
+    def marcar(self, dias=(), config=(), semanas=()):
+        """Marca o que precisa ser gravado; sem argumentos, tudo (um snapshot completo)."""
+        with self._cond:
+            if not dias and not config and not semanas:
+                self._tudo = True
+            self._dias.update(dias)
+            self._config.update(config)
+            self._semanas.update(semanas)
+            if self._primeira_marca is None:
+                self._primeira_marca = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._rodar, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _rodar(self):
+        while True:
+            with self._cond:
+                while not self._pendente():
+                    self._cond.wait()
+                while True:
+                    restante = self._primeira_marca + self.janela - time.monotonic()
+                    if self._urgentes and restante <= self.janela:
+                        break  # Urgente, exceto logo depois de uma falha
+                    if restante <= 0:
+                        break
+                    self._cond.wait(restante)
+                dias, config, semanas, tudo = self._dias, self._config, self._semanas, self._tudo
+                self._dias = set()
+                self._config = set()
+                self._semanas = set()
+                self._tudo = False
+                self._primeira_marca = None
+                self._gravando = True
+
+            try:
+                inicio = time.perf_counter()
+                if tudo:
+                    gravados = armazenamento.salvar()  # O snapshot completo já inclui as outras marcas
+                else:
+                    gravados = armazenamento.salvar(dias=sorted(dias), config=sorted(config), semanas=sorted(semanas))
+                self.gravacoes += 1
+                metricas.registrar("gravacao_ms", (time.perf_counter() - inicio) * 1000)
+                metricas.registrar("gravacao_bytes", gravados)
+                metricas.registrar("gravacao_itens", len(dias) + len(config) + len(semanas))
+            except Exception as e:
+                print("Erro ao salvar dados:", e)
+                # Devolve o lote às pendências e tenta de novo depois de uma janela
+                with self._cond:
+                    self.falhas += 1
+                    self._dias |= dias
+                    self._config |= config
+                    self._semanas |= semanas
+                    self._tudo |= tudo
+                    self._primeira_marca = time.monotonic() + max(self.janela, 1.0)
+            finally:
+                with self._cond:
+                    self._gravando = False
+                    self._cond.notify_all()
+
+    def descarregar(self, timeout=10):
+        """Grava já o que estiver pendente e espera terminar; devolve False se o tempo acabou."""
+        prazo = time.monotonic() + timeout
+        with self._cond:
+            if self._thread is None:
+                return True  # Nada foi marcado nesta execução
+            self._urgentes += 1
+            self._cond.notify_all()
+            falhas = self.falhas
+            try:
+                while self._pendente() or self._gravando:
+                    if self.falhas != falhas:
+                        return False  # Não insiste: a gravação volta a ser tentada depois da janela
+                    restante = prazo - time.monotonic()
+                    if restante <= 0:
+                        return False
+                    self._cond.wait(restante)
+                return True
+            finally:
+                self._urgentes -= 1
+
+
+gravador = GravadorDados()
+atexit.register(gravador.descarregar)  # Scripts que não chamam descarregar_dados também gravam
+
+def salvar_dados(dia=None, tempos=False, ciclos=False, dias=(), config=(), semanas=()):
+    """Marca as alterações indicadas para gravação em segundo plano; sem argumentos grava tudo.
+
+    `dias`, `config` (chaves de `dados`) e `semanas` (chaves de `dados["semanas"]`) marcam
+    vários itens de uma vez, em um só lote.
+    A memória, o índice e os caches já refletem a alteração quando a função retorna; o disco,
+    depois da janela do gravador. Use descarregar_dados() para esperar a escrita.
+    """
+    inicio = time.perf_counter()
+    dias = list(dias) + ([dia] if dia is not None else [])
+    config = list(config) + (["tempos"] if tempos else []) + (["ciclos"] if ciclos else [])
+    for alterado in dias:
+        indice_dias.atualizar(alterado, dados["dias"][alterado])
+    # Depois do índice, para não recalcular com o valor velho
+    semanas = list(semanas) + resumos_semanas.invalidar(dias)
+    gravador.marcar(dias=dias, config=config, semanas=semanas)
+    avisar_gravacao(dias[0] if len(dias) == 1 else None)
+    metricas.registrar("salvar_dados_ms", (time.perf_counter() - inicio) * 1000)  # Só a marcação; o disco é gravacao_ms
+
+def descarregar_dados(timeout=10):
+    """Grava imediatamente as alterações pendentes e espera a escrita terminar."""
+    return gravador.descarregar(timeout)
+
+_migracao = None  # Thread que termina a migração do esquema
+
+def migrar_em_segundo_plano(lote=500):
+    """Migra, em lotes e fora da thread do Tk, os dias que ainda estão em um esquema antigo."""
+    global _migracao
+    if _migracao is not None and _migracao.is_alive():
+        return _migracao
+    _migracao = threading.Thread(target=_terminar_migracao, args=(lote,), daemon=True)
+    _migracao.start()
+    return _migracao
+
+def _terminar_migracao(lote):
+    inicio = time.perf_counter()
+    while armazenamento.migrar_lote(lote):
+        time.sleep(0.001)  # Cede a vez à interface entre um lote e outro
+    dados["versao"] = VERSAO_ESQUEMA
+    salvar_dados()  # Grava tudo no esquema novo (no JSON, um snapshot com a versão nova)
+    metricas.registrar("migracao_ms", (time.perf_counter() - inicio) * 1000)
+
+def consultar_dias(inicio, fim):
+    """Retorna os registros existentes entre as datas `inicio` e `fim` (inclusive), por "%Y-%m-%d"."""
+    return armazenamento.consultar_dias(inicio, fim)
+
+def colunas_historico():
+    """Todo o histórico em colunas por dia da época: (inicio, tempos, códigos, estados)."""
+    return armazenamento.colunas_por_epoca()
+
+def intervalo_historico():
+    """Datas ("%Y-%m-%d") do primeiro e do último dia com registro; (None, None) sem histórico."""
+    return armazenamento.primeiro_dia(), armazenamento.ultimo_dia()
+
+def importar_dias(lotes):
+    """Grava os lotes [(data, registro), ...] por cima dos dias existentes; devolve quantos dias.
+
+    Cada lote vai direto para o backend e a gravação em disco é uma só, no final (um
+    snapshot no JSON, um commit no SQLite), junto com as configurações alteradas enquanto
+    os lotes eram gerados.
+    """
+    quantidade = 0
+    for lote in lotes:
+        armazenamento.importar_lote(lote)
+        resumos_semanas.invalidar([data for data, _ in lote])
+        quantidade += len(lote)
+    indice_dias.invalidar()  # Reconstruído na próxima consulta, em vez de atualizado dia a dia
+    if quantidade:
+        salvar_dados()  # Tudo de uma vez, com as configurações e os resumos descartados
+    descarregar_dados()
+    return quantidade
+
+def ler_dados_consistentes(perfil=None, backend=None, espera=ESPERA_LEITURA):
+    """Cópia consistente dos dados de um perfil, para scripts e relatórios em outros processos.
+
+    Não usa `dados` nem trava nada, então pode rodar em qualquer número de processos com o
+    aplicativo aberto sem atrasar as gravações dele. Devolve um dict como `dados`, com os
+    dias em um dict comum e já no esquema atual; TimeoutError se o snapshot não parou de
+    ser trocado durante `espera` segundos.
+    """
+    pasta = diretorio_perfil(perfil or PERFIL_ATIVO)
+    if (backend or BACKEND_DADOS) == "sqlite":
+        copia = _ler_sqlite(os.path.join(pasta, "dados_estudo.db"))
+    else:
+        copia = _ler_json_consistente(pasta, espera)
+    versao = copia.get("versao", 1)
+    if versao < VERSAO_ESQUEMA:
+        copia["dias"] = {data: migrar_registro(registro, versao) for data, registro in copia["dias"].items()}
+    copia["versao"] = VERSAO_ESQUEMA
+    return copia
+
+def _ler_json_consistente(pasta, espera):
+    geracao_arquivo = os.path.join(pasta, "dados_estudo.geracao")
+    prazo = time.monotonic() + espera
+    while True:
+        antes = ler_geracao(geracao_arquivo)
+        # Ímpar além do prazo: o aplicativo caiu no meio de uma compactação, e ler o
+        # snapshot mais os dois journals é a mesma recuperação feita pelo carregar
+        if antes % 2 == 0 or time.monotonic() > prazo:
+            try:
+                copia = _ler_json(pasta)
+            except PermissionError:
+                copia = None  # No Windows, o arquivo estava sendo trocado: tenta de novo
+            if copia is not None and ler_geracao(geracao_arquivo) == antes:
+                return copia
+            if time.monotonic() > prazo:
+                raise TimeoutError("o snapshot foi trocado durante todas as tentativas de leitura")
+        time.sleep(0.001)
+
+def _ler_json(pasta):
+    try:
+        with open(os.path.join(pasta, "dados_estudo.json"), "r", encoding="utf-8") as f:
+            copia = json.load(f)
+    except FileNotFoundError:
+        return dados_padrao()
+    copia.setdefault("versao", 1)
+    dias = copia.setdefault("dias", {})
+    journal = os.path.join(pasta, "dados_estudo.journal")
+    for caminho in (journal + ".old", journal):
+        for registro in registros_journal(caminho):
+            if "dia" in registro:
+                dias[registro["dia"]] = registro["valor"]
+            elif "semana" in registro:
+                copia.setdefault("semanas", {})[registro["semana"]] = registro["valor"]
+            else:
+                copia.update(registro)
+    return copia
+
+def _ler_sqlite(caminho):
+    if not os.path.exists(caminho):
+        return dados_padrao()
+    from urllib.request import pathname2url
+    conexao = sqlite3.connect(f"file:{pathname2url(caminho)}?mode=ro", uri=True)
+    try:
+        conexao.execute("BEGIN")  # As duas consultas no mesmo snapshot
+        copia = {chave: json.loads(valor) for chave, valor in conexao.execute("SELECT chave, valor FROM config")}
+        try:
+            semanas = conexao.execute("SELECT chave, valor FROM semanas").fetchall()
+        except sqlite3.OperationalError:
+            semanas = []  # Banco ainda não aberto por uma versão com a tabela
+        if semanas:
+            copia["semanas"] = {**copia.get("semanas", {}), **{chave: json.loads(valor) for chave, valor in semanas}}
+        copia["dias"] = {
+            data: {"estado": estado, "tempo": tempo}
+            for data, estado, tempo in conexao.execute("SELECT data, estado, tempo FROM dias")
+        }
+        conexao.execute("COMMIT")
+    finally:
+        conexao.close()
+    return {**dados_padrao(), "versao": 1, **copia}
+
+class MotorAlarme:
+    """Mixer inicializado uma única vez, com os sons de cada fase já decodificados em memória."""
+
+    def __init__(self, silencioso=False):
+        self.silencioso = silencioso  # Não toca nada; útil sem placa de som ou em testes
+        self._lock = threading.Lock()  # Carregado pelo aquecimento ou pelo primeiro alarme
+        self._sons = None  # tipo da fase -> pygame.mixer.Sound
+        self.latencias = collections.deque(maxlen=100)  # Segundos entre o pedido e o play()
+
+    def carregar(self):
+        with self._lock:
+            if self._sons is not None or self.silencioso:
+                return
+            import pygame
+            pygame.mixer.pre_init(buffer=512)  # Buffer pequeno para o som sair logo
+            pygame.mixer.init()
+
+            sons = {}
+            decodificados = {}  # Fases que usam o mesmo arquivo compartilham o Sound
+            for tipo, caminho in ALARMES.items():
+                if not os.path.exists(caminho):
+                    caminho = ALARME_SOM
+                if caminho not in decodificados:
+                    decodificados[caminho] = pygame.mixer.Sound(caminho)
+                sons[tipo] = decodificados[caminho]
+            self._sons = sons
+
+    def tocar(self, tipo="foco"):
+        inicio = time.perf_counter()
+        try:
+            self.carregar()
+            if not self.silencioso:
+                self._sons[tipo].play()
+        except Exception as e:
+            print("Erro ao tocar alarme:", e)
+            return
+        self.latencias.append(time.perf_counter() - inicio)
+        metricas.registrar("alarme_ms", self.latencias[-1] * 1000)
+        if perfil.ativo:
+            print(f"Alarme ({tipo}): {self.latencias[-1] * 1000:.1f} ms")
+
+    def resumo_latencia(self):
+        """Última, média e maior latência (ms) dos alarmes desta execução."""
+        if not self.latencias:
+            return None
+        return {
+            "ultima": self.latencias[-1] * 1000,
+            "media": sum(self.latencias) / len(self.latencias) * 1000,
+            "maxima": max(self.latencias) * 1000,
+        }
+
+
+alarme = MotorAlarme(silencioso=os.environ.get("ESTUDOS_TRACKER_AUDIO") == "silencioso")
+
+def tocar_alarme(tipo="foco"):
+    """Toca o alarme do fim da fase `tipo`."""
+    alarme.tocar(tipo)
+
+class LogSessoes:
+    """Log binário, só de acréscimo, dos eventos do timer, lido via mmap sem cópias.
+
+    Depois de um cabeçalho de 16 bytes, cada evento ocupa 16 bytes em ordem de bytes
+    nativa: instante (float64, segundos desde a época), evento (uint8), fase (uint8),
+    2 bytes de preenchimento e duração em ms (uint32). Em início e retomada a duração é o
+    tempo que faltava na fase; em pausa, conclusão e reset é o tempo que rodou desde o
+    último início ou retomada.
+    """
+
+    CABECALHO = b"ESTSESS1".ljust(16, b"\0")
+    REGISTRO = struct.Struct("=dBBxxI")
+    EVENTOS = ("inicio", "pausa", "retomada", "conclusao", "reset")
+    FASES = ("foco", "pausa", "pausa_longa")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def registrar(self, evento, fase, duracao, instante=None):
+        registro = self.REGISTRO.pack(
+            relogio.time() if instante is None else instante,
+            self.EVENTOS.index(evento),
+            self.FASES.index(fase),
+            int(duracao * 1000),
+        )
+        with self._lock:
+            with open(SESSOES_ARQUIVO, "ab") as f:
+                tamanho = f.tell()
+                if tamanho == 0:
+                    f.write(self.CABECALHO)
+                elif (tamanho - len(self.CABECALHO)) % self.REGISTRO.size:
+                    # Descarta um registro incompleto para não desalinhar os seguintes
+                    f.truncate(tamanho - (tamanho - len(self.CABECALHO)) % self.REGISTRO.size)
+                f.write(registro)
+
+    @contextlib.contextmanager
+    def colunas(self, inicio=None, fim=None):
+        """Memoryviews por campo ("instante", "evento", "fase", "duracao_ms") dos eventos
+        com instante em [inicio, fim), apontando direto para o arquivo mapeado."""
+        tamanho = self.REGISTRO.size
+        if not os.path.exists(SESSOES_ARQUIVO) or os.path.getsize(SESSOES_ARQUIVO) <= tamanho:
+            vazio = memoryview(b"")
+            yield {"instante": vazio.cast("d"), "evento": vazio, "fase": vazio, "duracao_ms": vazio.cast("I")}
+            return
+
+        with open(SESSOES_ARQUIVO, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            # Ignora um registro final incompleto, de uma queda no meio da escrita
+            quantidade = (len(mapa) - len(self.CABECALHO)) // tamanho
+            bruto = memoryview(mapa)[len(self.CABECALHO):len(self.CABECALHO) + quantidade * tamanho]
+            instantes = bruto.cast("d")[::2]
+
+            # Os eventos são acrescentados em ordem, então o intervalo sai por busca binária
+            a = 0 if inicio is None else bisect.bisect_left(instantes, inicio)
+            b = quantidade if fim is None else bisect.bisect_left(instantes, fim)
+            trecho = bruto[a * tamanho:b * tamanho]
+            bytes_ = trecho.cast("B")
+            visoes = {
+                "instante": trecho.cast("d")[::2],
+                "evento": bytes_[8::tamanho],
+                "fase": bytes_[9::tamanho],
+                "duracao_ms": trecho.cast("I")[3::4],
+            }
+            try:
+                yield visoes
+            finally:
+                # O mmap só fecha sem visões abertas sobre ele
+                for visao in visoes.values():
+                    visao.release()
+                bytes_.release()
+                trecho.release()
+                instantes.release()
+                bruto.release()
+
+    def foco_por_hora(self, inicio=None, fim=None):
+        """Segundos de foco efetivamente rodados em cada hora do dia (0 a 23, hora local)."""
+        horas = [0.0] * 24
+        encerram = {self.EVENTOS.index(e) for e in ("pausa", "conclusao", "reset")}
+        foco = self.FASES.index("foco")
+        with self.colunas(inicio, fim) as c:
+            for instante, evento, fase, duracao_ms in zip(c["instante"], c["evento"], c["fase"], c["duracao_ms"]):
+                if fase == foco and evento in encerram and duracao_ms:
+                    # Atribui o trecho à hora em que ele começou
+                    horas[time.localtime(instante - duracao_ms / 1000).tm_hour] += duracao_ms / 1000
+        return horas
+
+    def resumo(self, inicio=None, fim=None):
+        """Contagem de cada evento e segundos rodados por fase entre `inicio` e `fim`."""
+        contagem = [0] * len(self.EVENTOS)
+        rodado = [0] * len(self.FASES)
+        encerram = {self.EVENTOS.index(e) for e in ("pausa", "conclusao", "reset")}
+        with self.colunas(inicio, fim) as c:
+            for evento, fase, duracao_ms in zip(c["evento"], c["fase"], c["duracao_ms"]):
+                contagem[evento] += 1
+                if evento in encerram:
+                    rodado[fase] += duracao_ms
+        return {
+            "eventos": dict(zip(self.EVENTOS, contagem)),
+            "segundos_por_fase": {fase: ms / 1000 for fase, ms in zip(self.FASES, rodado)},
+        }
+
+
+log_sessoes = LogSessoes()
+
+def verificar_meta_diaria():
+    """Verifica se a meta diária foi atingida e marca o dia como 'Não Estudado' se necessário."""
+    dia_atual = relogio.agora().strftime("%Y-%m-%d")
+    registro = dados["dias"].setdefault(dia_atual, {"estado": "-", "tempo": 0})
+    meta_diaria = dados["tempos"]["meta_semanal"] // 7  # Divide a meta semanal por 7 para obter a meta diária
+
+    if registro["tempo"] < meta_diaria and registro["estado"] == "-":
+        registro["estado"] = "Não Estudado"
+        salvar_dados(dia=dia_atual)
+
+def preencher_dias_perdidos(hoje=None):
+    """Classifica os dias que passaram sem o aplicativo aberto; devolve as datas alteradas.
+
+    Vai do dia seguinte à marca d'água `dados["verificado_ate"]` (ou, na primeira vez, ao
+    último dia registrado) até ontem. Só os dias sem nenhum registro viram "Não Estudado";
+    os registrados, inclusive os "-" escolhidos com "Não era pra estudar", ficam como estão.
+    Tudo é gravado em um único lote. Como a marca avança a cada
+    abertura, o custo depende só do intervalo fechado, não do tamanho do histórico.
+    """
+    hoje = hoje or relogio.hoje()
+    ontem = hoje - timedelta(days=1)
+    marca = dados.get("verificado_ate") or armazenamento.ultimo_dia()
+    if marca is not None and marca >= ontem.isoformat():
+        return []  # Já verificado (ou o relógio voltou)
+
+    alterados = []
+    if marca is not None:
+        inicio = date.fromisoformat(marca) + timedelta(days=1)
+        registros = consultar_dias(inicio, ontem)
+        dia = inicio
+        while dia <= ontem:
+            data_str = dia.strftime("%Y-%m-%d")
+            if data_str not in registros:
+                dados["dias"][data_str] = {"estado": "Não Estudado", "tempo": 0}
+                alterados.append(data_str)
+            dia += timedelta(days=1)
+
+    # Histórico vazio: só registra a marca, para as próximas aberturas partirem dela
+    dados["verificado_ate"] = ontem.isoformat()
+    salvar_dados(dias=alterados, config=["verificado_ate"])
+    return alterados
+
+class PomodoroTimer:
+    def __init__(self, agendador, update_callback, dia_callback=None):
+        self.agendador = agendador  # Objeto com after(ms, função) e after_cancel(id), como o root do Tk
+        self.update_callback = update_callback
+        self.dia_callback = dia_callback  # Recebe a data ("%Y-%m-%d") quando um foco soma tempo
+        self.tempo_total = dados["tempos"]["foco"]  # Duração da fase atual
+        self.tempo_restante = self.tempo_total  # Segundos restantes enquanto pausado
+        self.executando = False
+        self.tipo_atual = "foco"
+        self.prazo = None  # Instante (relogio.monotonic) em que a fase termina, se executando
+        self.restante_no_inicio = None  # Tempo restante no último início ou retomada
+        self.agendamento = None  # Id do after() do próximo tick
+        self.proximo_tick = None  # Instante em que o próximo tick deveria rodar
+        self.desvio_maximo = 0.0  # Maior atraso (s) de um tick em relação ao agendado
+
+    def restante(self):
+        """Segundos restantes na fase, derivados do prazo em vez de contados."""
+        if self.executando:
+            return max(self.prazo - relogio.monotonic(), 0)
+        return self.tempo_restante
+
+    def estado(self):
+        """Fase, segundos restantes e se está rodando; pode ser lido de outra thread."""
+        executando = self.executando
+        prazo = self.prazo  # Lidos uma vez: o Tk pode estar mudando os dois
+        if executando and prazo is not None:
+            restante = max(prazo - relogio.monotonic(), 0)
+        else:
+            restante = self.tempo_restante
+        return {
+            "fase": self.tipo_atual,
+            "restante": math.ceil(restante),
+            "tempo_total": self.tempo_total,
+            "executando": executando,
+            "ciclos": dados["ciclos"],
+        }
+
+    def iniciar(self):
+        if not self.executando:
+            evento = "inicio" if self.tempo_restante == self.tempo_total else "retomada"
+            log_sessoes.registrar(evento, self.tipo_atual, self.tempo_restante)
+            self.restante_no_inicio = self.tempo_restante
+            self.executando = True
+            self.prazo = relogio.monotonic() + self.tempo_restante
+            self.proximo_tick = None
+            self.tick()
+
+    def pausar(self):
+        if self.executando:
+            self.tempo_restante = self.restante()
+            log_sessoes.registrar("pausa", self.tipo_atual, self.restante_no_inicio - self.tempo_restante)
+        self.executando = False
+        self.cancelar_tick()
+
+    def cancelar_tick(self):
+        if self.agendamento is not None:
+            self.agendador.after_cancel(self.agendamento)
+            self.agendamento = None
+
+    def resetar(self):
+        if not self.executando and self.tempo_restante == dados["tempos"]["foco"]:
+            # Marca o dia como "Falha" se o Pomodoro não foi iniciado
+            dia = relogio.agora().strftime("%Y-%m-%d")
+            registro = dados["dias"].setdefault(dia, {"estado": "-", "tempo": 0})
+            if registro["estado"] == "-":  # Apenas atualiza se o estado for vazio
+                registro["estado"] = "Falhei"
+            salvar_dados(dia=dia)
+
+        rodado = self.restante_no_inicio - self.restante() if self.executando else 0
+        log_sessoes.registrar("reset", self.tipo_atual, rodado)
+        self.executando = False
+        self.cancelar_tick()
+        self.tempo_total = self.tempo_restante = dados["tempos"][self.tipo_atual]
+        self.update_callback(self.formatar_tempo(self.tempo_restante), self.tipo_atual)
+
+        # Verifica a meta diária
+        verificar_meta_diaria()
+
+    def recarregar(self):
+        """Volta ao início do foco com os tempos de `dados` (depois de trocar de perfil), sem marcar falha."""
+        self.pausar()
+        self.tipo_atual = "foco"
+        self.tempo_total = self.tempo_restante = dados["tempos"]["foco"]
+        self.update_callback(self.formatar_tempo(self.tempo_restante), self.tipo_atual)
+
+    def tick(self):
+        """Atualiza o display e se reagenda para a próxima virada de segundo."""
+        self.agendamento = None
+        if not self.executando:
+            return
+
+        agora = relogio.monotonic()
+        if self.proximo_tick is not None:
+            self.desvio_maximo = max(self.desvio_maximo, agora - self.proximo_tick)
+            metricas.registrar("tick_desvio_ms", (agora - self.proximo_tick) * 1000)
+
+        restante = self.prazo - agora
+        if restante <= 0:
+            self.concluir()
+            return
+
+        self.update_callback(self.formatar_tempo(restante), self.tipo_atual)
+        espera_ms = int((restante % 1) * 1000) + 1  # Logo após o display mudar de segundo
+        self.proximo_tick = agora + espera_ms / 1000
+        self.agendamento = self.agendador.after(espera_ms, self.tick)
+
+    def concluir(self):
+        """Encerra a fase atual e prepara a próxima."""
+        tocar_alarme(self.tipo_atual)
+        log_sessoes.registrar("conclusao", self.tipo_atual, self.restante_no_inicio)
+
+        if self.tipo_atual == "foco":
+            dados["ciclos"] += 1
+            tempo_estudado = self.tempo_total  # A fase inteira rodou, somando as pausas intermediárias
+            dia = relogio.agora().strftime("%Y-%m-%d")
+            registro = dados["dias"].setdefault(dia, {"estado": "-", "tempo": 0})
+
+            # Marca o dia como "Estudado" e adiciona o tempo
+            registro["tempo"] += tempo_estudado
+            if registro["estado"] == "-":  # Apenas atualiza se o estado for vazio
+                registro["estado"] = "Estudado"
+            salvar_dados(dia=dia, ciclos=True)
+
+            # Atualiza imediatamente a célula do dia no calendário
+            if self.dia_callback:
+                self.dia_callback(dia)
+
+        if self.tipo_atual == "foco":
+            self.tipo_atual = "pausa_longa" if dados["ciclos"] % 4 == 0 else "pausa"
+        else:
+            self.tipo_atual = "foco"
+
+        self.tempo_total = self.tempo_restante = dados["tempos"][self.tipo_atual]
+        self.executando = False
+        self.update_callback(self.formatar_tempo(self.tempo_restante), self.tipo_atual)
+
+    def alternar(self):
+        if (self.executando):
+            self.pausar()
+        else:
+            self.iniciar()
+
+    def formatar_tempo(self, segundos, tipo=None):
+        mins, secs = divmod(math.ceil(segundos), 60)
+        return f"{mins:02d}:{secs:02d}"
+
+
+def resumo_semana(hoje=None):
+    """Dados do resumo semanal: os dias da semana atual, os totais da atual e da passada e a mensagem."""
+    hoje = hoje or relogio.hoje()
+    inicio_semana = hoje - timedelta(days=hoje.weekday())  # Segunda-feira da semana atual
+    fim_semana = inicio_semana + timedelta(days=6)
+    inicio_semana_passada = inicio_semana - timedelta(days=7)
+    registros = consultar_dias(inicio_semana, fim_semana)
+
+    dias = []
+    for i in range(7):
+        dia = inicio_semana + timedelta(days=i)
+        info = registros.get(dia.strftime("%Y-%m-%d"), {})
+        dias.append((dia, info.get("tempo", 0), info.get("estado", "-")))
+
+    atual = resumos_semanas.obter(inicio_semana, hoje)
+    passada = resumos_semanas.obter(inicio_semana_passada, hoje)
+    return {
+        "dias": dias,
+        "total": atual["total"],
+        "faltas": atual["faltas"],
+        "total_passado": passada["total"],
+        "sucesso_passado": passada["sucesso"],
+        "mensagem": resumos_semanas.mensagem(inicio_semana_passada, hoje),
+        "meta": dados["tempos"]["meta_semanal"],
+    }
+
+def desempenho_semanal(hoje=None):
+    """Os últimos 7 dias (do mais recente para o mais antigo) e o total estudado neles."""
+    hoje = hoje or relogio.hoje()
+    inicio = hoje - timedelta(days=6)
+    registros = consultar_dias(inicio, hoje)
+
+    dias = []
+    for i in range(7):
+        dia = hoje - timedelta(days=i)
+        info = registros.get(dia.strftime("%Y-%m-%d"), {})
+        dias.append((dia, info.get("tempo", 0), info.get("estado", "-")))
+    return {"dias": dias, "total": indice_dias.total_tempo(inicio, hoje), "meta": dados["tempos"]["meta_semanal"]}
+
+def dias_do_mes(ano, mes):
+    """Grade de 42 posições (6 semanas começando na segunda) com (data, "%Y-%m-%d", registro) ou None."""
+    deslocamento, ultimo_dia = calendar.monthrange(ano, mes)
+    primeiro = date(ano, mes, 1)
+    registros = consultar_dias(primeiro, date(ano, mes, ultimo_dia))
+
+    grade = [None] * 42
+    for numero in range(1, ultimo_dia + 1):
+        data = primeiro + timedelta(days=numero - 1)
+        data_str = data.strftime("%Y-%m-%d")
+        grade[deslocamento + numero - 1] = (data, data_str, registros.get(data_str, {}))
+    return grade
+
+def dias_do_ano(ano):
+    """Lista de (data, tempo, estado) de todos os dias do ano, de 1º de janeiro a 31 de dezembro."""
+    inicio = date(ano, 1, 1)
+    fim = date(ano, 12, 31)
+    registros = consultar_dias(inicio, fim)
+
+    dias = []
+    for i in range((fim - inicio).days + 1):  # Sem passar de 31/12, que em 9999 é date.max
+        data = inicio + timedelta(days=i)
+        info = registros.get(data.strftime("%Y-%m-%d"), {})
+        dias.append((data, info.get("tempo", 0), info.get("estado", "-")))
+    return dias
+
+# Mensagens motivacionais sobre o resultado da semana passada
+MENSAGENS_SUCESSO = [
+    "Parabéns! Você está cada vez mais perto dos seus objetivos!",
+    "Ótimo trabalho! Continue assim e você alcançará grandes coisas.",
+    "Você está no caminho certo. Mantenha o foco e a determinação!",
+    "Incrível! Cada esforço está valendo a pena.",
+    "Você provou que a disciplina é a chave para o sucesso!",
+    "Mais uma semana concluída com sucesso. Continue avançando!",
+    "Seu progresso é inspirador. Não pare agora!",
+    "Você é a prova de que a consistência traz resultados.",
+    "Excelente! Você está construindo um futuro brilhante.",
+    "Sucesso é a soma de pequenos esforços repetidos diariamente. Continue assim!"
+]
+
+MENSAGENS_FRACASSO = [
+    "Não desista! Use esta semana como aprendizado para melhorar.",
+    "Fracassos fazem parte do caminho. Levante-se e tente novamente!",
+    "Você pode fazer melhor! Acredite no seu potencial e continue tentando.",
+    "Cada dia é uma nova chance de recomeçar. Não desista agora!",
+    "Fracassar não é o fim, é apenas uma lição para o próximo passo.",
+    "Você é mais forte do que imagina. Não deixe uma semana ruim te parar.",
+    "O importante é continuar tentando. Grandes conquistas levam tempo.",
+    "Não se preocupe com o fracasso, preocupe-se em não tentar novamente.",
+    "A jornada é longa, mas cada passo conta. Continue caminhando!",
+    "Você não falhou, apenas encontrou uma maneira de melhorar. Recomece!"
+]
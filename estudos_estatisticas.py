@@ -0,0 +1,162 @@
+"""Estatísticas sobre todo o histórico de estudos.
+
+Calcula a sequência de dias estudados (atual e recorde), as médias móveis de 7 e 30 dias,
+a taxa de semanas com a meta semanal batida e a distribuição por dia da semana. Usa arrays
+do NumPy sobre os dias da época quando ele está instalado e Python puro quando não está;
+os dois caminhos dão o mesmo resultado.
+"""
+from array import array
+from itertools import accumulate
+
+import estudos_core as core
+
+DIA_SEMANA_EPOCA = 3  # 1970-01-01 foi uma quinta-feira (segunda = 0)
+
+_numpy = None
+
+
+def carregar_numpy():
+    """O módulo numpy, ou None se não estiver instalado; importado só no primeiro uso."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def _janela_historico(hoje):
+    """Colunas do primeiro dia com registro até `hoje`: (inicio, tempos, códigos, estados)."""
+    inicio, tempos, codigos, estados = core.colunas_historico()
+    fim = core.dia_epoca(hoje)
+
+    # Corta os espaços vazios antes do primeiro registro e depois de hoje
+    primeiro = next((i for i, codigo in enumerate(codigos) if codigo), None)
+    if primeiro is None or inicio + primeiro > fim:
+        return fim, array("i", [0]), array("B", [0]), estados
+    ultimo = min(len(codigos), fim - inicio + 1)
+    tempos = tempos[primeiro:ultimo]
+    codigos = codigos[primeiro:ultimo]
+
+    # Dias entre o último registro e hoje contam como não estudados
+    falta = fim - (inicio + primeiro) + 1 - len(codigos)
+    if falta > 0:
+        tempos.frombytes(bytes(falta * tempos.itemsize))
+        codigos.frombytes(bytes(falta))
+    return inicio + primeiro, tempos, codigos, estados
+
+
+def _estatisticas_numpy(np, inicio, tempos, codigos, estados, meta_diaria, meta_semanal):
+    tempos = np.frombuffer(tempos, dtype=np.intc).astype(np.int64)
+    codigos = np.frombuffer(codigos, dtype=np.uint8)
+    n = len(tempos)
+
+    estudado = tempos >= meta_diaria
+    if "Estudado" in estados:
+        estudado |= codigos == estados.index("Estudado") + 1
+
+    # Sequências: posições onde começam e terminam os trechos de dias estudados
+    bordas = np.diff(np.concatenate(([0], estudado.view(np.int8), [0])))
+    comecos = np.flatnonzero(bordas == 1)
+    fins = np.flatnonzero(bordas == -1)
+    maior = int((fins - comecos).max()) if len(comecos) else 0
+    # O dia de hoje ainda não acabou: sem estudo hoje, a sequência vai até ontem
+    ate = n if estudado[-1] else n - 1
+    atual = int(fins[-1] - comecos[-1]) if len(fins) and fins[-1] == ate else 0
+
+    acumulado = np.concatenate(([0], np.cumsum(tempos)))
+    dias_semana = (np.arange(inicio, inicio + n) + DIA_SEMANA_EPOCA) % 7
+
+    # Semanas completas (de segunda a domingo) antes da semana atual
+    primeira = (7 - dias_semana[0]) % 7
+    ultima = n - 1 - dias_semana[-1]
+    semanas = max((ultima - primeira) // 7, 0)
+    totais_semanas = tempos[primeira:primeira + semanas * 7].reshape(semanas, 7).sum(axis=1)
+
+    return {
+        "sequencia_atual": atual,
+        "maior_sequencia": maior,
+        "media_7": float(acumulado[-1] - acumulado[max(n - 7, 0)]) / 7,
+        "media_30": float(acumulado[-1] - acumulado[max(n - 30, 0)]) / 30,
+        "semanas": semanas,
+        "semanas_meta": int((totais_semanas >= meta_semanal).sum()),
+        "tempo_por_dia_semana": np.bincount(dias_semana, weights=tempos, minlength=7).astype(np.int64).tolist(),
+        "dias_por_dia_semana": np.bincount(dias_semana, minlength=7).tolist(),
+    }
+
+
+def _estatisticas_python(inicio, tempos, codigos, estados, meta_diaria, meta_semanal):
+    n = len(tempos)
+    codigo_estudado = estados.index("Estudado") + 1 if "Estudado" in estados else -1
+
+    atual = maior = 0
+    for tempo, codigo in zip(tempos, codigos):
+        if tempo >= meta_diaria or codigo == codigo_estudado:
+            atual += 1
+            if atual > maior:
+                maior = atual
+        else:
+            atual = 0
+    if atual == 0 and n > 1:
+        # O dia de hoje ainda não acabou: sem estudo hoje, a sequência vai até ontem
+        for tempo, codigo in zip(reversed(tempos[:-1]), reversed(codigos[:-1])):
+            if tempo < meta_diaria and codigo != codigo_estudado:
+                break
+            atual += 1
+
+    acumulado = [0] + list(accumulate(tempos))
+    dia_semana_inicio = (inicio + DIA_SEMANA_EPOCA) % 7
+
+    primeira = (7 - dia_semana_inicio) % 7
+    ultima = n - 1 - (inicio + n - 1 + DIA_SEMANA_EPOCA) % 7
+    semanas = max((ultima - primeira) // 7, 0)
+    semanas_meta = sum(
+        1 for s in range(semanas)
+        if acumulado[primeira + (s + 1) * 7] - acumulado[primeira + s * 7] >= meta_semanal
+    )
+
+    tempo_por_dia_semana = [0] * 7
+    dias_por_dia_semana = [0] * 7
+    for d in range(7):
+        posicoes = range((d - dia_semana_inicio) % 7, n, 7)
+        tempo_por_dia_semana[d] = sum(tempos[i] for i in posicoes)
+        dias_por_dia_semana[d] = len(posicoes)
+
+    return {
+        "sequencia_atual": atual,
+        "maior_sequencia": maior,
+        "media_7": (acumulado[-1] - acumulado[max(n - 7, 0)]) / 7,
+        "media_30": (acumulado[-1] - acumulado[max(n - 30, 0)]) / 30,
+        "semanas": semanas,
+        "semanas_meta": semanas_meta,
+        "tempo_por_dia_semana": tempo_por_dia_semana,
+        "dias_por_dia_semana": dias_por_dia_semana,
+    }
+
+
+def calcular_estatisticas(hoje=None, usar_numpy=True):
+    """Estatísticas do histórico até `hoje`.
+
+    Um dia conta como estudado quando está marcado como "Estudado" ou quando o tempo
+    alcança a meta diária (meta semanal / 7). As médias móveis são em segundos por dia e
+    a taxa da meta considera só as semanas completas, de segunda a domingo.
+    """
+    hoje = hoje or core.relogio.hoje()
+    meta_semanal = core.dados["tempos"]["meta_semanal"]
+    meta_diaria = max(meta_semanal // 7, 1)
+    inicio, tempos, codigos, estados = _janela_historico(hoje)
+
+    np = carregar_numpy() if usar_numpy else None
+    if np is not None:
+        resultado = _estatisticas_numpy(np, inicio, tempos, codigos, estados, meta_diaria, meta_semanal)
+    else:
+        resultado = _estatisticas_python(inicio, tempos, codigos, estados, meta_diaria, meta_semanal)
+
+    resultado["taxa_meta_semanal"] = resultado["semanas_meta"] / resultado["semanas"] if resultado["semanas"] else 0.0
+    resultado["media_por_dia_semana"] = [
+        tempo / dias if dias else 0.0
+        for tempo, dias in zip(resultado["tempo_por_dia_semana"], resultado["dias_por_dia_semana"])
+    ]
+    return resultado
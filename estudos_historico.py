@@ -0,0 +1,209 @@
+"""Exportação e importação do histórico de estudos em NDJSON ou CSV.
+
+Tudo é feito com geradores: a exportação lê os dias em blocos de datas e escreve uma linha
+por dia, e a importação valida linha a linha e grava em lotes, então a memória usada não
+depende do tamanho do arquivo. No NDJSON cada linha é um dia,
+
+    {"data": "2025-04-09", "estado": "Estudado", "tempo": 7200}
+
+e a primeira pode trazer as configurações, {"tempos": {"foco": 1500, ...}}. O CSV tem as
+colunas data, estado e tempo (estado é opcional na importação) e não leva configurações.
+"""
+import csv
+import json
+import sys
+from datetime import date, timedelta
+from itertools import islice
+
+import estudos_core as core
+
+BLOCO_DIAS = 366  # Dias lidos do armazenamento por consulta na exportação
+LOTE_IMPORTACAO = 1000  # Dias gravados por lote na importação
+MAXIMO_ERROS = 10  # Erros de validação guardados para o relatório
+TEMPO_MAXIMO = 24 * 60 * 60  # Segundos estudados em um dia, no máximo
+
+
+def formato_do_arquivo(caminho):
+    return "csv" if caminho.lower().endswith(".csv") else "ndjson"
+
+
+def exportar_dias(inicio=None, fim=None):
+    """Gera {"data", "estado", "tempo"} de cada dia com registro entre `inicio` e `fim`, em ordem."""
+    primeiro, ultimo = core.intervalo_historico()
+    if primeiro is None:
+        return
+    inicio = max(inicio or date.min, date.fromisoformat(primeiro))
+    fim = min(fim or date.max, date.fromisoformat(ultimo))
+    if inicio > fim:
+        return
+    while True:
+        # Limita pelos dias que faltam antes de somar: perto de date.max a soma estouraria
+        fim_bloco = inicio + timedelta(days=min(BLOCO_DIAS - 1, (fim - inicio).days))
+        registros = core.consultar_dias(inicio, fim_bloco)
+        for data in sorted(registros):
+            registro = registros[data]
+            yield {"data": data, "estado": registro.get("estado", "-"), "tempo": registro.get("tempo", 0)}
+        if fim_bloco == fim:
+            return
+        inicio = fim_bloco + timedelta(days=1)
+
+
+def exportar_arquivo(caminho, inicio=None, fim=None, formato=None, tempos=True):
+    """Escreve o histórico em `caminho` ("-" para a saída padrão); devolve quantos dias.
+
+    Com `tempos`, o NDJSON começa pela linha das configurações de tempo.
+    """
+    formato = formato or formato_do_arquivo(caminho)
+    saida = sys.stdout if caminho == "-" else open(caminho, "w", encoding="utf-8", newline="")
+    quantidade = 0
+    try:
+        if formato == "csv":
+            escritor = csv.DictWriter(saida, fieldnames=("data", "estado", "tempo"))
+            escritor.writeheader()
+            for dia in exportar_dias(inicio, fim):
+                escritor.writerow(dia)
+                quantidade += 1
+        else:
+            if tempos:
+                saida.write(json.dumps({"tempos": core.dados["tempos"]}, ensure_ascii=False) + "\n")
+            for dia in exportar_dias(inicio, fim):
+                saida.write(json.dumps(dia, ensure_ascii=False) + "\n")
+                quantidade += 1
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    return quantidade
+
+
+def validar_dia(registro):
+    """(data, {"estado", "tempo"}) de um registro importado; ValueError se for inválido."""
+    try:
+        data = date.fromisoformat(str(registro["data"]).strip())
+    except KeyError:
+        raise ValueError("falta a data") from None
+    estado = registro.get("estado") or "-"
+    if estado not in core.DiasCompactos.ESTADOS:
+        estado = str(estado).strip()
+        if estado not in core.DiasCompactos.ESTADOS:
+            raise ValueError(f"estado desconhecido: {estado!r}")
+    tempo = registro.get("tempo") or 0
+    if type(tempo) is not int:  # Do CSV vem texto; de outros programas, às vezes 7200.0
+        if isinstance(tempo, str):
+            tempo = tempo.strip() or 0
+        if isinstance(tempo, bool) or int(float(tempo)) != float(tempo):
+            raise ValueError(f"tempo não é um número inteiro de segundos: {registro.get('tempo')!r}")
+        tempo = int(float(tempo))
+    if tempo < 0:
+        raise ValueError("tempo negativo")
+    if tempo > TEMPO_MAXIMO:
+        raise ValueError(f"tempo maior que um dia: {tempo}")
+    return data, {"estado": estado, "tempo": tempo}
+
+
+def validar_tempos(tempos):
+    """As configurações de tempo conhecidas, em segundos inteiros positivos; ValueError se inválidas."""
+    if not isinstance(tempos, dict):
+        raise ValueError("tempos deve ser um objeto")
+    validos = {}
+    for chave, valor in tempos.items():
+        if chave not in core.TEMPO_PADRAO:
+            raise ValueError(f"configuração desconhecida: {chave!r}")
+        if isinstance(valor, bool) or not isinstance(valor, int) or valor <= 0:
+            raise ValueError(f"{chave} deve ser um número inteiro positivo de segundos")
+        validos[chave] = valor
+    return validos
+
+
+def ler_ndjson(arquivo):
+    """Gera (número da linha, objeto) das linhas não vazias; objetos inválidos viram ValueError."""
+    for numero, linha in enumerate(arquivo, 1):
+        if not linha.strip():
+            continue
+        try:
+            yield numero, json.loads(linha)
+        except ValueError as e:
+            yield numero, ValueError(f"JSON inválido: {e}")
+
+
+def ler_csv(arquivo):
+    leitor = csv.DictReader(arquivo)
+    for registro in leitor:
+        yield leitor.line_num, registro
+
+
+class Importacao:
+    """Valida os registros lidos e entrega os dias em lotes para core.importar_dias."""
+
+    def __init__(self, registros, inicio=None, fim=None, tempos=True):
+        self.registros = registros  # Pares (número da linha, registro)
+        self.inicio = inicio
+        self.fim = fim
+        self.importar_tempos = tempos
+        self.ignorados = 0  # Fora do intervalo de datas
+        self.invalidos = 0
+        self.erros = []  # Os primeiros MAXIMO_ERROS, como "linha N: motivo"
+        self.tempos = None  # Configurações lidas do arquivo, aplicadas ao fim da leitura
+
+    def _erro(self, numero, motivo):
+        self.invalidos += 1
+        if len(self.erros) < MAXIMO_ERROS:
+            self.erros.append(f"linha {numero}: {motivo}")
+
+    def dias(self):
+        for numero, registro in self.registros:
+            try:
+                if isinstance(registro, ValueError):
+                    raise registro
+                if not isinstance(registro, dict):
+                    raise ValueError("a linha não é um objeto")
+                if "tempos" in registro and "data" not in registro:
+                    if self.importar_tempos:
+                        self.tempos = validar_tempos(registro["tempos"])
+                    continue
+                data, dia = validar_dia(registro)
+            except (ValueError, TypeError, OverflowError) as e:
+                self._erro(numero, e)
+                continue
+            if (self.inicio and data < self.inicio) or (self.fim and data > self.fim):
+                self.ignorados += 1
+                continue
+            yield data.isoformat(), dia
+
+    def lotes(self, tamanho=LOTE_IMPORTACAO):
+        dias = self.dias()
+        while True:
+            lote = list(islice(dias, tamanho))
+            if not lote:
+                break
+            yield lote
+        # Antes do flush de core.importar_dias, que só acontece depois do último lote
+        if self.tempos is not None:
+            core.dados["tempos"] = {**core.dados["tempos"], **self.tempos}
+
+
+def importar_arquivo(caminho, inicio=None, fim=None, formato=None, tempos=True):
+    """Importa `caminho` ("-" para a entrada padrão) por cima do histórico.
+
+    Devolve um dict com os dias importados, os ignorados por estarem fora do intervalo,
+    os inválidos, as mensagens dos primeiros erros e se as configurações de tempo (só no
+    NDJSON, e só com `tempos`) foram importadas.
+    """
+    formato = formato or formato_do_arquivo(caminho)
+    entrada = sys.stdin if caminho == "-" else open(caminho, "r", encoding="utf-8-sig", newline="")
+    try:
+        leitor = ler_csv(entrada) if formato == "csv" else ler_ndjson(entrada)
+        importacao = Importacao(leitor, inicio, fim, tempos)
+        quantidade = core.importar_dias(importacao.lotes())
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+    if importacao.tempos is not None and not quantidade:
+        core.salvar_dados(tempos=True)  # Sem dias, importar_dias não gravou nada
+        core.descarregar_dados()
+    return {
+        "dias": quantidade,
+        "ignorados": importacao.ignorados,
+        "invalidos": importacao.invalidos,
+        "erros": importacao.erros,
+        "tempos": importacao.tempos is not None,
+    }
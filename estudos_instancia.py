@@ -0,0 +1,145 @@
+"""Instância única do aplicativo e repasse de comandos entre execuções.
+
+A primeira execução trava o arquivo `.app.lock` (fcntl no Linux/macOS, msvcrt no Windows)
+e escuta comandos em um socket Unix ou, no Windows, em um named pipe. Uma segunda execução
+não abre janela nem carrega o som: manda o comando (mostrar a janela, iniciar ou pausar o
+timer, pedir o estado ou o resumo da semana) para a instância que já está aberta e termina.
+"""
+import concurrent.futures
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+import zlib
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+COMANDOS = ("mostrar", "iniciar", "pausar", "alternar", "status", "resumo")
+ESPERA_CONEXAO = 2.0  # Segundos tentando falar com uma instância que ainda está subindo
+ESPERA_RESPOSTA = 5.0  # Segundos esperando a janela executar o comando
+
+
+class InstanciaUnica:
+    """Trava de instância única de um diretório de dados e o canal de comandos dela."""
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self.caminho_trava = os.path.join(diretorio, ".app.lock")
+        self.caminho_chave = os.path.join(diretorio, ".app.chave")  # Autentica quem manda comandos
+        if sys.platform == "win32":
+            # Um pipe por diretório de dados, para instâncias de diretórios diferentes não se verem
+            self.endereco = r"\\.\pipe\EstudosTracker-%08x" % zlib.crc32(os.path.abspath(diretorio).encode())
+        else:
+            self.endereco = os.path.join(diretorio, ".app.sock")
+        self._arquivo = None
+        self._ouvinte = None
+
+    def adquirir(self):
+        """Tenta travar o diretório; False se outra instância já está aberta."""
+        os.makedirs(self.diretorio, exist_ok=True)
+        try:
+            self._arquivo = open(self.caminho_trava, "w")
+            if sys.platform == "win32":
+                import msvcrt
+                msvcrt.locking(self._arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+            return False
+        return True
+
+    def servir(self, tratador, executar):
+        """Atende os comandos de outras execuções.
+
+        `tratador(comando)` roda na thread do Tk, agendado por `executar` (como
+        CanalUI.executar), e devolve o dict enviado como resposta.
+        """
+        chave = secrets.token_bytes(32)
+        # A chave só pode ser lida pelo próprio usuário
+        descritor = os.open(self.caminho_chave, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descritor, "wb") as f:
+            f.write(chave)
+        if sys.platform != "win32" and os.path.exists(self.endereco):
+            os.remove(self.endereco)  # Sobra de uma instância que não fechou direito; a trava é nossa
+        self._ouvinte = Listener(self.endereco, authkey=chave)
+        threading.Thread(target=self._aceitar, args=(self._ouvinte, tratador, executar), daemon=True).start()
+
+    def _aceitar(self, ouvinte, tratador, executar):
+        while True:
+            try:
+                conexao = ouvinte.accept()  # Não relê self._ouvinte, que fechar() pode já ter limpado
+            except (OSError, EOFError, AuthenticationError):
+                if self._ouvinte is None:
+                    return  # Fechado
+                continue
+            threading.Thread(target=self._atender, args=(conexao, tratador, executar), daemon=True).start()
+
+    def _atender(self, conexao, tratador, executar):
+        with conexao:
+            try:
+                if not conexao.poll(ESPERA_RESPOSTA):
+                    return
+                comando = json.loads(conexao.recv_bytes(4096)).get("comando")
+                if comando not in COMANDOS:
+                    resposta = {"erro": f"comando desconhecido: {comando}"}
+                else:
+                    futuro = concurrent.futures.Future()
+
+                    def rodar():
+                        try:
+                            futuro.set_result(tratador(comando))
+                        except Exception as e:
+                            futuro.set_exception(e)
+
+                    executar(rodar)
+                    try:
+                        resposta = futuro.result(ESPERA_RESPOSTA)
+                    except concurrent.futures.TimeoutError:
+                        resposta = {"erro": "a janela não respondeu"}
+                    except Exception as e:
+                        resposta = {"erro": str(e)}
+                conexao.send_bytes(json.dumps(resposta, default=str).encode())  # Datas viram "%Y-%m-%d"
+            except (OSError, EOFError, ValueError):
+                pass
+
+    def enviar(self, comando):
+        """Manda `comando` à instância aberta; devolve a resposta, ou None se ela não atendeu."""
+        prazo = time.monotonic() + ESPERA_CONEXAO
+        while True:
+            try:
+                with open(self.caminho_chave, "rb") as f:
+                    chave = f.read()
+                conexao = Client(self.endereco, authkey=chave)
+                break
+            except (OSError, EOFError, AuthenticationError):
+                # A instância pode estar subindo (sem pipe ainda, ou com a chave da execução anterior)
+                if time.monotonic() > prazo:
+                    return None
+                time.sleep(0.02)
+
+        with conexao:
+            try:
+                conexao.send_bytes(json.dumps({"comando": comando}).encode())
+                if not conexao.poll(ESPERA_RESPOSTA + 1):
+                    return None
+                return json.loads(conexao.recv_bytes())
+            except (OSError, EOFError, ValueError):
+                return None
+
+    def fechar(self):
+        ouvinte, self._ouvinte = self._ouvinte, None
+        if ouvinte is not None:
+            ouvinte.close()  # No Linux também apaga o .app.sock
+            try:
+                os.remove(self.caminho_chave)  # Ainda com a trava: depois dela, a chave já pode ser de outra instância
+            except OSError:
+                pass
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
@@ -0,0 +1,251 @@
+"""Modo terminal do Estudos Tracker (--headless), sem Tk, bandeja nem pygame.
+
+Roda o mesmo PomodoroTimer e grava nos mesmos arquivos de dados que a janela, mostrando
+a contagem regressiva em uma única linha do terminal:
+
+    python estudos_tracker.py --headless            timer (espaço inicia/pausa, r reseta, q sai)
+    python estudos_tracker.py --headless status     estado do timer e a semana em uma linha
+    python estudos_tracker.py --headless resumo     o resumo da semana, como na janela
+
+Com outra instância aberta (janela ou terminal), `status` e `resumo` perguntam a ela.
+"""
+import argparse
+import heapq
+import os
+import queue
+import sys
+import time
+from datetime import date
+
+from estudos_core import (
+    DATA_DIR, dados, alarme, PomodoroTimer, carregar_dados, descarregar_dados, preencher_dias_perdidos,
+    resumo_semana, definir_perfil, perfil_salvo, perfil_em_uso,
+)
+from estudos_instancia import InstanciaUnica
+
+FASES = {"foco": "Foco", "pausa": "Pausa Curta", "pausa_longa": "Pausa Longa"}
+NOMES_DIAS = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+ESPERA_MAXIMA = 0.25  # Segundos entre verificações do teclado e dos comandos de outras execuções
+
+
+def formatar_status(estado):
+    mins, secs = divmod(estado["restante"], 60)
+    situacao = "rodando" if estado["executando"] else "parado"
+    return f"{FASES.get(estado['fase'], estado['fase'])}: {mins:02d}:{secs:02d} ({situacao}), {estado['ciclos']} ciclos"
+
+
+def horas(segundos):
+    return f"{segundos // 3600}h {(segundos % 3600) // 60}m"
+
+
+def formatar_resumo(resumo):
+    """As mesmas informações da janela "Resumo da Semana", em texto."""
+    meta = resumo["meta"]
+    total = resumo["total"]
+    linhas = ["Semana atual"]
+    for dia, tempo, estado in resumo["dias"]:
+        dia = date.fromisoformat(dia) if isinstance(dia, str) else dia  # Vindo de outra instância, é texto
+        estado = "Estudado" if estado == "Estudado" else "Não Estudado"
+        linhas.append(f"  {NOMES_DIAS[dia.weekday()]} {dia.strftime('%d/%m')}  {horas(tempo):>8}  {estado}")
+    linhas.append(f"Total: {horas(total)} ({int(total / meta * 100)}% da meta de {meta // 3600}h), "
+                  f"faltam {horas(max(meta - total, 0))}")
+    linhas.append("")
+    linhas.append(f"Semana passada: {horas(resumo['total_passado'])} de {meta // 3600}h, "
+                  + ("SUCESSO" if resumo["sucesso_passado"] else "FRACASSO"))
+    linhas.append(resumo["mensagem"])
+    return "\n".join(linhas)
+
+
+def formatar_semana(resumo):
+    meta = resumo["meta"]
+    return f"Semana: {horas(resumo['total'])} de {meta // 3600}h ({int(resumo['total'] / meta * 100)}%)"
+
+
+class AgendadorTerminal:
+    """Faz o papel do root do Tk para o PomodoroTimer: after/after_cancel sobre um heap.
+
+    Tudo roda na thread principal; funções de outras threads (os comandos repassados por
+    outras execuções) entram por `executar`, como no CanalUI da janela.
+    """
+
+    def __init__(self):
+        self._agenda = []  # Heap de (instante, id, função, args)
+        self._cancelados = set()
+        self._proximo_id = 0
+        self._externas = queue.SimpleQueue()
+
+    def after(self, ms, funcao, *args):
+        self._proximo_id += 1
+        heapq.heappush(self._agenda, (time.monotonic() + ms / 1000, self._proximo_id, funcao, args))
+        return self._proximo_id
+
+    def after_cancel(self, identificador):
+        self._cancelados.add(identificador)
+
+    def executar(self, funcao):
+        self._externas.put(funcao)
+
+    def rodar_pendentes(self):
+        """Roda o que já venceu; devolve quantos segundos esperar até o próximo agendamento."""
+        while True:
+            try:
+                self._externas.get_nowait()()
+            except queue.Empty:
+                break
+        while self._agenda and self._agenda[0][0] <= time.monotonic():
+            _, identificador, funcao, args = heapq.heappop(self._agenda)
+            if identificador in self._cancelados:
+                self._cancelados.discard(identificador)
+                continue
+            funcao(*args)
+        if not self._agenda:
+            return ESPERA_MAXIMA
+        return min(max(self._agenda[0][0] - time.monotonic(), 0), ESPERA_MAXIMA)
+
+
+class Teclado:
+    """Lê teclas sem esperar Enter: cbreak + select no Linux/macOS, msvcrt no Windows."""
+
+    def __init__(self):
+        self.interativo = sys.stdin.isatty()
+        self._termios = None
+        if self.interativo and sys.platform != "win32":
+            import termios
+            import tty
+            self._fd = sys.stdin.fileno()
+            self._termios = termios.tcgetattr(self._fd)
+            tty.setcbreak(self._fd)
+
+    def restaurar(self):
+        if self._termios is not None:
+            import termios
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._termios)
+            self._termios = None
+
+    def ler(self, espera):
+        """A tecla apertada dentro de `espera` segundos, ou None."""
+        if not self.interativo:
+            time.sleep(espera)
+            return None
+        if sys.platform == "win32":
+            import msvcrt
+            prazo = time.monotonic() + espera
+            while not msvcrt.kbhit():
+                if time.monotonic() >= prazo:
+                    return None
+                time.sleep(0.02)
+            return msvcrt.getwch()
+        import select
+        prontos, _, _ = select.select([sys.stdin], [], [], espera)
+        return os.read(self._fd, 1).decode(errors="ignore") if prontos else None
+
+
+class TimerTerminal:
+    """O PomodoroTimer com a contagem em uma linha do terminal."""
+
+    AJUDA = "[espaço] iniciar/pausar  [r] resetar  [q] sair"
+
+    def __init__(self, som=False):
+        alarme.silencioso = alarme.silencioso or not som  # Sem --som, só o sino do terminal
+        self.agendador = AgendadorTerminal()
+        self.timer = PomodoroTimer(self.agendador, self.mostrar)
+        self.atualiza_linha = sys.stdout.isatty()
+        self.fase_mostrada = None
+        self.rodando = True
+
+    def mostrar(self, tempo, tipo):
+        if tipo != self.fase_mostrada and self.fase_mostrada is not None:
+            sys.stdout.write("\a")  # Fim de fase
+        linha = f"{FASES.get(tipo, tipo)}  {tempo}  {'▶' if self.timer.executando else '⏸'}  ciclos: {dados['ciclos']}"
+        if self.atualiza_linha:
+            sys.stdout.write(f"\r{linha}   {self.AJUDA}\x1b[K")
+        elif tipo != self.fase_mostrada:
+            sys.stdout.write(linha + "\n")  # Redirecionado: uma linha por fase, não por segundo
+        sys.stdout.flush()
+        self.fase_mostrada = tipo
+
+    def tratar_comando(self, comando):
+        """Comandos repassados por outras execuções (como `estudos_tracker.py pausar`)."""
+        if comando == "iniciar":
+            self.timer.iniciar()
+        elif comando == "pausar":
+            self.timer.pausar()
+        elif comando == "alternar":
+            self.timer.alternar()
+        if comando == "resumo":
+            return {**self.timer.estado(), "resumo": resumo_semana()}
+        self.redesenhar()
+        return self.timer.estado()
+
+    def redesenhar(self):
+        self.mostrar(self.timer.formatar_tempo(self.timer.restante()), self.timer.tipo_atual)
+
+    def rodar(self):
+        teclado = Teclado()
+        try:
+            self.redesenhar()
+            while self.rodando:
+                tecla = teclado.ler(self.agendador.rodar_pendentes())
+                if tecla in (" ", "p"):
+                    self.timer.alternar()
+                    self.redesenhar()
+                elif tecla == "r":
+                    self.timer.resetar()
+                elif tecla in ("q", "\x1b"):
+                    self.rodando = False
+        except KeyboardInterrupt:
+            pass
+        finally:
+            teclado.restaurar()
+            self.timer.pausar()  # Registra no log de sessões o tempo rodado até aqui
+            if self.atualiza_linha:
+                sys.stdout.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="estudos_tracker.py --headless", description="Estudos Tracker no terminal")
+    parser.add_argument("comando", nargs="?", default="timer", choices=("timer", "status", "resumo"),
+                        help="timer (padrão), status ou resumo da semana")
+    parser.add_argument("--perfil", metavar="NOME", help="usa o perfil de estudo NOME")
+    parser.add_argument("--som", action="store_true", help="toca o alarme.mp3 (pygame) além do sino do terminal")
+    args = parser.parse_args(argv)
+    try:
+        definir_perfil(args.perfil or perfil_salvo())
+    except ValueError as e:
+        parser.error(f"--perfil: {e}")
+
+    instancia = InstanciaUnica(DATA_DIR)
+    if not instancia.adquirir():
+        if args.comando == "timer":
+            print("Erro: o aplicativo já está aberto (use status, resumo ou os comandos da janela).", file=sys.stderr)
+            return 1
+        resposta = instancia.enviar("resumo")
+        if resposta is None or "erro" in resposta:
+            print("Erro:", resposta["erro"] if resposta else "a instância aberta não respondeu", file=sys.stderr)
+            return 1
+        print(formatar_status(resposta))
+        if args.comando == "status":
+            print(formatar_semana(resposta["resumo"]))
+        else:
+            print(formatar_resumo(resposta["resumo"]))
+        return 0
+
+    try:
+        carregar_dados()
+        if args.comando == "status":
+            print(f"Timer parado ({perfil_em_uso()}). " + formatar_semana(resumo_semana()))
+        elif args.comando == "resumo":
+            print(formatar_resumo(resumo_semana()))
+        else:
+            preencher_dias_perdidos()
+            terminal = TimerTerminal(som=args.som)
+            instancia.servir(terminal.tratar_comando, terminal.agendador.executar)
+            terminal.rodar()
+        return 0
+    finally:
+        descarregar_dados()
+        instancia.fechar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,183 +1,118 @@
+import time
+_INICIO_IMPORTACOES = time.perf_counter()  # Usado pelo --profile-startup
+import sys
+
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    # O modo terminal não usa o Tk: despacha antes de importá-lo, para abrir em dezenas de ms
+    from estudos_terminal import main
+    sys.exit(main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
 import tkinter as tk
-from tkinter import messagebox, ttk
-from datetime import datetime, timedelta
-import json
+from tkinter import filedialog, messagebox, simpledialog, ttk
+from datetime import date, datetime
 import os
-import pygame
 import threading
-import time
+import collections
 import calendar
 import locale
-import random  # Adicione a importação do módulo random
-from pystray import Icon, Menu, MenuItem
-from PIL import Image, ImageDraw
-import sys
-import msvcrt  # Para garantir uma única instância no Windows
-
-# Define o caminho dos arquivos
-if getattr(sys, 'frozen', False):  # Verifica se está rodando como executável
-    BASE_PATH = sys._MEIPASS  # Diretório temporário onde os arquivos são extraídos
-else:
-    BASE_PATH = os.path.dirname(os.path.abspath(__file__))  # Diretório do script
-
-ICON_PATH = os.path.join(BASE_PATH, "icon.ico")
-ALARME_SOM = os.path.join(BASE_PATH, "alarme.mp3")
-
-# Define o caminho para o diretório de dados do usuário
-if sys.platform == "win32":
-    DATA_DIR = os.path.join(os.getenv("APPDATA"), "EstudosTracker")
-else:
-    DATA_DIR = os.path.join(os.path.expanduser("~"), ".estudos_tracker")
-
-DADOS_ARQUIVO = os.path.join(DATA_DIR, "dados_estudo.json")
+import argparse
 
-# Cria o diretório, se não existir
-if not os.path.exists(DATA_DIR):
-    os.makedirs(DATA_DIR)
+from estudos_core import (
+    BASE_PATH, DATA_DIR, dados, perfil, metricas, alarme, PomodoroTimer,
+    carregar_dados, salvar_dados, descarregar_dados, preencher_dias_perdidos,
+    resumo_semana, desempenho_semanal, dias_do_mes, dias_do_ano,
+    listar_perfis, perfil_em_uso, perfil_salvo, definir_perfil, trocar_perfil, validar_nome_perfil,
+)
+from estudos_estatisticas import calcular_estatisticas
+from estudos_instancia import COMANDOS, InstanciaUnica
+from estudos_terminal import formatar_status
 
-locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
+# pygame, PIL e pystray são importados só quando usados, pois dominam o tempo de abertura
 
-TEMPO_PADRAO = {
-    "foco": 25 * 60,
-    "pausa": 5 * 60,
-    "pausa_longa": 15 * 60,
-    "meta_semanal": 10 * 60 * 60
-}
+_FIM_IMPORTACOES = time.perf_counter()
 
-dados = {
-    "dias": {},
-    "tempos": TEMPO_PADRAO,
-    "ciclos": 0
-}
+ICON_PATH = os.path.join(BASE_PATH, "icon.ico")
 
-mensagem_atual = {"semana": None, "mensagem": None}
+class CanalUI:
+    """Canal entre as outras threads e o loop do Tk, drenado em intervalos fixos.
 
-def carregar_dados():
-    if not os.path.exists(DADOS_ARQUIVO):
-        with open(DADOS_ARQUIVO, "w", encoding="utf-8") as f:
-            json.dump(dados, f, indent=4, ensure_ascii=False)  # Cria o arquivo com os dados padrão
-    else:
-        with open(DADOS_ARQUIVO, "r", encoding="utf-8") as f:
-            dados.update(json.load(f))
+    Atualizações visuais são agrupadas: fica só a última de cada chave e o calendário é
+    redesenhado uma vez por rajada. Elas esperam enquanto a janela está oculta.
+    Ações (como as do menu da bandeja) rodam sempre, na ordem em que chegaram.
+    """
 
-def salvar_dados():
-    with open(DADOS_ARQUIVO, "w", encoding="utf-8") as f:
-        json.dump(dados, f, indent=4, ensure_ascii=False)
+    TODOS = object()  # Marca uma atualização do calendário inteiro
 
-def tocar_alarme():
-    try:
-        pygame.mixer.init()
-        pygame.mixer.music.load(ALARME_SOM)
-        pygame.mixer.music.play()
-    except Exception as e:
-        print("Erro ao tocar alarme:", e)
-
-def verificar_meta_diaria():
-    """Verifica se a meta diária foi atingida e marca o dia como 'Não Estudado' se necessário."""
-    dia_atual = datetime.now().strftime("%Y-%m-%d")
-    registro = dados["dias"].setdefault(dia_atual, {"estado": "-", "tempo": 0})
-    meta_diaria = dados["tempos"]["meta_semanal"] // 7  # Divide a meta semanal por 7 para obter a meta diária
-
-    if registro["tempo"] < meta_diaria and registro["estado"] == "-":
-        registro["estado"] = "Não Estudado"
-        salvar_dados()
-
-class PomodoroTimer:
-    def __init__(self, app, update_callback):
-        self.app = app  # Referência à instância da classe App
-        self.update_callback = update_callback
-        self.tempo_total = dados["tempos"]["foco"]
-        self.tempo_restante = self.tempo_total
-        self.executando = False
-        self.tipo_atual = "foco"
-        self.thread = None
+    def __init__(self, root, atualizar_calendario, intervalo_ms=50):
+        self.root = root
+        self.atualizar_calendario = atualizar_calendario
+        self.intervalo_ms = intervalo_ms
+        self._lock = threading.Lock()
+        self._visuais = {}  # chave -> (função, argumentos); só a última é mantida
+        self._calendario = set()  # Dias pendentes ou TODOS
+        self._acoes = collections.deque()
+
+    def enviar(self, chave, funcao, *args):
+        with self._lock:
+            self._visuais[chave] = (funcao, args)
+
+    def enviar_calendario(self, dia=None):
+        with self._lock:
+            if dia is None:
+                self._calendario = self.TODOS
+            elif self._calendario is not self.TODOS:
+                self._calendario.add(dia)
+
+    def executar(self, funcao, *args):
+        with self._lock:
+            self._acoes.append((funcao, args))
 
     def iniciar(self):
-        if not self.executando:
-            self.executando = True
-            self.thread = threading.Thread(target=self.run)
-            self.thread.start()
-
-    def pausar(self):
-        self.executando = False
-
-    def resetar(self):
-        if not self.executando and self.tempo_restante == dados["tempos"]["foco"]:
-            # Marca o dia como "Falha" se o Pomodoro não foi iniciado
-            dia = datetime.now().strftime("%Y-%m-%d")
-            registro = dados["dias"].setdefault(dia, {"estado": "-", "tempo": 0})
-            if registro["estado"] == "-":  # Apenas atualiza se o estado for vazio
-                registro["estado"] = "Falhei"
-            salvar_dados()
-
-        self.executando = False
-        self.tempo_restante = dados["tempos"][self.tipo_atual]
-        self.update_callback(self.formatar_tempo(self.tempo_restante), self.tipo_atual)
-
-        # Verifica a meta diária
-        verificar_meta_diaria()
-
-    def run(self):
-        tempo_inicial = self.tempo_restante  # Salva o tempo inicial para calcular o tempo estudado
-
-        while self.tempo_restante > 0 and self.executando:
-            mins, secs = divmod(self.tempo_restante, 60)
-            self.update_callback(f"{mins:02d}:{secs:02d}", self.tipo_atual)
-            time.sleep(1)
-            self.tempo_restante -= 1
-
-        if self.tempo_restante <= 0:
-            tocar_alarme()
-
-            if self.tipo_atual == "foco":
-                dados["ciclos"] += 1
-                tempo_estudado = tempo_inicial  # Calcula o tempo efetivamente estudado
-                dia = datetime.now().strftime("%Y-%m-%d")
-                registro = dados["dias"].setdefault(dia, {"estado": "-", "tempo": 0})
-
-                # Marca o dia como "Estudado" e adiciona o tempo
-                registro["tempo"] += tempo_estudado
-                if registro["estado"] == "-":  # Apenas atualiza se o estado for vazio
-                    registro["estado"] = "Estudado"
-                salvar_dados()
-
-                # Atualiza o calendário imediatamente
-                self.app.atualizar_calendario()
-
-            if self.tipo_atual == "foco":
-                self.tipo_atual = "pausa_longa" if dados["ciclos"] % 4 == 0 else "pausa"
+        self.root.after(self.intervalo_ms, self.drenar)
+
+    def drenar(self):
+        # Reagenda primeiro: uma ação pode destruir a janela e encerrar o app
+        self.root.after(self.intervalo_ms, self.drenar)
+
+        with self._lock:
+            acoes, self._acoes = self._acoes, collections.deque()
+        for funcao, args in acoes:
+            funcao(*args)
+
+        if self.root.state() not in ("withdrawn", "iconic"):
+            with self._lock:
+                visuais, self._visuais = self._visuais, {}
+                calendario, self._calendario = self._calendario, set()
+            for funcao, args in visuais.values():
+                funcao(*args)
+            if calendario is self.TODOS:
+                self.atualizar_calendario()
             else:
-                self.tipo_atual = "foco"
-
-            self.tempo_restante = dados["tempos"][self.tipo_atual]
-            self.executando = False
-            self.update_callback(self.formatar_tempo(self.tempo_restante), self.tipo_atual)
-
-    def alternar(self):
-        if (self.executando):
-            self.pausar()
-        else:
-            self.iniciar()
-
-    def formatar_tempo(self, segundos, tipo=None):
-        mins, secs = divmod(segundos, 60)
-        return f"{mins:02d}:{secs:02d}"
+                for dia in calendario:
+                    self.atualizar_calendario(dia=dia)
 
 class App:
+    NOVO_PERFIL = "Novo perfil..."
+
     def __init__(self, root):
         self.root = root
         self.root.title("Controle de Estudos")
         self.root.geometry("750x700")
         self.root.resizable(False, False)
         self.root.iconbitmap(ICON_PATH)
-        self.timer = PomodoroTimer(self, self.atualizar_timer)  # Passa a instância de App
+        self.canal = CanalUI(self.root, self.atualizar_calendario)
+        self.api = None  # ServidorAPI, se aberto com --api
+        self.instancia = None  # InstanciaUnica que atende os comandos de outras execuções
+        self.timer = PomodoroTimer(self.root, self.publicar_timer, self.canal.enviar_calendario)
 
         self.mes_atual = datetime.today().month
         self.ano_atual = datetime.today().year
 
         self.criar_widgets()
-        carregar_dados()
+        # Os dados já foram carregados em __main__, medidos à parte pelo --profile-startup
+        preencher_dias_perdidos()  # Dias em que o aplicativo ficou fechado
         self.atualizar_calendario()
+        self.canal.iniciar()
 
     def criar_widgets(self):
         # Frame superior
@@ -198,6 +133,32 @@ class App:
         )
         self.btn_opcoes.grid(row=0, column=0, padx=10)
 
+        # Botão do mapa anual
+        self.btn_mapa = tk.Button(
+            self.frame_cima,
+            text="🗓️ Mapa Anual",
+            command=lambda: JanelaMapaAnual(self),
+            font=("Arial", 12),
+            bg="#4CAF50",
+            fg="white",
+            relief="flat",
+            activebackground="#45a049",
+            cursor="hand2"
+        )
+        self.btn_mapa.grid(row=0, column=1, padx=10)
+
+        # Perfil de estudo; a lista é relida a cada abertura
+        tk.Label(self.frame_cima, text="👤", font=("Arial", 12), bg="#f0f0f0").grid(row=0, column=2, padx=(10, 0))
+        self.combo_perfil = ttk.Combobox(
+            self.frame_cima,
+            state="readonly",
+            width=16,
+            postcommand=lambda: self.combo_perfil.config(values=listar_perfis() + [self.NOVO_PERFIL])
+        )
+        self.combo_perfil.set(perfil_em_uso())
+        self.combo_perfil.bind("<<ComboboxSelected>>", self.selecionar_perfil)
+        self.combo_perfil.grid(row=0, column=3)
+
         # Timer
         self.label_timer = tk.Label(
             self.root,
@@ -247,19 +208,17 @@ class App:
         # Calendário
         self.frame_calendario = tk.Frame(self.root, bg="#ffffff")
         self.frame_calendario.pack(pady=20, fill="both", expand=True)
+        self.criar_calendario()
 
     def abrir_resumo_semana(self):
         x = self.root.winfo_x() + 60
         y = self.root.winfo_y() + 60
         win = tk.Toplevel(self.root)
         win.title("Resumo da Semana")
-        win.geometry(f"550x600+{x}+{y}")
+        win.geometry(f"550x680+{x}+{y}")
 
-        hoje = datetime.now().date()
-        inicio_semana = hoje - timedelta(days=(hoje.weekday()))  # Segunda-feira da semana atual
-        dias_semana = [inicio_semana + timedelta(days=i) for i in range(7)]
-        total_tempo = 0
-        faltas = 0
+        resumo = resumo_semana()
+        total_tempo = resumo["total"]
 
         # Título da Semana Atual
         tk.Label(win, text="Resumo da Semana Atual", font=("Arial", 14, "bold")).pack(pady=10)
@@ -277,18 +236,9 @@ class App:
         # Nomes dos dias da semana em português
         nomes_dias = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
 
-        for dia in dias_semana:
-            data_str = dia.strftime("%Y-%m-%d")
-            info = dados["dias"].get(data_str, {})
-            tempo = info.get("tempo", 0)
-            estado = info.get("estado", "-")
+        for dia, tempo, estado in resumo["dias"]:
             horas = tempo // 3600
             minutos = (tempo % 3600) // 60
-            total_tempo += tempo
-
-            # Conta as faltas
-            if estado == "Falhei":
-                faltas += 1
 
             # Define o estado como "Estudado" ou "Não Estudado"
             estado_formatado = "Estudado" if estado == "Estudado" else "Não Estudado"
@@ -301,7 +251,7 @@ class App:
             ))
 
         # Exibe o total de horas estudadas e a meta semanal
-        meta = dados["tempos"]["meta_semanal"]
+        meta = resumo["meta"]
         horas_totais = total_tempo // 3600
         minutos_totais = (total_tempo % 3600) // 60
         horas_restantes = (meta - total_tempo) // 3600
@@ -322,24 +272,19 @@ class App:
         tk.Label(win, text="Resumo da Semana Passada", font=("Arial", 14, "bold")).pack(pady=10)
 
         # Resumo da semana passada
-        inicio_semana_passada = inicio_semana - timedelta(days=7)
-        dias_semana_passada = [inicio_semana_passada + timedelta(days=i) for i in range(7)]
-        total_tempo_passado = sum(
-            dados["dias"].get(dia.strftime("%Y-%m-%d"), {}).get("tempo", 0) for dia in dias_semana_passada
-        )
+        total_tempo_passado = resumo["total_passado"]
         horas_totais_passado = total_tempo_passado // 3600
         minutos_totais_passado = (total_tempo_passado % 3600) // 60
         horas_pendentes_passado = (meta - total_tempo_passado) // 3600
 
-        # Determina o status da semana passada
-        if total_tempo_passado >= meta:
+        # Status da semana passada; a mensagem é a salva com o resumo dela
+        if resumo["sucesso_passado"]:
             status = "SUCESSO"
             cor_status = "green"
-            mensagem = self.obter_mensagem_motivacional(sucesso=True)
         else:
             status = "FRACASSO"
             cor_status = "red"
-            mensagem = self.obter_mensagem_motivacional(sucesso=False)
+        mensagem = resumo["mensagem"]
 
         resumo_passado = (
             f"Meta: {meta // 3600}h\n"
@@ -350,52 +295,70 @@ class App:
         tk.Label(win, text=status, font=("Arial", 14, "bold"), fg=cor_status).pack(pady=5)
         tk.Label(win, text=mensagem, font=("Arial", 10), wraplength=500, justify="center").pack(pady=10)
 
+        # Estatísticas de todo o histórico
+        estatisticas = calcular_estatisticas()
+        historico = (
+            f"Sequência atual: {estatisticas['sequencia_atual']} dias "
+            f"(recorde: {estatisticas['maior_sequencia']})\n"
+            f"Média diária: {int(estatisticas['media_7']) // 60}m (7 dias), "
+            f"{int(estatisticas['media_30']) // 60}m (30 dias)\n"
+            f"Semanas com a meta batida: {int(estatisticas['taxa_meta_semanal'] * 100)}%"
+        )
+        tk.Label(win, text=historico, font=("Arial", 10)).pack(pady=5)
+
         # Botão para fechar a janela
         tk.Button(win, text="Fechar", command=win.destroy).pack(pady=5)
 
-    def obter_mensagem_motivacional(self, sucesso):
-        global mensagem_atual  # Declara que estamos usando a variável global
-
-        # Lista de mensagens positivas e negativas
-        mensagens_sucesso = [
-            "Parabéns! Você está cada vez mais perto dos seus objetivos!",
-            "Ótimo trabalho! Continue assim e você alcançará grandes coisas.",
-            "Você está no caminho certo. Mantenha o foco e a determinação!",
-            "Incrível! Cada esforço está valendo a pena.",
-            "Você provou que a disciplina é a chave para o sucesso!",
-            "Mais uma semana concluída com sucesso. Continue avançando!",
-            "Seu progresso é inspirador. Não pare agora!",
-            "Você é a prova de que a consistência traz resultados.",
-            "Excelente! Você está construindo um futuro brilhante.",
-            "Sucesso é a soma de pequenos esforços repetidos diariamente. Continue assim!"
-        ]
-
-        mensagens_fracasso = [
-            "Não desista! Use esta semana como aprendizado para melhorar.",
-            "Fracassos fazem parte do caminho. Levante-se e tente novamente!",
-            "Você pode fazer melhor! Acredite no seu potencial e continue tentando.",
-            "Cada dia é uma nova chance de recomeçar. Não desista agora!",
-            "Fracassar não é o fim, é apenas uma lição para o próximo passo.",
-            "Você é mais forte do que imagina. Não deixe uma semana ruim te parar.",
-            "O importante é continuar tentando. Grandes conquistas levam tempo.",
-            "Não se preocupe com o fracasso, preocupe-se em não tentar novamente.",
-            "A jornada é longa, mas cada passo conta. Continue caminhando!",
-            "Você não falhou, apenas encontrou uma maneira de melhorar. Recomece!"
-        ]
-
-        # Calcula o número da semana atual
-        semana_atual = datetime.now().isocalendar()[1]
+    def executar_comando(self, comando):
+        """Executa um comando repassado por outra execução do aplicativo e devolve o estado do timer."""
+        if comando == "mostrar":
+            self.root.deiconify()
+            self.root.lift()
+            self.root.focus_force()
+        elif comando == "iniciar":
+            self.timer.iniciar()
+        elif comando == "pausar":
+            self.timer.pausar()
+        elif comando == "alternar":
+            self.timer.alternar()
+        elif comando == "resumo":
+            return {**self.timer.estado(), "resumo": resumo_semana()}
+        return self.timer.estado()
+
+    def selecionar_perfil(self, evento=None):
+        nome = self.combo_perfil.get()
+        if nome == self.NOVO_PERFIL:
+            nome = simpledialog.askstring("Novo Perfil", "Nome do perfil:", parent=self.root)
+            if not nome:
+                self.combo_perfil.set(perfil_em_uso())
+                return
+        try:
+            nome = validar_nome_perfil(nome)
+        except ValueError as e:
+            messagebox.showerror("Erro", str(e))
+            self.combo_perfil.set(perfil_em_uso())
+            return
+        if nome != perfil_em_uso():
+            self.trocar_perfil(nome)
 
-        # Verifica se a mensagem já foi definida para a semana atual
-        if mensagem_atual["semana"] != semana_atual:
-            # Escolhe uma nova mensagem aleatória com base no sucesso ou fracasso
-            if sucesso:
-                mensagem_atual["mensagem"] = random.choice(mensagens_sucesso)
-            else:
-                mensagem_atual["mensagem"] = random.choice(mensagens_fracasso)
-            mensagem_atual["semana"] = semana_atual
+    def trocar_perfil(self, nome):
+        """Grava o perfil atual e passa a mostrar `nome`, carregando só os dados dele."""
+        self.timer.pausar()
+        try:
+            trocar_perfil(nome)
+        except Exception as e:
+            # O perfil atual continua aberto, sem nada trocado
+            messagebox.showerror("Erro", f"Não foi possível abrir o perfil {nome}: {e}")
+            self.combo_perfil.set(perfil_em_uso())
+            return
+        preencher_dias_perdidos()
+        self.timer.recarregar()  # Os tempos de foco e pausa são do perfil novo
+        self.combo_perfil.set(nome)
+        self.atualizar_calendario()
 
-        return mensagem_atual["mensagem"]
+    def publicar_timer(self, tempo, tipo):
+        """Envia o estado do timer pelo canal; só o mais recente chega à tela."""
+        self.canal.enviar("timer", self.atualizar_timer, tempo, tipo)
 
     def atualizar_timer(self, tempo, tipo):
         self.label_timer.config(text=tempo)
@@ -411,7 +374,7 @@ class App:
         y = self.root.winfo_y() + 100
         win = tk.Toplevel(self.root)
         win.title("Opções de Tempo")
-        win.geometry(f"300x300+{x}+{y}")
+        win.geometry(f"300x330+{x}+{y}")
 
         def salvar_tempos():
             try:
@@ -419,7 +382,7 @@ class App:
                 dados["tempos"]["pausa"] = int(entry_pausa.get()) * 60
                 dados["tempos"]["pausa_longa"] = int(entry_pausa_longa.get()) * 60
                 dados["tempos"]["meta_semanal"] = int(entry_meta.get()) * 3600
-                salvar_dados()
+                salvar_dados(tempos=True)
                 self.timer.resetar()
                 win.destroy()
             except ValueError:
@@ -446,6 +409,7 @@ class App:
         entry_meta.pack()
 
         tk.Button(win, text="Salvar", command=salvar_tempos).pack(pady=10)
+        tk.Button(win, text="Diagnóstico", command=lambda: JanelaDiagnostico(self)).pack()
 
     def abrir_seletor_data(self):
         x = self.root.winfo_x() + 120
@@ -481,20 +445,15 @@ class App:
 
         tk.Button(win, text="Aplicar", command=aplicar).pack(pady=10)
 
-    def atualizar_calendario(self):
-        # Limpa o frame do calendário antes de atualizá-lo
-        for widget in self.frame_calendario.winfo_children():
-            widget.destroy()
-
+    def criar_calendario(self):
+        """Cria uma única vez os widgets do calendário; depois eles só são reconfigurados."""
         # Adiciona o botão central para selecionar o mês e o ano
         nav_frame = tk.Frame(self.frame_calendario, bg="#ffffff")
         nav_frame.grid(row=0, column=0, columnspan=7, pady=5, sticky="ew")
 
-        # Exibe o mês com a primeira letra maiúscula
-        nome_mes = datetime(self.ano_atual, self.mes_atual, 1).strftime("%B").capitalize()
-        btn_mes_ano = tk.Button(
+        self.btn_mes_ano = tk.Button(
             nav_frame,
-            text=f"{nome_mes} {self.ano_atual}",
+            text="",
             font=("Arial", 14, "bold"),
             command=self.abrir_seletor_data,
             relief="flat",
@@ -503,7 +462,7 @@ class App:
             activebackground="#45a049",
             cursor="hand2"
         )
-        btn_mes_ano.pack()
+        self.btn_mes_ano.pack()
 
         # Adiciona os nomes dos dias da semana
         dias_semana = ["Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sáb"]
@@ -520,43 +479,89 @@ class App:
         for i in range(7):
             self.frame_calendario.columnconfigure(i, weight=1)
 
-        # Cria um calendário para o mês e ano atuais
-        cal = calendar.Calendar(firstweekday=0)  # Começa na segunda-feira
-        dias_mes = list(cal.itermonthdays(self.ano_atual, self.mes_atual))  # Converte o gerador em uma lista
+        # Grade fixa de 6 semanas, suficiente para qualquer mês
+        self.celulas = []
+        for i in range(42):
+            btn = tk.Button(
+                self.frame_calendario,
+                text="",
+                bg="#ffffff",
+                relief="flat",
+                width=4,
+                height=2,
+                command=lambda i=i: self.clicar_celula(i)
+            )
+            btn.grid(row=(i // 7) + 2, column=(i % 7), sticky="nsew")
+            self.celulas.append(btn)
+        self.datas_celulas = [None] * 42  # Data ("%Y-%m-%d") exibida em cada célula
+        self.aparencia_celulas = [None] * 42  # Última configuração aplicada a cada célula
+        self.titulo_calendario = None
 
-        # Data atual
+        # Configura as linhas para expandirem proporcionalmente
+        for i in range(8):
+            self.frame_calendario.rowconfigure(i, weight=1)
+
+    def clicar_celula(self, i):
+        if self.datas_celulas[i] is not None:
+            self.editar_estado_dia(self.datas_celulas[i])
+
+    def configurar_celula(self, i, data_str, texto, cor, bg_cor):
+        """Reconfigura a célula `i` apenas se algo mudou desde a última atualização; devolve se mudou."""
+        self.datas_celulas[i] = data_str
+        aparencia = (texto, cor, bg_cor)
+        if self.aparencia_celulas[i] != aparencia:
+            self.celulas[i].config(text=texto, fg=cor, bg=bg_cor, cursor="hand2" if data_str else "")
+            self.aparencia_celulas[i] = aparencia
+            return True
+        return False
+
+    def aparencia_dia(self, data, registro, hoje):
+        estado = registro.get("estado", "-")
+        tempo = registro.get("tempo", 0)
+        horas = tempo // 3600
+        minutos = (tempo % 3600) // 60
+
+        cor = "green" if estado == "Estudado" else "red" if estado == "Falhei" else "gray"
+        bg_cor = "#e8f5e9" if data == hoje else "#ffffff"
+        return f"{data.day}\n{horas}h {minutos}m", cor, bg_cor
+
+    def atualizar_calendario(self, dia=None):
+        """Atualiza o calendário; com `dia` ("%Y-%m-%d") reconfigura só a célula desse dia."""
+        inicio = time.perf_counter()
+        reconfigurados = self.desenhar_calendario(dia)
+        if metricas.ativo:
+            metricas.registrar("calendario_ms", (time.perf_counter() - inicio) * 1000)
+            metricas.registrar("calendario_widgets", reconfigurados)
+
+    def desenhar_calendario(self, dia=None):
+        """Aplica as mudanças ao calendário e devolve quantos widgets foram reconfigurados."""
         hoje = datetime.now().date()
 
-        # Adiciona os dias ao calendário
-        for i, dia in enumerate(dias_mes):
-            if dia == 0:
+        if dia is not None:
+            data = date.fromisoformat(dia)
+            if (data.year, data.month) != (self.ano_atual, self.mes_atual):
+                return 0
+            # Deslocamento do dia 1 na grade, que começa na segunda-feira
+            i = calendar.monthrange(self.ano_atual, self.mes_atual)[0] + data.day - 1
+            return int(self.configurar_celula(i, dia, *self.aparencia_dia(data, dados["dias"].get(dia, {}), hoje)))
+
+        # Exibe o mês com a primeira letra maiúscula
+        nome_mes = datetime(self.ano_atual, self.mes_atual, 1).strftime("%B").capitalize()
+        titulo = f"{nome_mes} {self.ano_atual}"
+        reconfigurados = 0
+        if titulo != self.titulo_calendario:
+            self.btn_mes_ano.config(text=titulo)
+            self.titulo_calendario = titulo
+            reconfigurados += 1
+
+        for i, celula in enumerate(dias_do_mes(self.ano_atual, self.mes_atual)):
+            if celula is None:
                 # Dias fora do mês atual
-                tk.Label(self.frame_calendario, text="", width=4, bg="#ffffff").grid(row=(i // 7) + 2, column=i % 7, sticky="nsew")
+                reconfigurados += self.configurar_celula(i, None, "", "gray", "#ffffff")
             else:
-                data = datetime(self.ano_atual, self.mes_atual, dia).date()
-                estado = dados["dias"].get(data.strftime("%Y-%m-%d"), {}).get("estado", "-")
-                tempo = dados["dias"].get(data.strftime("%Y-%m-%d"), {}).get("tempo", 0)
-                horas = tempo // 3600
-                minutos = (tempo % 3600) // 60
-
-                cor = "green" if estado == "Estudado" else "red" if estado == "Falhei" else "gray"
-                bg_cor = "#e8f5e9" if data == hoje else "#ffffff"
-
-                btn = tk.Button(
-                    self.frame_calendario,
-                    text=f"{dia}\n{horas}h {minutos}m",
-                    bg=bg_cor,
-                    fg=cor,
-                    relief="flat",
-                    width=4,
-                    height=2,
-                    command=lambda d=data.strftime("%Y-%m-%d"): self.editar_estado_dia(d)
-                )
-                btn.grid(row=(i // 7) + 2, column=(i % 7), sticky="nsew")
-
-        # Configura as linhas para expandirem proporcionalmente
-        for i in range((len(dias_mes) // 7) + 2):
-            self.frame_calendario.rowconfigure(i, weight=1)
+                data, data_str, registro = celula
+                reconfigurados += self.configurar_celula(i, data_str, *self.aparencia_dia(data, registro, hoje))
+        return reconfigurados
 
     def mes_anterior(self):
         if self.mes_atual == 1:
@@ -573,22 +578,16 @@ class App:
         win.title("Desempenho Semanal")
         win.geometry(f"400x300+{x}+{y}")
 
-        hoje = datetime.now().date()
-        dias_semana = [hoje - timedelta(days=i) for i in range(7)]
-        total_tempo = 0
-
-        for dia in dias_semana:
-            data_str = dia.strftime("%Y-%m-%d")
-            info = dados["dias"].get(data_str, {})
-            tempo = info.get("tempo", 0)
-            estado = info.get("estado", "-")
+        desempenho = desempenho_semanal()
+        total_tempo = desempenho["total"]
+
+        for dia, tempo, estado in desempenho["dias"]:
             horas = tempo // 3600
             minutos = (tempo % 3600) // 60
-            total_tempo += tempo
             texto = f"{dia.strftime('%a %d/%m')}: {horas}h {minutos}m - {estado}"
             tk.Label(win, text=texto, anchor="w", justify="left").pack(fill="x")
 
-        meta = dados["tempos"]["meta_semanal"]
+        meta = desempenho["meta"]
         horas_totais = total_tempo // 3600
         minutos_totais = (total_tempo % 3600) // 60
         porcentagem = int((total_tempo / meta) * 100)
@@ -611,8 +610,8 @@ class App:
         def definir_estado(estado):
             dia = dados["dias"].setdefault(data, {"estado": "-", "tempo": 0})
             dia["estado"] = estado
-            salvar_dados()
-            self.atualizar_calendario()  # Atualiza o calendário imediatamente
+            salvar_dados(dia=data)
+            self.atualizar_calendario(dia=data)  # Atualiza o calendário imediatamente
             win.destroy()
 
         tk.Label(win, text=f"Data: {data}").pack(pady=10)
@@ -620,6 +619,205 @@ class App:
         tk.Button(win, text="Falhei", command=lambda: definir_estado("Falhei")).pack(fill="x")
         tk.Button(win, text="Não era pra estudar", command=lambda: definir_estado("-")).pack(fill="x")
 
+class JanelaMapaAnual:
+    """Mapa de calor de um ano inteiro, desenhado em um único Canvas.
+
+    Os 378 quadrados (54 semanas x 7 dias) são criados uma vez; trocar de ano só muda a
+    cor dos que mudaram, e o clique é resolvido pela posição em vez de um bind por item.
+    """
+
+    TAMANHO = 12  # Lado de cada quadrado (px)
+    PASSO = 15  # Distância entre quadrados vizinhos (px)
+    MARGEM_X = 34
+    MARGEM_Y = 24
+    SEMANAS = 54  # Um ano bissexto que começa no domingo ocupa 54 colunas
+    CORES = ["#ebedf0", "#9be9a8", "#40c463", "#30a14e", "#216e39"]  # Sem estudo -> meta diária batida
+    COR_FALHA = "#f28b82"
+    NOMES_MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+
+    def __init__(self, app):
+        self.app = app
+        self.ano = datetime.now().year
+
+        x = app.root.winfo_x() + 40
+        y = app.root.winfo_y() + 120
+        self.win = tk.Toplevel(app.root)
+        self.win.title("Mapa Anual")
+        self.win.geometry(f"+{x}+{y}")
+        self.win.resizable(False, False)
+
+        # Navegação entre os anos
+        nav_frame = tk.Frame(self.win)
+        nav_frame.pack(pady=5)
+        tk.Button(nav_frame, text="◀", relief="flat", command=lambda: self.mudar_ano(-1)).pack(side="left")
+        self.label_ano = tk.Label(nav_frame, font=("Arial", 14, "bold"), width=6)
+        self.label_ano.pack(side="left")
+        tk.Button(nav_frame, text="▶", relief="flat", command=lambda: self.mudar_ano(1)).pack(side="left")
+
+        largura = self.MARGEM_X + self.SEMANAS * self.PASSO + 10
+        altura = self.MARGEM_Y + 7 * self.PASSO + 5
+        self.canvas = tk.Canvas(self.win, width=largura, height=altura, bg="#ffffff", highlightthickness=0)
+        self.canvas.pack(padx=10)
+
+        for linha, nome in ((0, "Seg"), (2, "Qua"), (4, "Sex")):
+            y_texto = self.MARGEM_Y + linha * self.PASSO + self.TAMANHO // 2
+            self.canvas.create_text(self.MARGEM_X - 6, y_texto, text=nome, anchor="e", font=("Arial", 8))
+        self.rotulos_meses = [
+            self.canvas.create_text(0, self.MARGEM_Y - 12, text=nome, anchor="w", font=("Arial", 8))
+            for nome in self.NOMES_MESES
+        ]
+
+        # Quadrados em ordem de coluna: índice = semana * 7 + dia da semana
+        self.quadrados = []
+        for semana in range(self.SEMANAS):
+            for dia_semana in range(7):
+                x0 = self.MARGEM_X + semana * self.PASSO
+                y0 = self.MARGEM_Y + dia_semana * self.PASSO
+                self.quadrados.append(self.canvas.create_rectangle(
+                    x0, y0, x0 + self.TAMANHO, y0 + self.TAMANHO, outline="", fill=self.CORES[0]
+                ))
+        self.cores = [None] * len(self.quadrados)  # Última cor aplicada a cada quadrado
+        self.dias = [None] * len(self.quadrados)  # (data, tempo, estado) de cada quadrado
+
+        self.label_info = tk.Label(self.win, text="", font=("Arial", 10))
+        self.label_info.pack(pady=5)
+
+        self.canvas.bind("<Motion>", self.ao_mover)
+        self.canvas.bind("<Button-1>", self.ao_clicar)
+        self.win.bind("<MouseWheel>", lambda e: self.mudar_ano(-1 if e.delta > 0 else 1))
+        self.win.bind("<Button-4>", lambda e: self.mudar_ano(-1))  # Roda do mouse no Linux
+        self.win.bind("<Button-5>", lambda e: self.mudar_ano(1))
+
+        self.desenhar()
+
+    def cor(self, tempo, estado, meta_diaria):
+        if estado == "Falhei":
+            return self.COR_FALHA
+        if tempo <= 0:
+            return self.CORES[0]
+        return self.CORES[1 + min(3, tempo * 3 // meta_diaria)]
+
+    def desenhar(self):
+        inicio = date(self.ano, 1, 1)
+        deslocamento = inicio.weekday()  # As colunas começam na segunda-feira
+        dias = dias_do_ano(self.ano)
+        meta_diaria = max(dados["tempos"]["meta_semanal"] // 7, 1)
+
+        for i, quadrado in enumerate(self.quadrados):
+            j = i - deslocamento
+            if 0 <= j < len(dias):
+                self.dias[i] = dias[j]
+                cor = self.cor(dias[j][1], dias[j][2], meta_diaria)
+            else:
+                self.dias[i] = None
+                cor = None  # Fora do ano: escondido
+            if cor != self.cores[i]:
+                if cor is None:
+                    self.canvas.itemconfigure(quadrado, state="hidden")
+                else:
+                    self.canvas.itemconfigure(quadrado, fill=cor, state="normal")
+                self.cores[i] = cor
+
+        for mes, rotulo in enumerate(self.rotulos_meses, start=1):
+            semana = ((date(self.ano, mes, 1) - inicio).days + deslocamento) // 7
+            self.canvas.coords(rotulo, self.MARGEM_X + semana * self.PASSO, self.MARGEM_Y - 12)
+        self.label_ano.config(text=str(self.ano))
+
+    def mudar_ano(self, passo):
+        if 1 <= self.ano + passo <= 9999:
+            self.ano += passo
+            self.desenhar()
+
+    def dia_em(self, x, y):
+        """Teste de acerto: o (data, tempo, estado) sob o ponto (x, y) do canvas, ou None."""
+        coluna, resto_x = divmod(x - self.MARGEM_X, self.PASSO)
+        linha, resto_y = divmod(y - self.MARGEM_Y, self.PASSO)
+        if not (0 <= coluna < self.SEMANAS and 0 <= linha < 7):
+            return None
+        if resto_x >= self.TAMANHO or resto_y >= self.TAMANHO:
+            return None  # No espaço entre os quadrados
+        return self.dias[coluna * 7 + linha]
+
+    def ao_mover(self, event):
+        dia = self.dia_em(event.x, event.y)
+        if dia is None:
+            self.label_info.config(text="")
+            return
+        data, tempo, estado = dia
+        self.label_info.config(text=f"{data.strftime('%d/%m/%Y')}: {tempo // 3600}h {(tempo % 3600) // 60}m - {estado}")
+
+    def ao_clicar(self, event):
+        dia = self.dia_em(event.x, event.y)
+        if dia is not None:
+            self.app.editar_estado_dia(dia[0].strftime("%Y-%m-%d"))
+
+
+class JanelaDiagnostico:
+    """Métricas dos caminhos quentes (disco, calendário, timer e alarme), atualizadas a cada segundo."""
+
+    COLUNAS = ("n", "ultimo", "media", "p95", "maximo")
+
+    def __init__(self, app):
+        self.app = app
+        x = app.root.winfo_x() + 120
+        y = app.root.winfo_y() + 120
+        self.win = tk.Toplevel(app.root)
+        self.win.title("Diagnóstico")
+        self.win.geometry(f"560x360+{x}+{y}")
+
+        self.ativo = tk.BooleanVar(value=metricas.ativo)
+        tk.Checkbutton(
+            self.win, text="Coletar métricas", variable=self.ativo, command=self.alternar_coleta
+        ).pack(anchor="w", padx=10, pady=5)
+
+        self.tree = ttk.Treeview(self.win, columns=("metrica",) + self.COLUNAS, show="headings", height=10)
+        self.tree.heading("metrica", text="Métrica")
+        self.tree.column("metrica", width=160, anchor="w")
+        for coluna, titulo in zip(self.COLUNAS, ("N", "Último", "Média", "p95", "Máximo")):
+            self.tree.heading(coluna, text=titulo)
+            self.tree.column(coluna, width=70, anchor="e")
+        self.tree.pack(fill="both", expand=True, padx=10)
+
+        self.label_timer = tk.Label(self.win, text="", font=("Arial", 10))
+        self.label_timer.pack(pady=5)
+
+        botoes = tk.Frame(self.win)
+        botoes.pack(pady=5)
+        tk.Button(botoes, text="Limpar", command=self.limpar).pack(side="left", padx=5)
+        tk.Button(botoes, text="Exportar JSON", command=self.exportar).pack(side="left", padx=5)
+        tk.Button(botoes, text="Fechar", command=self.win.destroy).pack(side="left", padx=5)
+
+        self.atualizar()
+
+    def alternar_coleta(self):
+        metricas.ativo = self.ativo.get()
+
+    def limpar(self):
+        metricas.limpar()
+        self.atualizar(reagendar=False)
+
+    def exportar(self):
+        caminho = filedialog.asksaveasfilename(
+            parent=self.win, title="Exportar métricas", defaultextension=".json",
+            initialdir=DATA_DIR, initialfile="metricas.json", filetypes=[("JSON", "*.json")]
+        )
+        if caminho:
+            metricas.exportar(caminho)
+
+    def atualizar(self, reagendar=True):
+        if not self.win.winfo_exists():
+            return
+        resumo = metricas.resumo()
+        self.tree.delete(*self.tree.get_children())
+        for nome, valores in resumo.items():
+            self.tree.insert("", "end", values=(nome,) + tuple(
+                valores[coluna] if coluna == "n" else f"{valores[coluna]:.1f}" for coluna in self.COLUNAS
+            ))
+        self.label_timer.config(text=f"Maior desvio de um tick do timer: {self.app.timer.desvio_maximo * 1000:.1f} ms")
+        if reagendar:
+            self.win.after(1000, self.atualizar)
+
+
 class AppWithTray(App):
     def __init__(self, root):
         super().__init__(root)
@@ -636,6 +834,9 @@ class AppWithTray(App):
 
     def criar_icone_bandeja(self):
         """Cria o ícone da bandeja do sistema."""
+        from PIL import Image, ImageDraw
+        from pystray import Icon, Menu, MenuItem
+
         # Carrega o ícone para a bandeja
         try:
             image = Image.open(ICON_PATH)  # Certifique-se de que o arquivo icon.ico está no mesmo diretório
@@ -647,8 +848,8 @@ class AppWithTray(App):
 
         # Define o menu da bandeja com as opções "Abrir" e "Sair"
         menu = Menu(
-            MenuItem("Abrir", self.restaurar_janela),
-            MenuItem("Sair", self.sair)
+            MenuItem("Abrir", lambda icon, item: self.canal.executar(self.restaurar_janela)),
+            MenuItem("Sair", lambda icon, item: self.canal.executar(self.sair))
         )
 
         # Cria o ícone da bandeja
@@ -659,7 +860,8 @@ class AppWithTray(App):
             menu
         )
 
-        # Executa o ícone da bandeja em uma thread separada
+        # Executa o ícone da bandeja em uma thread separada; as ações do menu
+        # voltam para o loop do Tk pelo canal
         self.tray_thread = threading.Thread(target=self.tray_icon.run, daemon=True)
         self.tray_thread.start()
 
@@ -674,28 +876,152 @@ class AppWithTray(App):
         """Encerra o aplicativo completamente."""
         if self.tray_icon:
             self.tray_icon.stop()  # Para o ícone da bandeja
+        if self.api:
+            self.api.parar()
+        descarregar_dados()  # Grava as alterações que ainda estão na janela do gravador
+        if self.instancia:
+            self.instancia.fechar()  # Apaga o .app.sock e a .app.chave e solta a trava
         self.root.destroy()  # Fecha a janela principal
         exit()
 
 
-# Define o caminho para o arquivo de bloqueio no diretório de dados do usuário
-APP_LOCK = os.path.join(DATA_DIR, ".app.lock")
-
 # Garantir que apenas uma instância do aplicativo seja executada
-def verificar_instancia_unica():
-    global lock_file  # Declara a variável global no início da função
+def verificar_instancia_unica(comando):
+    """Trava o diretório de dados; se outra instância já está aberta, repassa `comando` a ela e sai."""
+    instancia = InstanciaUnica(DATA_DIR)
+    if instancia.adquirir():
+        return instancia
+
+    resposta = instancia.enviar(comando)
+    if resposta is None or "erro" in resposta:
+        motivo = resposta["erro"] if resposta else "a instância aberta não respondeu"
+        print("Erro:", motivo, file=sys.stderr)
+        if comando == "mostrar":
+            messagebox.showerror("Erro", f"O aplicativo já está em execução, mas {motivo}.")
+        sys.exit(1)
+    if comando == "status":
+        print(formatar_status(resposta))
+    sys.exit(0)
+
+
+def transferir_historico(args):
+    """Exporta (--exportar) ou importa (--importar) o histórico sem abrir a janela; devolve o código de saída."""
+    import estudos_historico  # Só carregado quando pedido
+
+    instancia = InstanciaUnica(DATA_DIR)
+    if not instancia.adquirir():
+        print("Erro: feche o aplicativo antes de exportar ou importar o histórico.", file=sys.stderr)
+        return 1
     try:
-        # No Windows, usamos msvcrt para criar um bloqueio
-        lock_file = open(APP_LOCK, "w")
-        msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
-    except OSError:
-        messagebox.showerror("Erro", "O aplicativo já está em execução.")
-        sys.exit()
+        carregar_dados()
+        if args.exportar:
+            quantidade = estudos_historico.exportar_arquivo(args.exportar, args.de, args.ate)
+            if args.exportar != "-":
+                print(f"{quantidade} dias exportados para {args.exportar}.")
+            return 0
+
+        resultado = estudos_historico.importar_arquivo(args.importar, args.de, args.ate)
+        print(f"{resultado['dias']} dias importados, {resultado['ignorados']} fora do intervalo, "
+              f"{resultado['invalidos']} inválidos.")
+        if resultado["tempos"]:
+            print("Configurações de tempo importadas.")
+        for erro in resultado["erros"]:
+            print("  " + erro, file=sys.stderr)
+        return 1 if resultado["invalidos"] else 0
+    except OSError as e:
+        print("Erro:", e, file=sys.stderr)
+        return 1
+    finally:
+        descarregar_dados()
+        instancia.fechar()
+
+
+def aquecer_dependencias():
+    """Carrega em segundo plano o que o alarme e a bandeja vão precisar."""
+    with perfil.medir("aquecimento: alarme"):
+        try:
+            alarme.carregar()
+        except Exception as e:
+            print("Erro ao carregar o alarme:", e)
+    with perfil.medir("aquecimento: PIL + pystray"):
+        try:
+            from PIL import Image
+            import pystray
+        except ImportError as e:
+            print("Erro ao carregar a bandeja:", e)
+    perfil.relatorio()
+
+
+def primeiro_frame(aquecer):
+    perfil.marcar("primeiro frame")
+    if aquecer:
+        threading.Thread(target=aquecer_dependencias, daemon=True).start()
+    else:
+        perfil.relatorio()
 
 
 if __name__ == "__main__":
-    verificar_instancia_unica()  # Garante que apenas uma instância seja executada
+    parser = argparse.ArgumentParser(description="Controle de Estudos")
+    parser.add_argument("comando", nargs="?", default="mostrar", choices=COMANDOS,
+                        help="com o aplicativo já aberto, é repassado a ele (padrão: mostrar a janela)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="mostra o tempo de cada fase da inicialização")
+    parser.add_argument("--sem-aquecimento", action="store_true",
+                        help="não pré-carrega o alarme e a bandeja em segundo plano")
+    parser.add_argument("--perfil", metavar="NOME",
+                        help="usa o perfil de estudo NOME (padrão: o último escolhido na janela)")
+    parser.add_argument("--headless", action="store_true",
+                        help="roda no terminal, sem janela (veja --headless --help)")
+    parser.add_argument("--api", type=int, nargs="?", const=8765, metavar="PORTA",
+                        help="abre a API HTTP/JSON local em 127.0.0.1 (porta padrão: 8765)")
+    transferencia = parser.add_mutually_exclusive_group()
+    transferencia.add_argument("--exportar", metavar="ARQUIVO",
+                               help="exporta o histórico para um .ndjson ou .csv (\"-\" para a saída padrão) e sai")
+    transferencia.add_argument("--importar", metavar="ARQUIVO",
+                               help="importa um .ndjson ou .csv por cima do histórico (\"-\" para a entrada padrão) e sai")
+    parser.add_argument("--de", type=date.fromisoformat, metavar="AAAA-MM-DD",
+                        help="com --exportar/--importar, só os dias a partir desta data")
+    parser.add_argument("--ate", type=date.fromisoformat, metavar="AAAA-MM-DD",
+                        help="com --exportar/--importar, só os dias até esta data")
+    args = parser.parse_args()
+    try:
+        definir_perfil(args.perfil or perfil_salvo())
+    except ValueError as e:
+        parser.error(f"--perfil: {e}")
+    if args.exportar or args.importar:
+        sys.exit(transferir_historico(args))
+    if args.comando == "resumo":
+        from estudos_terminal import main as terminal  # O resumo em texto é o do modo terminal
+        sys.exit(terminal(["resumo", "--perfil", perfil_em_uso()]))
+
+    locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
+    perfil.ativo = args.profile_startup
+    perfil.inicio = _INICIO_IMPORTACOES
+    perfil.registrar("importações", _FIM_IMPORTACOES - _INICIO_IMPORTACOES)
+    perfil.marcar("módulo")
+
+    instancia = verificar_instancia_unica(args.comando)  # Garante que apenas uma instância seja executada
+    if args.comando == "status":
+        print("O aplicativo não está em execução.")
+        sys.exit(1)
+    perfil.marcar("instância única")
     carregar_dados()
+    perfil.marcar("carregar_dados")
     root = tk.Tk()
+    perfil.marcar("tk.Tk()")
     app = AppWithTray(root)
+    perfil.marcar("AppWithTray")
+    if args.api is not None:
+        from estudos_api import ServidorAPI  # Só carregado quando pedido
+        app.api = ServidorAPI(app.timer, app.canal.executar, porta=args.api)
+        if not app.api.iniciar():
+            app.api = None
+        perfil.marcar("API")
+    app.instancia = instancia
+    instancia.servir(app.executar_comando, app.canal.executar)
+    if args.comando != "mostrar":
+        app.executar_comando(args.comando)
+
+    # after_idle só roda depois que a janela foi desenhada pela primeira vez
+    root.after_idle(primeiro_frame, not args.sem_aquecimento)
     root.mainloop()
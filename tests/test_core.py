@@ -0,0 +1,686 @@
+"""Testes do núcleo (estudos_core) que não dependem de interface gráfica."""
+import json
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import estudos_core as core
+import estudos_historico
+
+
+class TesteComDados(unittest.TestCase):
+    """Aponta os arquivos de dados para um diretório temporário, com o backend JSON."""
+
+    backend = "json"
+
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp(prefix="estudos_teste_")
+        core.armazenamento.fechar()
+        core.dados.clear()
+        core.dados.update(core.dados_padrao())
+        core.definir_diretorio_dados(self.diretorio)
+        core.definir_backend(self.backend)
+
+    def tearDown(self):
+        core.descarregar_dados()
+        core.armazenamento.fechar()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def recarregar(self):
+        """Descarta `dados` e carrega de novo do disco, como ao reabrir o aplicativo."""
+        self.assertTrue(core.descarregar_dados())
+        core.armazenamento.fechar()
+        core.dados.clear()
+        core.dados.update(core.dados_padrao())
+        core.definir_backend(self.backend)
+        core.carregar_dados()
+
+    def escrever_dados(self, conteudo):
+        os.makedirs(core.diretorio_perfil(core.PERFIL_ATIVO), exist_ok=True)
+        with open(core.DADOS_ARQUIVO, "w", encoding="utf-8") as f:
+            json.dump(conteudo, f)
+
+
+class TesteDiasCompactos(TesteComDados):
+    def test_tempo_grande_demais_nao_deixa_dia_fantasma(self):
+        dias = core.DiasCompactos({"2025-01-01": {"estado": "Estudado", "tempo": 60}})
+        with self.assertRaises(OverflowError):
+            dias["2025-01-03"] = {"estado": "Estudado", "tempo": 2 ** 31}
+        self.assertNotIn("2025-01-03", dias)
+        self.assertEqual(len(dias), 1)
+        with self.assertRaises(OverflowError):
+            dias["2025-01-01"]["tempo"] = 2 ** 31
+        self.assertEqual(dict(dias["2025-01-01"]), {"estado": "Estudado", "tempo": 60})
+
+    def test_tempo_float_no_arquivo_da_versao_atual(self):
+        self.escrever_dados({
+            "dias": {"2025-01-01": {"estado": "Estudado", "tempo": 7200.0}},
+            "tempos": dict(core.TEMPO_PADRAO),
+            "ciclos": 0,
+            "versao": core.VERSAO_ESQUEMA,
+        })
+        core.carregar_dados()
+        self.assertEqual(core.dados["dias"]["2025-01-01"]["tempo"], 7200)
+        core.dados["dias"]["2025-01-02"] = {"estado": "Estudado", "tempo": 60.0}
+        self.assertEqual(core.dados["dias"]["2025-01-02"]["tempo"], 60)
+
+
+class RelogioComAtraso(core.RelogioVirtual):
+    """Relógio virtual cujos agendamentos rodam atrasados, como um loop do Tk ocupado."""
+
+    def __init__(self, inicio, atraso_maximo, semente=1):
+        super().__init__(inicio)
+        self.atraso_maximo = atraso_maximo
+        self.aleatorio = random.Random(semente)
+
+    def after(self, ms, funcao, *args):
+        atraso = self.aleatorio.uniform(0, self.atraso_maximo)
+        return super().after(ms + atraso * 1000, funcao, *args)
+
+
+class TestePomodoroTimer(TesteComDados):
+    ATRASO_MAXIMO = 0.05
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(core.definir_relogio, core.relogio)
+        self.addCleanup(setattr, core.alarme, "silencioso", core.alarme.silencioso)
+        core.alarme.silencioso = True
+        self.relogio = RelogioComAtraso(datetime(2025, 1, 6, 9), self.ATRASO_MAXIMO)
+        core.definir_relogio(self.relogio)
+        core.carregar_dados()
+        core.dados["tempos"]["foco"] = 10 * 60
+        self.mostrados = []
+        self.concluido_em = None
+        self.timer = core.PomodoroTimer(self.relogio, self.mostrar, self.concluir)
+
+    def mostrar(self, tempo, tipo):
+        self.mostrados.append(tempo)
+
+    def concluir(self, dia):
+        self.concluido_em = self.relogio.monotonic()
+
+    def test_fase_termina_no_prazo_com_ticks_atrasados(self):
+        self.timer.iniciar()
+        prazo = self.timer.prazo
+        self.relogio.avancar(10 * 60 + 1)
+
+        self.assertFalse(self.timer.executando)
+        self.assertEqual(self.timer.tipo_atual, "pausa")
+        self.assertGreaterEqual(self.concluido_em, prazo)
+        self.assertLessEqual(self.concluido_em - prazo, self.ATRASO_MAXIMO + 0.002)
+        # O atraso não se acumula: cada tick é reagendado a partir do prazo
+        self.assertLessEqual(self.timer.desvio_maximo, self.ATRASO_MAXIMO + 0.001)
+        # E nenhum segundo do display é pulado
+        self.assertEqual(set(self.mostrados[:-1]), {f"{s // 60:02d}:{s % 60:02d}" for s in range(1, 10 * 60 + 1)})
+
+    def test_pausa_no_meio_nao_muda_o_tempo_rodado(self):
+        self.timer.iniciar()
+        self.relogio.avancar(4 * 60 + 0.3)
+        self.timer.pausar()
+        self.relogio.avancar(7 * 60)
+        self.timer.iniciar()
+        prazo = self.timer.prazo
+        self.assertAlmostEqual(prazo - self.relogio.monotonic(), 6 * 60 - 0.3)
+        self.relogio.avancar(6 * 60)
+
+        self.assertFalse(self.timer.executando)
+        self.assertLessEqual(self.concluido_em - prazo, self.ATRASO_MAXIMO + 0.002)
+        self.assertEqual(core.dados["dias"]["2025-01-06"]["tempo"], 10 * 60)
+
+
+class TesteJournal(TesteComDados):
+    def estudar(self, dia, tempo):
+        core.dados["dias"][dia] = {"estado": "Estudado", "tempo": tempo}
+        core.salvar_dados(dia=dia)
+        core.descarregar_dados()
+
+    def test_compactacoes_que_falham_nao_perdem_registros(self):
+        core.carregar_dados()
+        temporario = core.DADOS_ARQUIVO + ".tmp"
+        os.mkdir(temporario)  # O snapshot temporário não pode ser criado: a compactação falha
+        self.estudar("2025-01-01", 60)
+        with self.assertRaises(OSError):
+            core.armazenamento.compactar()
+        self.assertTrue(os.path.exists(core.JOURNAL_ANTIGO))
+        self.estudar("2025-01-02", 120)
+        with self.assertRaises(OSError):
+            core.armazenamento.compactar()
+
+        os.rmdir(temporario)
+        esperado = {"2025-01-01": {"estado": "Estudado", "tempo": 60}, "2025-01-02": {"estado": "Estudado", "tempo": 120}}
+        self.recarregar()  # Conclui a compactação interrompida
+        self.assertEqual(core.dados["dias"].para_dict(), esperado)
+        self.assertFalse(os.path.exists(core.JOURNAL_ANTIGO))
+        self.recarregar()
+        self.assertEqual(core.dados["dias"].para_dict(), esperado)
+
+    def test_anexar_depois_de_linha_truncada(self):
+        antigo = os.path.join(self.diretorio, "antigo")
+        novo = os.path.join(self.diretorio, "novo")
+        with open(antigo, "w", encoding="utf-8") as f:
+            f.write('{"dia": "2025-01-01", "valor": {}}\n{"dia": "2025-01-0')
+        with open(novo, "w", encoding="utf-8") as f:
+            f.write('{"dia": "2025-01-02", "valor": {}}\n')
+        core.anexar_journal(novo, antigo)
+        self.assertEqual([r["dia"] for r in core.registros_journal(antigo)], ["2025-01-01", "2025-01-02"])
+
+
+class TesteLeitores(TesteComDados):
+    """Gravações com leitores de ler_dados_consistentes; versão reduzida de benchmarks/stress_leitores.py."""
+
+    DIAS = 40
+
+    def chave(self, j):
+        return (date(2000, 1, 1) + timedelta(days=j)).strftime("%Y-%m-%d")
+
+    def gravar(self, i):
+        """A i-ésima gravação do rodízio: o dia i % DIAS recebe tempo = i."""
+        dia = self.chave(i % self.DIAS)
+        core.dados["dias"][dia] = {"estado": "Estudado", "tempo": i}
+        core.salvar_dados(dia=dia)
+        core.descarregar_dados()
+
+    def violacoes(self, copia):
+        tempos = [copia["dias"].get(self.chave(j), {}).get("tempo", -1) for j in range(self.DIAS)]
+        mais_nova = max(tempos)
+        return [j for j, tempo in enumerate(tempos) if tempo != mais_nova - (mais_nova - j) % self.DIAS]
+
+    def preparar(self):
+        self.addCleanup(setattr, core, "JOURNAL_LIMITE", core.JOURNAL_LIMITE)
+        core.JOURNAL_LIMITE = 2 * 1024  # Compacta a cada poucas gravações
+        core.carregar_dados()
+        for i in range(self.DIAS):
+            self.gravar(i)
+
+    def test_leitores_sempre_veem_um_estado_que_existiu(self):
+        self.preparar()
+        parar = threading.Event()
+        resultados = []
+
+        erros = []
+
+        def ler():
+            while not parar.is_set():
+                try:
+                    copia = core.ler_dados_consistentes()
+                except Exception as e:
+                    erros.append(e)
+                    return
+                resultados.append(self.violacoes(copia))
+
+        leitores = [threading.Thread(target=ler) for _ in range(2)]
+        for leitor in leitores:
+            leitor.start()
+        geracao = core.ler_geracao(core.GERACAO_ARQUIVO)
+        try:
+            for i in range(self.DIAS, self.DIAS + 300):
+                self.gravar(i)
+        finally:
+            parar.set()
+            for leitor in leitores:
+                leitor.join()
+        core.armazenamento.fechar()
+
+        self.assertGreater(core.ler_geracao(core.GERACAO_ARQUIVO) - geracao, 4)  # Houve compactações
+        self.assertEqual(erros, [])
+        self.assertTrue(resultados)
+        self.assertEqual([v for v in resultados if v], [])
+        self.assertEqual(self.violacoes(core.ler_dados_consistentes()), [])
+
+    def arquivos_abertos(self, abertos):
+        """Imita o Windows: trocar ou apagar um arquivo aberto por um leitor dá PermissionError."""
+        replace, remove = os.replace, os.remove
+
+        def trocar(origem, destino):
+            if origem in abertos or destino in abertos:
+                raise PermissionError(13, "arquivo aberto por outro processo", destino)
+            return replace(origem, destino)
+
+        def apagar(caminho):
+            if caminho in abertos:
+                raise PermissionError(13, "arquivo aberto por outro processo", caminho)
+            return remove(caminho)
+
+        return mock.patch.multiple(core.os, replace=trocar, remove=apagar)
+
+    def test_compactacao_espera_o_leitor_fechar_o_arquivo(self):
+        self.preparar()
+        abertos = {core.DADOS_ARQUIVO, core.JOURNAL_ARQUIVO}
+        threading.Timer(0.05, abertos.clear).start()  # O leitor fecha os arquivos logo depois
+        with self.arquivos_abertos(abertos):
+            inicio = time.monotonic()
+            core.armazenamento.compactar()
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.04)
+        self.assertFalse(os.path.exists(core.JOURNAL_ARQUIVO))
+        self.recarregar()
+        self.assertEqual(self.violacoes(core.dados), [])
+
+    def test_leitor_que_nunca_fecha_nao_perde_registros(self):
+        self.preparar()
+        self.addCleanup(setattr, core, "ESPERA_ARQUIVO_ABERTO", core.ESPERA_ARQUIVO_ABERTO)
+        core.ESPERA_ARQUIVO_ABERTO = 0.02
+        with self.arquivos_abertos({core.DADOS_ARQUIVO}):
+            with self.assertRaises(PermissionError):
+                core.armazenamento.compactar()
+            self.gravar(self.DIAS)
+            with self.assertRaises(PermissionError):
+                core.armazenamento.compactar()
+        self.recarregar()
+        self.assertEqual(self.violacoes(core.dados), [])
+        self.assertEqual(core.dados["dias"][self.chave(0)]["tempo"], self.DIAS)
+
+    def test_leitura_refeita_se_o_arquivo_estava_sendo_trocado(self):
+        self.preparar()
+        ler_json = core._ler_json
+        falhas = [PermissionError(13, "arquivo sendo trocado")]
+
+        def ler_trocando(pasta):
+            if falhas:
+                raise falhas.pop()
+            return ler_json(pasta)
+
+        with mock.patch.object(core, "_ler_json", ler_trocando):
+            copia = core.ler_dados_consistentes()
+        self.assertEqual(self.violacoes(copia), [])
+
+
+class TesteMapaAnual(TesteComDados):
+    def test_ultimo_ano_do_calendario(self):
+        core.carregar_dados()
+        core.dados["dias"]["9999-12-31"] = {"estado": "Estudado", "tempo": 60}
+        core.salvar_dados(dia="9999-12-31")
+        dias = core.dias_do_ano(9999)
+        self.assertEqual(len(dias), 365)
+        self.assertEqual(dias[-1], (date.max, 60, "Estudado"))
+
+    def test_historico_com_o_ultimo_dia_do_calendario(self):
+        core.carregar_dados()
+        core.importar_dias([[("9999-12-31", {"estado": "Estudado", "tempo": 60})]])
+        self.assertEqual(core.intervalo_historico(), ("9999-12-31", "9999-12-31"))
+        self.assertEqual([d["data"] for d in estudos_historico.exportar_dias()], ["9999-12-31"])
+
+        core.importar_dias([[("9999-01-01", {"estado": "Falhei", "tempo": 0})]])
+        self.assertEqual(core.intervalo_historico(), ("9999-01-01", "9999-12-31"))
+        self.assertEqual([d["data"] for d in estudos_historico.exportar_dias()], ["9999-01-01", "9999-12-31"])
+        self.assertEqual([d["data"] for d in estudos_historico.exportar_dias(date(9999, 12, 31))], ["9999-12-31"])
+
+
+class TesteMapaAnualSQLite(TesteMapaAnual):
+    backend = "sqlite"
+
+
+class TesteMigracao(TesteComDados):
+    """Um histórico da versão 1 migrado sob demanda e depois em lotes em segundo plano."""
+
+    ANTIGOS = {
+        "2024-01-01": {"estado": "Estudado", "tempo": 3600.4},
+        "2024-01-02": {"estado": "Nao Estudado", "tempo": 0},
+        "2024-01-03": {"estado": "", "tempo": -5},
+        "2024-01-04": {"estado": " Falhei ", "tempo": "abc"},
+    }
+    MIGRADOS = {
+        "2024-01-01": {"estado": "Estudado", "tempo": 3600},
+        "2024-01-02": {"estado": "Não Estudado", "tempo": 0},
+        "2024-01-03": {"estado": "-", "tempo": 0},
+        "2024-01-04": {"estado": "Falhei", "tempo": 0},
+    }
+
+    def escrever_versao_1(self, dias):
+        """Arquivo (sem a chave "versao") como os gravados antes do versionamento."""
+        self.escrever_dados({"dias": dias, "tempos": dict(core.TEMPO_PADRAO), "ciclos": 3})
+
+    def no_disco(self):
+        """O que está gravado, sem passar pela migração na leitura."""
+        return core._ler_json(core.diretorio_perfil(core.PERFIL_ATIVO))
+
+    def esperar_migracao(self):
+        if core._migracao is not None:
+            core._migracao.join(10)
+        self.assertTrue(core.descarregar_dados())
+
+    def test_migra_na_leitura_e_termina_em_segundo_plano(self):
+        self.escrever_versao_1(self.ANTIGOS)
+        core.carregar_dados()
+        self.assertEqual(dict(core.dados["dias"]["2024-01-04"]), self.MIGRADOS["2024-01-04"])  # Já na primeira leitura
+        self.esperar_migracao()
+
+        self.assertEqual(core.dados["versao"], core.VERSAO_ESQUEMA)
+        self.assertEqual(self.no_disco()["versao"], core.VERSAO_ESQUEMA)
+        self.assertEqual(self.no_disco()["dias"], self.MIGRADOS)
+        self.recarregar()
+        self.assertEqual(core.dados["versao"], core.VERSAO_ESQUEMA)
+        self.assertEqual({d: dict(r) for d, r in core.dados["dias"].items()}, self.MIGRADOS)
+        self.assertEqual(core.dados["ciclos"], 3)
+
+    def test_migrar_de_novo_nao_muda_nada(self):
+        for registro in self.MIGRADOS.values():
+            self.assertEqual(core.migrar_registro(registro, 1), registro)
+
+        # Queda depois de migrar os dias e antes de gravar a versão nova: migra tudo outra vez
+        self.escrever_versao_1(self.MIGRADOS)
+        core.carregar_dados()
+        self.esperar_migracao()
+        self.assertEqual(self.no_disco(), {**self.no_disco(), "versao": core.VERSAO_ESQUEMA, "dias": self.MIGRADOS})
+        self.recarregar()
+        self.assertEqual(core.dados["versao"], core.VERSAO_ESQUEMA)
+        self.assertEqual(core.armazenamento.migrar_lote(), 0)
+        self.assertEqual(self.no_disco()["dias"], self.MIGRADOS)
+
+
+class TesteMigracaoSQLite(TesteMigracao):
+    backend = "sqlite"
+
+    def escrever_versao_1(self, dias):
+        """Banco sem a chave "versao" em config, como os criados antes do versionamento."""
+        os.makedirs(core.diretorio_perfil(core.PERFIL_ATIVO), exist_ok=True)
+        conexao = sqlite3.connect(core.SQLITE_ARQUIVO)
+        conexao.executescript("""
+            CREATE TABLE dias (data TEXT PRIMARY KEY, estado TEXT NOT NULL, tempo INTEGER NOT NULL) WITHOUT ROWID;
+            CREATE TABLE config (chave TEXT PRIMARY KEY, valor TEXT NOT NULL);
+        """)
+        conexao.executemany("INSERT INTO dias VALUES (?, ?, ?)",
+                            [(data, r["estado"], r["tempo"]) for data, r in dias.items()])
+        conexao.executemany("INSERT INTO config VALUES (?, ?)",
+                            [("tempos", json.dumps(core.TEMPO_PADRAO)), ("ciclos", "3")])
+        conexao.commit()
+        conexao.close()
+
+    def no_disco(self):
+        return core._ler_sqlite(core.SQLITE_ARQUIVO)
+
+
+class TesteGravadorDados(TesteComDados):
+    """Um GravadorDados próprio por teste, com as chamadas ao armazenamento registradas."""
+
+    def setUp(self):
+        super().setUp()
+        core.carregar_dados()
+        for dia in ("2025-01-01", "2025-01-02"):
+            core.dados["dias"][dia] = {"estado": "Estudado", "tempo": 60}
+        self.chamadas = []
+        salvar = core.armazenamento.salvar
+
+        def salvar_registrando(**itens):
+            self.chamadas.append(itens)
+            return salvar(**itens)
+
+        patcher = mock.patch.object(core.armazenamento, "salvar", salvar_registrando)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_marcas_dentro_da_janela_viram_uma_gravacao(self):
+        gravador = core.GravadorDados(janela=60)  # Nunca vence durante o teste
+        gravador.marcar(dias=["2025-01-01"])
+        gravador.marcar(config=["tempos"])
+        gravador.marcar(dias=["2025-01-02", "2025-01-01"], config=["ciclos"])
+        time.sleep(0.05)
+        self.assertEqual(self.chamadas, [])
+
+        self.assertTrue(gravador.descarregar())
+        self.assertEqual(self.chamadas, [{"dias": ["2025-01-01", "2025-01-02"], "config": ["ciclos", "tempos"], "semanas": []}])
+        self.assertEqual(gravador.gravacoes, 1)
+        self.recarregar()
+        self.assertEqual(sorted(core.dados["dias"]), ["2025-01-01", "2025-01-02"])
+
+    def test_descarregar_sem_pendencias(self):
+        gravador = core.GravadorDados(janela=60)
+        self.assertTrue(gravador.descarregar())
+        gravador.marcar(dias=["2025-01-01"])
+        self.assertTrue(gravador.descarregar())
+        self.assertTrue(gravador.descarregar())
+        self.assertEqual(len(self.chamadas), 1)
+
+    def test_sem_argumentos_marca_tudo(self):
+        gravador = core.GravadorDados(janela=60)
+        gravador.marcar(dias=["2025-01-01"])
+        gravador.marcar()
+        self.assertTrue(gravador.descarregar())
+        self.assertEqual(self.chamadas, [{}])  # O snapshot completo já inclui o dia
+
+    def test_janela_zero_grava_sem_descarregar(self):
+        gravador = core.GravadorDados(janela=0)
+        gravador.marcar(dias=["2025-01-01"])
+        prazo = time.monotonic() + 5
+        while gravador.gravacoes == 0 and time.monotonic() < prazo:
+            time.sleep(0.001)
+        self.assertEqual(self.chamadas, [{"dias": ["2025-01-01"], "config": [], "semanas": []}])
+
+    def test_janela_da_variavel_de_ambiente(self):
+        codigo = "import estudos_core as core; print(core.JANELA_GRAVACAO, core.gravador.janela)"
+        ambiente = {**os.environ, "ESTUDOS_TRACKER_JANELA_GRAVACAO": "0", "HOME": self.diretorio, "APPDATA": self.diretorio}
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               env=ambiente, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(saida.split(), ["0.0", "0.0"])
+
+
+class TesteIndiceDias(TesteComDados):
+    def test_intervalos_iguais_a_soma_direta(self):
+        self.addCleanup(core.definir_relogio, core.relogio)
+        core.definir_relogio(core.RelogioVirtual(datetime(2025, 6, 1)))
+        core.carregar_dados()
+        aleatorio = random.Random(3)
+        base = date(2025, 1, 1)
+        esperado = {}  # Data -> registro, conferido por força bruta
+
+        def gravar(dia, estado, tempo):
+            core.dados["dias"][dia.isoformat()] = {"estado": estado, "tempo": tempo}
+            core.salvar_dados(dia=dia.isoformat())
+            esperado[dia] = (estado, tempo)
+
+        for d in range(0, 300, 2):
+            gravar(base + timedelta(days=d), "Estudado", d * 10)
+        core.indice_dias.total_tempo(base, base)  # Constrói o índice com as colunas atuais
+
+        for rodada in range(400):
+            if rodada % 50 == 0:
+                # Antes do início e depois da margem do índice: obriga a reconstruir
+                deslocamento = aleatorio.choice([-2000, -400, 900, 3000])
+            else:
+                deslocamento = aleatorio.randrange(-30, 400)
+            gravar(base + timedelta(days=deslocamento),
+                   aleatorio.choice(["Estudado", "Falhei", "Não Estudado", "-"]), aleatorio.randrange(0, 5000))
+
+            inicio = base + timedelta(days=aleatorio.randrange(-2100, 3100))
+            fim = inicio + timedelta(days=aleatorio.randrange(-5, 800))
+            dentro = [registro for dia, registro in esperado.items() if inicio <= dia <= fim]
+            self.assertEqual(core.indice_dias.total_tempo(inicio, fim), sum(tempo for _, tempo in dentro))
+            self.assertEqual(core.indice_dias.contar_estados(inicio, fim), {
+                estado: sum(1 for e, _ in dentro if e == estado) for estado in core.IndiceDias.ESTADOS
+            })
+
+
+class TestePreencherDias(TesteComDados):
+    def test_so_preenche_dias_sem_registro(self):
+        core.carregar_dados()
+        registros = {
+            "2025-01-01": {"estado": "Estudado", "tempo": 3600},
+            "2025-01-02": {"estado": "-", "tempo": 0},  # "Não era pra estudar"
+            "2025-01-04": {"estado": "-", "tempo": 600},
+        }
+        for dia, registro in registros.items():
+            core.dados["dias"][dia] = dict(registro)
+        core.salvar_dados(dias=registros)
+        core.dados["verificado_ate"] = "2025-01-01"
+
+        self.assertEqual(core.preencher_dias_perdidos(date(2025, 1, 6)), ["2025-01-03", "2025-01-05"])
+        self.assertEqual(core.preencher_dias_perdidos(date(2025, 1, 6)), [])
+        self.recarregar()
+        esperado = {**registros, "2025-01-03": {"estado": "Não Estudado", "tempo": 0},
+                    "2025-01-05": {"estado": "Não Estudado", "tempo": 0}}
+        self.assertEqual(core.dados["dias"].para_dict(), esperado)
+        self.assertEqual(core.dados["verificado_ate"], "2025-01-05")
+
+
+class TesteResumosSemanas(TesteComDados):
+    def semana_salva(self):
+        """Guarda os resumos das semanas de 2025-01-06 e 2025-01-13, já encerradas."""
+        core.carregar_dados()
+        core.dados["dias"]["2025-01-07"] = {"estado": "Estudado", "tempo": 3600}
+        core.salvar_dados(dia="2025-01-07")
+        core.resumo_semana(date(2025, 1, 13))  # Guarda a semana passada, 2025-W02
+        core.resumo_semana(date(2025, 1, 20))
+        core.descarregar_dados()
+        self.assertEqual(sorted(core.dados["semanas"]), ["2025-W02", "2025-W03"])
+
+    def test_cada_semana_e_gravada_sozinha(self):
+        self.semana_salva()
+        registros = list(core.registros_journal(core.JOURNAL_ARQUIVO))
+        self.assertNotIn("semanas", [chave for registro in registros for chave in registro])
+        self.assertEqual(sorted(r["semana"] for r in registros if "semana" in r), ["2025-W02", "2025-W03"])
+
+        semanas = dict(core.dados["semanas"])
+        self.assertEqual(core.ler_dados_consistentes()["semanas"], semanas)
+        self.recarregar()
+        self.assertEqual(core.dados["semanas"], semanas)
+
+    def test_invalidar_sem_dias_nao_faz_nada(self):
+        self.semana_salva()
+        semanas = core.dados["semanas"]
+        geracao = core.resumos_semanas._geracao
+        self.assertEqual(core.resumos_semanas.invalidar([]), [])
+        self.assertEqual(core.resumos_semanas._geracao, geracao)
+        self.assertIs(core.dados["semanas"], semanas)
+
+        self.assertEqual(core.resumos_semanas.invalidar(["2025-01-08"]), ["2025-W02"])
+        self.assertNotIn("total", core.dados["semanas"]["2025-W02"])
+        self.assertIn("total", core.dados["semanas"]["2025-W03"])
+
+
+class TesteResumosSemanasSQLite(TesteResumosSemanas):
+    backend = "sqlite"
+
+    def linhas(self, sql):
+        conexao = sqlite3.connect(core.SQLITE_ARQUIVO)
+        try:
+            return conexao.execute(sql).fetchall()
+        finally:
+            conexao.close()
+
+    def test_cada_semana_e_gravada_sozinha(self):
+        self.semana_salva()
+        self.assertEqual(self.linhas("SELECT chave FROM config WHERE chave = 'semanas'"), [])
+        self.assertEqual(sorted(c for (c,) in self.linhas("SELECT chave FROM semanas")), ["2025-W02", "2025-W03"])
+
+        semanas = dict(core.dados["semanas"])
+        self.assertEqual(core.ler_dados_consistentes()["semanas"], semanas)
+        self.recarregar()
+        self.assertEqual(core.dados["semanas"], semanas)
+
+    def test_semanas_de_um_banco_antigo_vao_para_a_tabela(self):
+        self.semana_salva()
+        semanas = dict(core.dados["semanas"])
+        core.armazenamento.fechar()
+        conexao = sqlite3.connect(core.SQLITE_ARQUIVO)
+        conexao.execute("DROP TABLE semanas")
+        conexao.execute("INSERT INTO config (chave, valor) VALUES ('semanas', ?)", (json.dumps(semanas),))
+        conexao.commit()
+        conexao.close()
+
+        self.assertEqual(core.ler_dados_consistentes(backend="sqlite")["semanas"], semanas)
+        self.recarregar()
+        self.assertEqual(core.dados["semanas"], semanas)
+        self.assertEqual(self.linhas("SELECT chave FROM config WHERE chave = 'semanas'"), [])
+        self.assertEqual(len(self.linhas("SELECT chave FROM semanas")), 2)
+
+
+class TestePerfis(TesteComDados):
+    def test_compactacao_em_andamento_fica_no_perfil_anterior(self):
+        self.addCleanup(core.definir_perfil, core.PERFIL_PADRAO)
+        self.addCleanup(setattr, core, "JOURNAL_LIMITE", core.JOURNAL_LIMITE)
+        core.JOURNAL_LIMITE = 0  # Toda gravação agenda uma compactação
+        core.carregar_dados()
+        armazenamento = core.armazenamento
+        snapshot_anterior = core.DADOS_ARQUIVO
+
+        # Segura a compactação em segundo plano até a troca de perfil já ter começado
+        liberar = threading.Event()
+        compactar = armazenamento.compactar
+        def compactar_devagar(*args, **kwargs):
+            liberar.wait(5)
+            return compactar(*args, **kwargs)
+        armazenamento.compactar = compactar_devagar
+
+        core.dados["dias"]["2025-01-01"] = {"estado": "Estudado", "tempo": 60}
+        core.salvar_dados(dia="2025-01-01")
+        core.descarregar_dados()
+        troca = threading.Thread(target=core.trocar_perfil, args=("outro",))
+        troca.start()
+        troca.join(0.2)
+        self.assertTrue(troca.is_alive())  # Espera a compactação antes de mudar os caminhos
+        liberar.set()
+        troca.join(5)
+
+        self.assertEqual(core.perfil_em_uso(), "outro")
+        self.assertNotIn("2025-01-01", core.dados["dias"])
+        with open(core.DADOS_ARQUIVO, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["dias"], {})
+        with open(snapshot_anterior, "r", encoding="utf-8") as f:
+            self.assertIn("2025-01-01", json.load(f)["dias"])
+
+    def test_troca_de_perfil_nao_esvazia_dados(self):
+        self.addCleanup(core.definir_perfil, core.PERFIL_PADRAO)
+        core.carregar_dados()
+        dias_anteriores = core.dados["dias"]
+        vistos = []
+        carregar = core.ArmazenamentoJSON.carregar
+        def carregar_olhando(armazenamento, destino=None, pasta=None):
+            vistos.append(core.dados["dias"] is dias_anteriores)  # Ainda o perfil anterior
+            return carregar(armazenamento, destino, pasta)
+        core.ArmazenamentoJSON.carregar = carregar_olhando
+        self.addCleanup(setattr, core.ArmazenamentoJSON, "carregar", carregar)
+
+        core.trocar_perfil("outro")
+        self.assertEqual(vistos, [True])
+        self.assertIsNot(core.dados["dias"], dias_anteriores)
+        self.assertEqual(core.dados["tempos"], core.TEMPO_PADRAO)
+
+
+class TestePerfilCorrompido(TesteComDados):
+    arquivo, conteudo, erro = "dados_estudo.json", b'{"dias": {', ValueError
+
+    def test_perfil_corrompido_mantem_o_atual(self):
+        self.addCleanup(core.definir_perfil, core.PERFIL_PADRAO)
+        core.carregar_dados()
+        core.dados["dias"]["2025-01-01"] = {"estado": "Estudado", "tempo": 60}
+        core.salvar_dados(dia="2025-01-01")
+        arquivo_atual = core.DADOS_ARQUIVO
+        corrompido = os.path.join(core.diretorio_perfil("outro"), self.arquivo)
+        os.makedirs(os.path.dirname(corrompido))
+        with open(corrompido, "wb") as f:
+            f.write(self.conteudo)
+
+        with self.assertRaises(self.erro):
+            core.trocar_perfil("outro")
+        self.assertEqual(core.perfil_em_uso(), core.PERFIL_PADRAO)
+        self.assertEqual(core.DADOS_ARQUIVO, arquivo_atual)
+        self.assertIn("2025-01-01", core.dados["dias"])
+
+        # As gravações seguintes continuam indo para os arquivos do perfil atual
+        core.dados["dias"]["2025-01-02"] = {"estado": "Estudado", "tempo": 30}
+        core.salvar_dados(dia="2025-01-02")
+        core.descarregar_dados()
+        with open(corrompido, "rb") as f:
+            self.assertEqual(f.read(), self.conteudo)
+        self.recarregar()
+        self.assertEqual(sorted(core.dados["dias"]), ["2025-01-01", "2025-01-02"])
+
+
+class TestePerfilCorrompidoSQLite(TestePerfilCorrompido):
+    backend = "sqlite"
+    arquivo, conteudo, erro = "dados_estudo.db", b"isto n\xc3\xa3o \xc3\xa9 um banco" * 100, sqlite3.DatabaseError
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Testes das estatísticas do histórico (estudos_estatisticas)."""
+import os
+import random
+import sys
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_core import TesteComDados  # Também põe a raiz do repositório no sys.path
+
+import estudos_core as core
+from estudos_estatisticas import calcular_estatisticas, carregar_numpy
+
+HOJE = date(2025, 3, 12)  # Uma quarta-feira: a semana atual está pela metade
+META_DIARIA = core.TEMPO_PADRAO["meta_semanal"] // 7
+
+
+class TesteEstatisticas(TesteComDados):
+    def setUp(self):
+        super().setUp()
+        core.carregar_dados()
+
+    def historico(self, dias):
+        """Grava {deslocamento em relação a HOJE: (estado, tempo)}."""
+        core.importar_dias([[
+            ((HOJE + timedelta(days=d)).isoformat(), {"estado": estado, "tempo": tempo})
+            for d, (estado, tempo) in dias.items()
+        ]])
+
+    def test_sequencia_vai_ate_ontem_sem_estudo_hoje(self):
+        self.historico({-3: ("Estudado", 0), -2: ("-", META_DIARIA), -1: ("Estudado", 60), 0: ("-", 0)})
+        estatisticas = calcular_estatisticas(HOJE, usar_numpy=False)
+        self.assertEqual(estatisticas["sequencia_atual"], 3)
+        self.assertEqual(estatisticas["maior_sequencia"], 3)
+        self.assertEqual(estatisticas["media_7"], (META_DIARIA + 60) / 7)
+
+
+@unittest.skipUnless(carregar_numpy(), "NumPy não está instalado")
+class TesteNumpyIgualPython(TesteEstatisticas):
+    """Os dois caminhos de calcular_estatisticas tratam os casos de borda separadamente."""
+
+    def comparar(self, hoje=HOJE):
+        com_numpy = calcular_estatisticas(hoje, usar_numpy=True)
+        sem_numpy = calcular_estatisticas(hoje, usar_numpy=False)
+        self.assertEqual(com_numpy, sem_numpy)
+        return sem_numpy
+
+    def recomecar(self):
+        """Outro diretório de dados vazio, para o próximo histórico do mesmo teste."""
+        self.tearDown()
+        self.setUp()
+
+    def test_historico_vazio(self):
+        self.comparar()
+
+    def test_um_dia_so(self):
+        for estado, tempo in [("Estudado", 0), ("Falhei", 0), ("-", META_DIARIA)]:
+            with self.subTest(estado=estado, tempo=tempo):
+                self.recomecar()
+                self.historico({0: (estado, tempo)})
+                self.comparar()
+        self.recomecar()
+        self.historico({-1: ("Estudado", 60)})  # Só ontem: a sequência atual vem dele
+        self.assertEqual(self.comparar()["sequencia_atual"], 1)
+
+    def test_sequencia_atual_com_e_sem_estudo_hoje(self):
+        self.historico({d: ("Estudado", 1800) for d in range(-10, 0)})
+        self.historico({-6: ("Falhei", 0)})
+        self.assertEqual(self.comparar()["sequencia_atual"], 5)
+        self.historico({0: ("-", META_DIARIA)})
+        self.assertEqual(self.comparar()["sequencia_atual"], 6)
+        self.historico({-1: ("Não Estudado", 0)})
+        self.assertEqual(self.comparar()["sequencia_atual"], 1)
+
+    def test_semanas_incompletas_nas_pontas(self):
+        # Começa em um sábado e termina antes de hoje: as duas pontas são semanas parciais
+        self.historico({d: ("Estudado", META_DIARIA * 2) for d in range(-25, -2)})
+        estatisticas = self.comparar()
+        self.assertEqual(estatisticas["semanas"], 3)  # De 17/02 a 09/03
+        for hoje in (HOJE + timedelta(days=d) for d in range(-3, 8)):
+            with self.subTest(hoje=hoje):
+                self.comparar(hoje)
+
+    def test_historicos_aleatorios(self):
+        aleatorio = random.Random(7)
+        for rodada in range(20):
+            with self.subTest(rodada=rodada):
+                self.recomecar()
+                tamanho = aleatorio.randint(1, 400)
+                inicio = -aleatorio.randint(0, tamanho)
+                estados = ["Estudado", "Não Estudado", "Falhei", "-"]
+                self.historico({
+                    d: (aleatorio.choice(estados), aleatorio.choice([0, 600, META_DIARIA - 1, META_DIARIA, 4 * 3600]))
+                    for d in range(inicio - tamanho, inicio + 1) if aleatorio.random() < 0.8
+                })
+                self.comparar()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""Testes da exportação e importação do histórico (estudos_historico)."""
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_core import TesteComDados  # Também põe a raiz do repositório no sys.path
+
+import estudos_core as core
+import estudos_historico
+
+
+class TesteImportacao(TesteComDados):
+    def importar(self, linhas):
+        caminho = os.path.join(self.diretorio, "historico.ndjson")
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(linha) + "\n" for linha in linhas))
+        return estudos_historico.importar_arquivo(caminho)
+
+    def test_tempo_grande_demais_conta_como_invalido(self):
+        core.carregar_dados()
+        resultado = self.importar([
+            {"data": "2025-01-02", "estado": "Estudado", "tempo": 3600},
+            {"data": "2025-01-03", "estado": "Estudado", "tempo": 2 ** 31},
+            {"data": "2025-01-04", "estado": "Estudado", "tempo": 24 * 60 * 60 + 1},
+        ])
+        self.assertEqual(resultado["dias"], 1)
+        self.assertEqual(resultado["invalidos"], 2)
+        self.assertTrue(resultado["erros"][0].startswith("linha 2:"))
+        self.assertEqual(dict(core.dados["dias"]["2025-01-02"]), {"estado": "Estudado", "tempo": 3600})
+        self.assertNotIn("2025-01-03", core.dados["dias"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""Testes da instância única (estudos_instancia)."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estudos_instancia import InstanciaUnica
+
+
+class TesteInstanciaUnica(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp(prefix="estudos_teste_")
+        self.addCleanup(shutil.rmtree, self.diretorio, ignore_errors=True)
+
+    def test_fechar_apaga_a_chave(self):
+        instancia = InstanciaUnica(self.diretorio)
+        self.assertTrue(instancia.adquirir())
+        instancia.servir(lambda comando: {"comando": comando}, lambda funcao: funcao())
+        self.assertEqual(InstanciaUnica(self.diretorio).enviar("status"), {"comando": "status"})
+        self.assertTrue(os.path.exists(instancia.caminho_chave))
+
+        instancia.fechar()
+        self.assertFalse(os.path.exists(instancia.caminho_chave))
+        self.assertTrue(InstanciaUnica(self.diretorio).adquirir())
+
+    def test_segunda_instancia_nao_apaga_a_chave_da_primeira(self):
+        primeira = InstanciaUnica(self.diretorio)
+        self.assertTrue(primeira.adquirir())
+        primeira.servir(lambda comando: {}, lambda funcao: funcao())
+        self.addCleanup(primeira.fechar)
+
+        segunda = InstanciaUnica(self.diretorio)
+        self.assertFalse(segunda.adquirir())
+        segunda.fechar()
+        self.assertTrue(os.path.exists(primeira.caminho_chave))
+
+
+if __name__ == "__main__":
+    unittest.main()